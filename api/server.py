@@ -2,12 +2,26 @@
 FastAPI server - provides REST API for future GUI integration.
 """
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import base64
+import json
+import logging
+import threading
+import time
+from typing import Literal
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from core.agent import Agent
+from core.cancellation import Cancelled
 from core.config import config
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="SkillAgent API", version="0.1.0")
 
 # CORS for frontend
@@ -19,8 +33,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (knowledge listings / exports)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Global agent instance
 agent: Agent = None
+# The shared agent keeps one conversation; serialise turns against it
+agent_lock = asyncio.Lock()
 
 
 class ChatRequest(BaseModel):
@@ -31,6 +50,18 @@ class ChatResponse(BaseModel):
     reply: str
 
 
+class BatchItem(BaseModel):
+    id: str | None = None
+    message: str
+
+
+class BatchRequest(BaseModel):
+    items: list[BatchItem]
+    # Optional per-request overrides, capped by the api.batch settings
+    concurrency: int | None = None
+    timeout: float | None = None
+
+
 class KnowledgeRequest(BaseModel):
     content: str
     tags: list[str] = []
@@ -48,23 +79,144 @@ async def startup():
     agent = Agent()
     agent.register_default_skills()
 
+    # Open the knowledge base and load the embedding model in the background
+    # so startup does not wait for them, yet the first knowledge request does
+    # not pay for them either.
+    if config.get("knowledge.warm_up", True):
+        from knowledge.knowledge_manager import KnowledgeManager
+        asyncio.get_running_loop().run_in_executor(None, KnowledgeManager().warm_up)
+
+
+async def _until_disconnect(request: Request, task: asyncio.Future, cancel: threading.Event):
+    """Await *task*, setting *cancel* if the client disconnects first.
+
+    The task is still awaited after a disconnect - and when the handler
+    itself is cancelled - so the turn has rolled back its context before
+    the caller releases the agent. *task* is never cancelled: the worker
+    thread would keep running on the shared context.
+    """
+    poll = config.get("api.disconnect_poll", 0.25)
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=poll)
+            if not task.done() and not cancel.is_set() and await request.is_disconnected():
+                cancel.set()
+    except asyncio.CancelledError:
+        # The server cancelled the handler (shutdown, or the connection died)
+        cancel.set()
+        while not task.done():
+            try:
+                await asyncio.wait({task})
+            except asyncio.CancelledError:
+                pass
+        raise
+    return task.result()
+
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(req: ChatRequest):
-    """Send a message to the agent and get a response."""
+async def chat(req: ChatRequest, request: Request):
+    """Send a message to the agent and get a response.
+
+    If the client disconnects before the reply is ready, the turn is
+    cancelled (LLM stream closed, skills abandoned) and left out of the
+    conversation.
+    """
     if not req.message.strip():
         raise HTTPException(status_code=400, detail="Message cannot be empty")
+    cancel = threading.Event()
     try:
-        reply = agent.chat(req.message)
+        # Run the blocking tool loop off the event loop
+        async with agent_lock:
+            task = asyncio.ensure_future(run_in_threadpool(agent.chat, req.message, cancel=cancel))
+            reply = await _until_disconnect(request, task, cancel)
         return ChatResponse(reply=reply)
+    except Cancelled:
+        logger.info("Client disconnected; chat turn cancelled")
+        # Nobody is listening; 499 = client closed request (nginx convention)
+        return Response(status_code=499)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _chat_isolated(message: str, cancel: threading.Event = None) -> str:
+    """One single-turn conversation on a fresh context (shared LLM client and skills)."""
+    return Agent(llm=agent.llm, registry=agent.registry).chat(message, cancel=cancel)
+
+
+def _release(slots: asyncio.Semaphore):
+    def done(task: asyncio.Future):
+        slots.release()
+        if not task.cancelled():
+            # Retrieve the outcome of abandoned (timed-out / cancelled) items
+            task.exception()
+    return done
+
+
+@app.post("/chat/batch")
+async def chat_batch(req: BatchRequest):
+    """Answer independent single-turn prompts concurrently.
+
+    Every item runs on its own conversation context, so items never see each
+    other or the shared /chat history. Results are streamed as NDJSON, one
+    line per item in completion order ({"index", "id", "reply", "error",
+    "latency_ms"}); a failed or timed-out item only sets its own "error".
+    Timed-out items, and every unfinished item once the client disconnects,
+    are cancelled so they stop calling the LLM and skills.
+    """
+    max_items = config.get("api.batch.max_items", 500)
+    if not req.items:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(req.items) > max_items:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {max_items} items")
+    max_concurrency = config.get("api.batch.max_concurrency", 8)
+    concurrency = max(1, min(req.concurrency or max_concurrency, max_concurrency))
+    item_timeout = config.get("api.batch.item_timeout", 60)
+    timeout = min(req.timeout or item_timeout, item_timeout)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(index: int, item: BatchItem) -> dict:
+        result = {"index": index, "id": item.id, "reply": None, "error": None}
+        if not item.message.strip():
+            return {**result, "error": "Message cannot be empty", "latency_ms": 0.0}
+        await slots.acquire()
+        started = time.perf_counter()
+        cancel = threading.Event()
+        # A timed-out item keeps its slot until its thread really finishes,
+        # so abandoned work cannot pile up beyond the concurrency limit
+        task = asyncio.ensure_future(run_in_threadpool(_chat_isolated, item.message, cancel))
+        task.add_done_callback(_release(slots))
+        try:
+            result["reply"] = await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            cancel.set()
+            result["error"] = f"Timed out after {timeout:g}s"
+        except asyncio.CancelledError:
+            # Client went away
+            cancel.set()
+            raise
+        except Exception as e:
+            result["error"] = str(e) or type(e).__name__
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    async def generate():
+        tasks = [asyncio.ensure_future(run(i, item)) for i, item in enumerate(req.items)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done, ensure_ascii=False) + "\n"
+        finally:
+            # Client went away: drop items that have not started
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @app.post("/chat/reset")
 async def reset_chat():
     """Reset conversation history."""
-    agent.reset()
+    async with agent_lock:
+        agent.reset()
     return {"status": "ok", "message": "Conversation reset"}
 
 
@@ -74,13 +226,82 @@ async def list_skills():
     return {"skills": agent.registry.list_skills()}
 
 
+def _knowledge_filters(tags: str, source: str, where: str = "") -> tuple[list[str], dict | None]:
+    """Tag list and where clause from the query parameters (400 on a bad ``where``)."""
+    from knowledge.knowledge_manager import KnowledgeManager
+
+    tag_list = [t.strip() for t in tags.split(",") if t.strip()]
+    clauses = [{"source": source}] if source else []
+    if where:
+        try:
+            clauses.append(KnowledgeManager.check_where(json.loads(where)))
+        except ValueError as e:  # includes JSONDecodeError
+            raise HTTPException(status_code=400, detail=f"Invalid where filter: {e}")
+    if not clauses:
+        return tag_list, None
+    return tag_list, clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _encode_cursor(offset: int | None) -> str | None:
+    if offset is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps({"o": offset}).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["o"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @app.get("/knowledge")
-async def list_knowledge():
-    """List all knowledge entries."""
+async def list_knowledge(
+    tags: str = "",
+    source: str = "",
+    where: str = "",
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    cursor: str = "",
+    fields: Literal["ids", "snippet", "full"] = "full",
+):
+    """List one page of knowledge entries.
+
+    Filter with comma-separated ``tags``, ``source`` and ``where``, a JSON
+    metadata filter such as ``{"created_at": {"$gte": "2026-01-01"}}``
+    (see KnowledgeManager.check_where); page with either ``offset`` or the
+    opaque ``cursor`` returned as ``next_cursor``.
+    """
     from knowledge.knowledge_manager import KnowledgeManager
     km = KnowledgeManager()
-    items = km.list_all()
-    return {"count": len(items), "items": items}
+    tag_list, where = _knowledge_filters(tags, source, where)
+    if cursor:
+        offset = _decode_cursor(cursor)
+    items, next_offset = await run_in_threadpool(
+        km.list_page, limit=limit, offset=offset, tags=tag_list, where=where, fields=fields,
+    )
+    return {"count": len(items), "items": items, "next_cursor": _encode_cursor(next_offset)}
+
+
+@app.get("/knowledge/export")
+async def export_knowledge(
+    tags: str = "",
+    source: str = "",
+    where: str = "",
+    fields: Literal["ids", "snippet", "full"] = "full",
+):
+    """Stream every matching knowledge entry as one JSON array."""
+    from knowledge.knowledge_manager import KnowledgeManager
+    km = KnowledgeManager()
+    tag_list, where = _knowledge_filters(tags, source, where)
+
+    def generate():
+        yield "["
+        for i, item in enumerate(km.iter_all(tags=tag_list, where=where, fields=fields)):
+            yield ("," if i else "") + json.dumps(item, ensure_ascii=False)
+        yield "]"
+
+    return StreamingResponse(generate(), media_type="application/json")
 
 
 @app.post("/knowledge")
@@ -88,7 +309,7 @@ async def save_knowledge(req: KnowledgeRequest):
     """Save a new knowledge entry."""
     from knowledge.knowledge_manager import KnowledgeManager
     km = KnowledgeManager()
-    doc_id = km.save(content=req.content, tags=req.tags)
+    doc_id = await run_in_threadpool(km.save, content=req.content, tags=req.tags)
     return {"id": doc_id, "status": "saved"}
 
 
@@ -97,7 +318,7 @@ async def delete_knowledge(doc_id: str):
     """Delete a knowledge entry."""
     from knowledge.knowledge_manager import KnowledgeManager
     km = KnowledgeManager()
-    success = km.delete(doc_id)
+    success = await run_in_threadpool(km.delete, doc_id)
     if not success:
         raise HTTPException(status_code=404, detail="Knowledge not found")
     return {"status": "deleted"}
@@ -105,7 +326,41 @@ async def delete_knowledge(doc_id: str):
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "version": "0.1.0"}
+    # Skills whose circuit breaker is open are failing fast right now
+    open_circuits = [
+        name for name, state in (agent.registry.breaker_states() if agent else {}).items()
+        if state["state"] != "closed"
+    ]
+    return {
+        "status": "degraded" if open_circuits else "healthy",
+        "version": "0.1.0",
+        "open_circuits": open_circuits,
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime counters: intent router, skill result cache, circuit breakers and context tokens."""
+    from core.router import router_stats
+    from core.tokens import token_stats
+    from core.tool_selector import selection_stats
+    return {
+        "router": router_stats.snapshot(),
+        "tokens": token_stats.snapshot(),
+        "tool_selection": selection_stats.snapshot(),
+        "skill_cache": agent.registry.cache_stats(),
+        "circuit_breakers": agent.registry.breaker_states(),
+    }
+
+
+@app.get("/usage")
+async def usage(session_id: str = "", since: str = "", limit: int = Query(20, ge=1, le=500)):
+    """Token usage ledger aggregates: totals, prompt breakdown, per skill, top sessions and turns.
+
+    ``since`` is a UTC timestamp such as ``2025-01-31`` or ``2025-01-31 08:00:00``.
+    """
+    from core.usage import summary
+    return await run_in_threadpool(summary, session_id=session_id or None, since=since or None, limit=limit)
 
 
 def start_server():
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Load test for the API server, fully offline.
+
+Starts benchmarks/mock_upstream.py (LLM API plus weather/search stubs) and
+one `python main.py server` worker against a throwaway config, then drives
+an endpoint at each requested concurrency level with a mix of chat-only,
+weather, search and multi-tool messages.
+
+Per level it reports throughput, p50/p95/p99 latency, time to first byte
+(meaningful for streaming endpoints) and the error rate. Every worker waits
+for its response before sending the next request (closed loop).
+
+Usage:
+    python benchmarks/load.py [--concurrency 1,4,16] [--requests 50 | --duration 20]
+        [--path /chat] [--messages mix.txt] [--json results.json]
+        [--ttft-ms 200] [--token-ms 10] [--upstream-ms 50] [--error-rate 0]
+        [--server-url http://127.0.0.1:8000]   # use an already running server
+
+Mock options (--ttft-ms, --token-ms, ...) are passed to mock_upstream.py;
+--server-url skips starting both the mock and the server.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MESSAGES = [
+    "Hello, how are you?",
+    "What's the weather in Beijing?",
+    "Search the latest Python release news",
+    "Tell me a short joke",
+    "Compare the weather in Beijing and Shanghai",
+    "What time is it?",
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _write_config(workdir: Path, port: int, mock: str) -> Path:
+    cfg = workdir / "config.yaml"
+    cfg.write_text(json.dumps({
+        "language": "en",
+        "llm": {"api_key": "sk-bench", "base_url": f"{mock}/v1", "model": "mock"},
+        "knowledge": {
+            "persist_directory": str(workdir / "chromadb"),
+            "numpy": {"path": str(workdir / "vectors")},
+            "warm_up": False,
+            # Retrieval would need the embedding model, which may not be available offline
+            "auto_retrieve": {"enabled": False},
+        },
+        "storage": {"db_path": str(workdir / "agent.db")},
+        "api": {"host": "127.0.0.1", "port": port},
+        "agent": {"system_prompt": "Benchmark."},
+        "skills": {
+            "entry_points": False,
+            # Measure the full path on every request
+            "cache": {"enabled": False},
+            "weather": {
+                "geoip_url": f"{mock}/geoip",
+                "geocode_url": f"{mock}/geocode",
+                "forecast_url": f"{mock}/forecast",
+            },
+            "web_search": {"searx_url": f"{mock}/search"},
+        },
+    }), encoding="utf-8")
+    return cfg
+
+
+def _wait_for(url: str, proc: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=0.5)
+            return
+        except urllib.error.HTTPError:
+            return
+        except OSError:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{proc.args[1]} exited with code {proc.returncode}")
+            time.sleep(0.05)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def _request(url: str, body: bytes) -> tuple[float, float, int]:
+    """POST one request; return (ttfb_s, total_s, status) with status 0 for transport errors."""
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=120) as r:
+            r.read(1)
+            ttfb = time.perf_counter() - t0
+            while r.read(65536):
+                pass
+            return ttfb, time.perf_counter() - t0, r.status
+    except urllib.error.HTTPError as e:
+        return time.perf_counter() - t0, time.perf_counter() - t0, e.code
+    except OSError:
+        return time.perf_counter() - t0, time.perf_counter() - t0, 0
+
+
+def _percentile(values: list[float], p: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+def run_level(url: str, concurrency: int, messages: list[str], requests: int, duration: float) -> dict:
+    """Drive *url* with *concurrency* workers; stop after *requests* or *duration* seconds."""
+    samples: list[tuple[float, float, int]] = []
+    lock = threading.Lock()
+    counter = iter(range(10 ** 9))
+    stop_at = time.perf_counter() + duration if duration else None
+
+    def worker():
+        while True:
+            with lock:
+                n = next(counter)
+            if (requests and n >= requests) or (stop_at and time.perf_counter() >= stop_at):
+                return
+            body = json.dumps({"message": messages[n % len(messages)]}).encode()
+            sample = _request(url, body)
+            with lock:
+                samples.append(sample)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    ok = [s for s in samples if s[2] == 200]
+    latencies = sorted(s[1] for s in ok)
+    ttfbs = [s[0] for s in ok]
+    errors: dict[str, int] = {}
+    for s in samples:
+        if s[2] != 200:
+            errors[str(s[2] or "transport")] = errors.get(str(s[2] or "transport"), 0) + 1
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(ok) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "ttfb_p50_ms": _percentile(sorted(ttfbs), 50) * 1000,
+        "error_rate": (len(samples) - len(ok)) / len(samples) if samples else 0.0,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test of the API server")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated worker counts")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per level (0 = use --duration)")
+    parser.add_argument("--duration", type=float, default=0, help="Seconds per level")
+    parser.add_argument("--path", default="/chat", help="Endpoint taking {\"message\": ...}")
+    parser.add_argument("--messages", type=Path, help="File with one message per line (default: built-in mix)")
+    parser.add_argument("--server-url", help="Use a running server instead of starting one")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    # Passed through to the mock upstream
+    parser.add_argument("--ttft-ms", default="200")
+    parser.add_argument("--token-ms", default="10")
+    parser.add_argument("--upstream-ms", default="50")
+    parser.add_argument("--error-rate", default="0")
+    parser.add_argument("--script", help="Tool-call rules for the mock (see mock_upstream.py)")
+    args = parser.parse_args()
+    if args.duration:
+        args.requests = 0
+
+    messages = DEFAULT_MESSAGES
+    if args.messages:
+        messages = [m for m in args.messages.read_text(encoding="utf-8").splitlines() if m.strip()]
+
+    procs: list[subprocess.Popen] = []
+    with tempfile.TemporaryDirectory(prefix="load-") as tmp:
+        try:
+            server_url = args.server_url
+            if not server_url:
+                mock_port, api_port = _free_port(), _free_port()
+                mock = f"http://127.0.0.1:{mock_port}"
+                mock_cmd = [
+                    sys.executable, str(ROOT / "benchmarks" / "mock_upstream.py"), "--port", str(mock_port),
+                    "--ttft-ms", args.ttft_ms, "--token-ms", args.token_ms,
+                    "--upstream-ms", args.upstream_ms, "--error-rate", args.error_rate,
+                ] + (["--script", args.script] if args.script else [])
+                procs.append(subprocess.Popen(mock_cmd, stdout=subprocess.DEVNULL, cwd=ROOT))
+                _wait_for(f"{mock}/stats", procs[-1])
+
+                cfg = _write_config(Path(tmp), api_port, mock)
+                server_cmd = [sys.executable, str(ROOT / "main.py"), "server", "--config", str(cfg)]
+                env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+                procs.append(subprocess.Popen(server_cmd, stdout=subprocess.DEVNULL,
+                                              stderr=subprocess.DEVNULL, cwd=ROOT, env=env))
+                server_url = f"http://127.0.0.1:{api_port}"
+                _wait_for(f"{server_url}/health", procs[-1])
+
+            url = server_url.rstrip("/") + args.path
+            # One untimed request loads the skills and opens connections
+            _request(url, json.dumps({"message": messages[0]}).encode())
+
+            results = []
+            print(f"{'conc':>5} {'reqs':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+                  f"{'ttfb ms':>9} {'errors':>7}")
+            for level in (int(c) for c in args.concurrency.split(",")):
+                r = run_level(url, level, messages, args.requests, args.duration)
+                results.append(r)
+                print(f"{r['concurrency']:>5} {r['requests']:>6} {r['throughput_rps']:>8.2f} "
+                      f"{r['p50_ms']:>9.0f} {r['p95_ms']:>9.0f} {r['p99_ms']:>9.0f} "
+                      f"{r['ttfb_p50_ms']:>9.0f} {r['error_rate']:>7.1%}")
+                if r["errors"]:
+                    print(f"      errors by status: {r['errors']}")
+        finally:
+            for proc in reversed(procs):
+                proc.terminate()
+                proc.wait()
+
+    if args.json:
+        args.json.write_text(json.dumps({"path": args.path, "levels": results}, indent=2) + "\n",
+                             encoding="utf-8")
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
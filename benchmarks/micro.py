@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks of the per-turn hot paths, with regression tracking.
+
+Each benchmark builds a fixed fixture (throwaway config and data directory,
+deterministic inputs, no network) and times one operation with timeit-style
+auto-ranging: the call is repeated until one measurement takes at least
+--min-time seconds, and the best of --repeat measurements is reported as
+microseconds per call.
+
+Usage:
+    python benchmarks/micro.py [--filter context] [--repeat 5]
+                               [--save-baseline] [--baseline PATH]
+                               [--threshold 0.15] [--output results.json]
+    python benchmarks/micro.py --compare OLD.json NEW.json [--threshold 0.15]
+
+Without --save-baseline a run is compared against the baseline file when it
+exists; benchmarks slower than the baseline by more than --threshold are
+flagged and the exit status is 1. Baselines are machine-specific: record
+one on the machine you compare on (e.g. before and after a change).
+"""
+
+import argparse
+import hashlib
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baselines" / "micro.json"
+
+# name -> setup(workdir) returning the zero-argument callable to time
+BENCHMARKS = {}
+
+
+def bench(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _fake_embedding(dim: int = 64):
+    import numpy as np
+
+    def embed(texts: list[str]):
+        out = np.empty((len(texts), dim), dtype=np.float32)
+        for i, t in enumerate(texts):
+            seed = int(hashlib.md5(t.encode("utf-8")).hexdigest()[:8], 16)
+            out[i] = np.random.default_rng(seed).standard_normal(dim)
+        return out
+
+    return embed
+
+
+def _conversation(turns: int = 10) -> list[dict]:
+    """A history of tool-using turns, as the agent builds it."""
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"Question {i}: what's the weather in city {i}?"})
+        messages.append({
+            "role": "assistant", "content": "",
+            "tool_calls": [{"id": f"call_{i}", "type": "function",
+                            "function": {"name": "get_weather", "arguments": json.dumps({"city": f"city {i}"})}}],
+        })
+        messages.append({"role": "tool", "tool_call_id": f"call_{i}", "name": "get_weather",
+                         "content": "Sunny, 21 °C, humidity 55 %. " * 20})
+        messages.append({"role": "assistant", "content": f"It is sunny in city {i}. " * 5})
+    return messages
+
+
+FORECAST = {
+    "timezone": "Asia/Shanghai",
+    "current": {
+        "time": "2026-01-01T12:00", "temperature_2m": 21.5, "apparent_temperature": 20.8,
+        "relative_humidity_2m": 55, "precipitation": 0.0, "weather_code": 2,
+        "wind_speed_10m": 9.4, "wind_direction_10m": 180,
+    },
+    "daily": {
+        "time": [f"2026-01-0{d}" for d in range(1, 8)],
+        "weather_code": [0, 1, 2, 3, 61, 71, 95],
+        "temperature_2m_max": [24.0, 23.5, 22.0, 20.1, 18.3, 5.2, 19.0],
+        "temperature_2m_min": [15.0, 14.2, 13.3, 12.0, 10.1, -1.5, 11.0],
+        "precipitation_sum": [0.0, 0.0, 0.2, 1.5, 12.0, 4.0, 20.0],
+        "wind_speed_10m_max": [15.0, 12.0, 18.0, 22.0, 30.0, 25.0, 40.0],
+    },
+}
+
+
+# ---------------------------------------------------------------------- #
+#  Benchmarks                                                             #
+# ---------------------------------------------------------------------- #
+
+@bench("config.get")
+def _config_get(workdir):
+    from core.config import config
+    return lambda: config.get("agent.router.max_chars", 40)
+
+
+@bench("prompt_loader.overlay")
+def _prompt_overlay(workdir):
+    from core.prompt_loader import overlay
+    from skills.weather_skill import WeatherSkill
+    skill = WeatherSkill()
+    tool_def = {
+        "type": "function",
+        "function": {"name": skill.name, "description": skill.description, "parameters": skill.parameters},
+    }
+    return lambda: overlay("get_weather", tool_def)
+
+
+@bench("registry.get_openai_tools")
+def _get_openai_tools(workdir):
+    from core.agent import BUILTIN_SKILLS
+    from skills.registry import SkillRegistry
+    registry = SkillRegistry()
+    for target in BUILTIN_SKILLS:
+        registry.register_lazy(target)
+    return registry.get_openai_tools
+
+
+@bench("context.get_messages")
+def _get_messages(workdir):
+    from core.context import ContextManager
+    ctx = ContextManager(system_prompt="Benchmark system prompt. " * 20)
+    ctx.messages = _conversation(10)
+    ctx.set_turn_context("Relevant knowledge entry. " * 10)
+    return ctx.get_messages
+
+
+@bench("context._trim")
+def _trim(workdir):
+    from core.context import ContextManager
+    ctx = ContextManager(system_prompt="Benchmark.")
+    history = _conversation(30)
+
+    def run():
+        ctx.messages = list(history)
+        ctx._trim()
+
+    return run
+
+
+@bench("context.stub_tool_results")
+def _stub(workdir):
+    from core.context import ContextManager
+    ctx = ContextManager(system_prompt="Benchmark.")
+    history = _conversation(10)
+
+    def run():
+        ctx.messages = [dict(m) for m in history]
+        ctx.stub_tool_results(1)
+
+    return run
+
+
+@bench("tokens.compact_text")
+def _compact(workdir):
+    from core.tokens import compact_text
+    text = "\n\n".join(f"{i}. **Result {i}**\n   " + "snippet text " * 60 + f"\n   URL: https://example.com/{i}"
+                       for i in range(10))
+    return lambda: compact_text(text, 700)
+
+
+@bench("skill.weather_format")
+def _weather(workdir):
+    from skills.weather_skill import WeatherSkill
+    skill = WeatherSkill()
+    # Upstream calls replaced by the fixture: only the formatting is timed
+    skill._geocode = lambda city: (39.9, 116.4, "Beijing, China")
+    skill._fetch_weather = lambda lat, lon, days: FORECAST
+    return lambda: skill.format_result(skill.execute(city="Beijing", days=7))
+
+
+@bench("skill.weather_pretty")
+def _weather_pretty(workdir):
+    from skills.weather_skill import WeatherSkill
+    skill = WeatherSkill()
+    skill._geocode = lambda city: (39.9, 116.4, "Beijing, China")
+    skill._fetch_weather = lambda lat, lon, days: FORECAST
+    return lambda: skill.format_result(skill.execute(city="Beijing", days=7), "pretty")
+
+
+@bench("skill.tarot")
+def _tarot(workdir):
+    from skills.tarot_career_skill import TarotCareerSkill
+    skill = TarotCareerSkill()
+    return lambda: skill.execute(question="Should I change jobs?", cards=3)
+
+
+@bench("skill.almanac")
+def _almanac(workdir):
+    from skills.almanac_skill import AlmanacSkill
+    skill = AlmanacSkill()
+    return lambda: skill.execute(date="2026-01-01")
+
+
+@bench("vector_store.query")
+def _vector_query(workdir):
+    from knowledge.numpy_store import NumpyVectorStore
+    store = NumpyVectorStore(embedding_function=_fake_embedding(), path=workdir / "vectors")
+    for i in range(2000):
+        store.add(f"doc{i}", f"note {i} about topic {i % 97}", {"source": "bench", "bucket": i % 10})
+    store.query("warm up", top_k=5)
+    return lambda: store.query("note 42 about topic 42", top_k=5)
+
+
+@bench("database.save_message")
+def _save_message(workdir):
+    from storage.database import Database
+    db = Database()
+    db.create_session("bench")
+    return lambda: db.save_message("bench", "assistant", "A typical assistant reply. " * 10)
+
+
+# ---------------------------------------------------------------------- #
+#  Runner                                                                 #
+# ---------------------------------------------------------------------- #
+
+def _setup_config(workdir: Path):
+    cfg = workdir / "config.yaml"
+    cfg.write_text(json.dumps({
+        "language": "zh",
+        "llm": {"api_key": "sk-bench", "base_url": "http://127.0.0.1:9/v1", "model": "bench"},
+        "knowledge": {"backend": "numpy", "numpy": {"path": str(workdir / "vectors")}, "warm_up": False},
+        "storage": {"db_path": str(workdir / "agent.db")},
+        "agent": {"system_prompt": "Benchmark.", "max_history": 20},
+        "skills": {"entry_points": False},
+    }), encoding="utf-8")
+    sys.path.insert(0, str(ROOT))
+    from core.config import config
+    config.load(str(cfg))
+    from core.i18n import setup as i18n_setup
+    from core.prompt_loader import setup as prompt_setup
+    i18n_setup("zh")
+    prompt_setup("zh")
+
+
+def measure(fn, repeat: int, min_time: float) -> dict:
+    """Best-of-*repeat* microseconds per call, auto-ranging the loop count."""
+    fn()
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - t0 >= min_time:
+            break
+        number *= 2
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number * 1e6)
+    samples.sort()
+    return {"best_us": samples[0], "median_us": samples[len(samples) // 2], "loops": number}
+
+
+def compare(old: dict, new: dict, threshold: float) -> list[str]:
+    """Print new vs old per benchmark; return the names that regressed."""
+    regressions = []
+    for name, result in new.items():
+        line = f"{name:<28} {result['best_us']:>12.2f} us"
+        if name in old:
+            base = old[name]["best_us"]
+            change = (result["best_us"] - base) / base if base else 0.0
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append(name)
+            elif change < -threshold:
+                flag = "  faster"
+            line += f"   baseline {base:>12.2f} us  {change:+7.1%}{flag}"
+        print(line)
+    return regressions
+
+
+def _load_results(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8")).get("benchmarks", {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-path micro-benchmarks")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Seconds per measurement")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative slowdown flagged as a regression")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write results to the baseline file")
+    parser.add_argument("--output", type=Path, help="Also write results to this file")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("OLD", "NEW"),
+                        help="Compare two result files without running anything")
+    parser.add_argument("--list", action="store_true", help="List benchmark names")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return
+    if args.compare:
+        regressions = compare(_load_results(args.compare[0]), _load_results(args.compare[1]), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="micro-") as tmp:
+        workdir = Path(tmp)
+        _setup_config(workdir)
+        for name, setup in BENCHMARKS.items():
+            if args.filter in name:
+                results[name] = measure(setup(workdir), args.repeat, args.min_time)
+
+    baseline = {}
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = _load_results(args.baseline)
+    regressions = compare(baseline, results, args.threshold)
+
+    payload = json.dumps({
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": results,
+    }, indent=2) + "\n"
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(payload, encoding="utf-8")
+        print(f"Results written to {path}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
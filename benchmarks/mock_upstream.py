@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Offline stand-ins for every upstream SkillAgent talks to.
+
+One HTTP server provides:
+
+    POST /v1/chat/completions   OpenAI-compatible chat completions (plain and
+                                stream=true), with configurable latency,
+                                scripted tool calls and error injection
+    GET  /geoip                 ip-api.com shaped IP geolocation
+    GET  /geocode               nominatim shaped city search
+    GET  /forecast              open-meteo shaped forecast
+    GET  /search                SearxNG shaped JSON search results
+
+Point a config at it with llm.base_url = http://HOST:PORT/v1 and the
+skills.weather.* / skills.web_search.searx_url settings (benchmarks/load.py
+does this automatically).
+
+Tool-call script: a JSON list of rules, checked in order against the last
+user message when the request offers tools and the model has not yet seen a
+tool result in this turn:
+
+    [{"match": "weather|天气", "calls": [{"name": "get_weather",
+                                          "arguments": {"city": "Beijing"}}]}]
+
+"match" is a case-insensitive regular expression; an argument value of
+"$input" is replaced by the user message. Rules naming tools that were not
+offered are skipped.
+
+Usage:
+    python benchmarks/mock_upstream.py [--port 8901] [--ttft-ms 200]
+        [--token-ms 10] [--reply-tokens 40] [--upstream-ms 50]
+        [--error-rate 0.0] [--error-status 500] [--script rules.json]
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_SCRIPT = [
+    {"match": r"weather|天气", "calls": [{"name": "get_weather", "arguments": {"city": "Beijing", "days": 3}}]},
+    {"match": r"search|news|搜索|新闻", "calls": [{"name": "web_search", "arguments": {"query": "$input"}}]},
+    {"match": r"time|date|几点|几号", "calls": [{"name": "get_datetime", "arguments": {}}]},
+    # Two independent calls in one response
+    {"match": r"compare|对比", "calls": [
+        {"name": "get_weather", "arguments": {"city": "Beijing", "days": 1}},
+        {"name": "get_weather", "arguments": {"city": "Shanghai", "days": 1}},
+    ]},
+]
+
+WORDS = "the a skill agent result answer weather search today data local mock reply token".split()
+
+
+class MockState:
+    """Settings shared by all request handlers, plus request counters."""
+
+    def __init__(self, args):
+        self.ttft = args.ttft_ms / 1000
+        self.token = args.token_ms / 1000
+        self.reply_tokens = args.reply_tokens
+        self.upstream = args.upstream_ms / 1000
+        self.error_rate = args.error_rate
+        self.error_status = args.error_status
+        self.script = DEFAULT_SCRIPT
+        if args.script:
+            with open(args.script, encoding="utf-8") as f:
+                self.script = json.load(f)
+        self.random = random.Random(args.seed)
+        self.lock = threading.Lock()
+        self.counts: dict[str, int] = {}
+
+    def count(self, key: str):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def fail(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def tool_calls(self, body: dict) -> list[dict]:
+        """Scripted tool calls for this request (empty for a text answer)."""
+        messages = body.get("messages", [])
+        offered = {t["function"]["name"] for t in body.get("tools") or []}
+        if not offered:
+            return []
+        last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+        if last_user < 0 or any(m.get("role") == "tool" for m in messages[last_user:]):
+            return []
+        text = messages[last_user].get("content") or ""
+        for rule in self.script:
+            if not re.search(rule["match"], text, re.IGNORECASE):
+                continue
+            calls = [c for c in rule["calls"] if c["name"] in offered]
+            if not calls:
+                continue
+            return [
+                {
+                    "name": c["name"],
+                    "arguments": {k: (text if v == "$input" else v) for k, v in c.get("arguments", {}).items()},
+                }
+                for c in calls
+            ]
+        return []
+
+
+def _reply_text(state: MockState, body: dict) -> list[str]:
+    """Words of a text answer; mentions the tool results it was given."""
+    messages = body.get("messages", [])
+    tools_seen = [m.get("name", "tool") for m in messages if m.get("role") == "tool"]
+    head = [f"(based on {', '.join(tools_seen[-3:])})"] if tools_seen else []
+    with state.lock:
+        words = [state.random.choice(WORDS) for _ in range(state.reply_tokens)]
+    return head + words
+
+
+def _usage(body: dict, completion_tokens: int) -> dict:
+    prompt_tokens = len(json.dumps(body.get("messages", []), ensure_ascii=False)) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: MockState = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    # ------------------------------------------------------------------ #
+    #  Helpers                                                             #
+    # ------------------------------------------------------------------ #
+
+    def _json(self, payload, status: int = 200):
+        data = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _sse(self, payload: dict):
+        self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode())
+        self.wfile.flush()
+
+    # ------------------------------------------------------------------ #
+    #  OpenAI chat completions                                             #
+    # ------------------------------------------------------------------ #
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._json({"error": {"message": "not found"}}, 404)
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        state = self.state
+        state.count("chat")
+        if state.fail():
+            state.count("chat_errors")
+            return self._json({"error": {"message": "injected failure", "type": "server_error"}},
+                              state.error_status)
+
+        calls = state.tool_calls(body)
+        words = [] if calls else _reply_text(state, body)
+        if body.get("stream"):
+            return self._stream(body, calls, words)
+
+        # Time to first token, then one delay per generated token
+        n_tokens = len(words) + sum(len(json.dumps(c["arguments"])) // 4 + 1 for c in calls)
+        time.sleep(state.ttft + state.token * n_tokens)
+        message = {"role": "assistant", "content": " ".join(words) if words else None}
+        if calls:
+            message["tool_calls"] = [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": c["name"], "arguments": json.dumps(c["arguments"], ensure_ascii=False)},
+                }
+                for c in calls
+            ]
+        self._json({
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": message,
+                         "finish_reason": "tool_calls" if calls else "stop"}],
+            "usage": _usage(body, n_tokens),
+        })
+
+    def _stream(self, body: dict, calls: list[dict], words: list[str]):
+        state = self.state
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        base = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+        }
+
+        def chunk(delta: dict, finish=None):
+            self._sse({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]})
+
+        time.sleep(state.ttft)
+        chunk({"role": "assistant", "content": ""})
+        for word in words:
+            chunk({"content": word + " "})
+            time.sleep(state.token)
+        for index, call in enumerate(calls):
+            chunk({"tool_calls": [{"index": index, "id": f"call_{uuid.uuid4().hex[:12]}", "type": "function",
+                                   "function": {"name": call["name"], "arguments": ""}}]})
+            arguments = json.dumps(call["arguments"], ensure_ascii=False)
+            # Roughly one token per four characters of arguments
+            for i in range(0, len(arguments), 4):
+                time.sleep(state.token)
+                chunk({"tool_calls": [{"index": index, "function": {"arguments": arguments[i:i + 4]}}]})
+        chunk({}, finish="tool_calls" if calls else "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    # ------------------------------------------------------------------ #
+    #  Skill upstream stubs                                                #
+    # ------------------------------------------------------------------ #
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        stub = {
+            "/geoip": self._geoip,
+            "/geocode": self._geocode,
+            "/forecast": self._forecast,
+            "/search": self._search,
+            "/stats": lambda q: dict(self.state.counts),
+        }.get(url.path)
+        if stub is None:
+            return self._json({"error": "not found"}, 404)
+        self.state.count(url.path.lstrip("/"))
+        if url.path != "/stats":
+            time.sleep(self.state.upstream)
+        self._json(stub(query))
+
+    @staticmethod
+    def _geoip(query: dict) -> dict:
+        return {"status": "success", "lat": 39.9, "lon": 116.4,
+                "city": "Beijing", "regionName": "Beijing", "country": "China"}
+
+    @staticmethod
+    def _geocode(query: dict) -> list:
+        city = query.get("q", "Beijing")
+        # Stable pseudo-coordinates per city name
+        seed = sum(map(ord, city))
+        return [{"lat": str(20 + seed % 30), "lon": str(100 + seed % 40), "display_name": f"{city}, Mock"}]
+
+    @staticmethod
+    def _forecast(query: dict) -> dict:
+        days = int(query.get("forecast_days", 3))
+        today = time.strftime("%Y-%m-%d")
+        dates = [time.strftime("%Y-%m-%d", time.localtime(time.time() + 86400 * i)) for i in range(days)]
+        return {
+            "timezone": "Asia/Shanghai",
+            "current": {
+                "time": f"{today}T12:00",
+                "temperature_2m": 21.5, "apparent_temperature": 20.8,
+                "relative_humidity_2m": 55, "precipitation": 0.0,
+                "weather_code": 2, "wind_speed_10m": 9.4, "wind_direction_10m": 180,
+            },
+            "daily": {
+                "time": dates,
+                "weather_code": [2] * days,
+                "temperature_2m_max": [24.0] * days,
+                "temperature_2m_min": [15.0] * days,
+                "precipitation_sum": [0.0] * days,
+                "wind_speed_10m_max": [15.0] * days,
+            },
+        }
+
+    @staticmethod
+    def _search(query: dict) -> dict:
+        q = query.get("q", "")
+        return {"query": q, "results": [
+            {"title": f"Result {i} for {q}", "content": f"Mock snippet {i} about {q}. " * 3,
+             "url": f"https://example.com/{i}"}
+            for i in range(1, 9)
+        ]}
+
+
+def serve(args) -> ThreadingHTTPServer:
+    """Create the mock server (call serve_forever() on the result)."""
+    handler = type("BoundHandler", (Handler,), {"state": MockState(args)})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Offline mock of the LLM API and skill upstreams")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--ttft-ms", type=float, default=200, help="Delay before the first token")
+    parser.add_argument("--token-ms", type=float, default=10, help="Delay per generated token")
+    parser.add_argument("--reply-tokens", type=int, default=40, help="Length of text answers")
+    parser.add_argument("--upstream-ms", type=float, default=50, help="Latency of the skill upstream stubs")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of LLM requests that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected failures")
+    parser.add_argument("--script", help="JSON tool-call rules (default: built-in weather/search/time rules)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    server = serve(args)
+    print(f"Mock upstream listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold-start time of the SkillAgent entry points.
+
+Targets:
+    hi      the `hi` console script (cli:main), interactive mode
+    cli     python main.py cli
+    server  python main.py server, until GET /health answers
+
+Each target is started in a fresh interpreter against a throwaway config
+(temporary data directory, unreachable LLM endpoint), so the numbers are
+reproducible and nothing touches ./data. The CLI targets are sent /quit on
+stdin; wall time covers the whole run. One extra run per target with
+PYTHONPROFILEIMPORTTIME=1 (inherited by child interpreters, so a launcher
+that re-spawns Python is measured too) gives the import breakdown.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--targets hi,cli,server] [--top 10]
+                                 [--save-baseline] [--baseline PATH]
+
+With --save-baseline the results are written to the baseline file; otherwise
+they are compared against it when it exists.
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baselines" / "startup.json"
+
+# Runs the `hi` console script the way its generated wrapper does
+HI_CODE = "import sys; sys.argv[0] = 'hi'; from cli import main; sys.exit(main())"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _write_config(workdir: Path, port: int) -> Path:
+    cfg = workdir / "config.yaml"
+    cfg.write_text(json.dumps({
+        "language": "en",
+        "llm": {"api_key": "sk-bench", "base_url": "http://127.0.0.1:9/v1", "model": "bench"},
+        "knowledge": {
+            "persist_directory": str(workdir / "chromadb"),
+            "numpy": {"path": str(workdir / "vectors")},
+            "warm_up": False,
+        },
+        "storage": {"db_path": str(workdir / "agent.db")},
+        "api": {"host": "127.0.0.1", "port": port},
+        "agent": {"system_prompt": "Benchmark."},
+    }), encoding="utf-8")
+    return cfg
+
+
+def _command(target: str, cfg: Path) -> list[str]:
+    if target == "hi":
+        return [sys.executable, "-c", HI_CODE, "--config", str(cfg)]
+    return [sys.executable, str(ROOT / "main.py"), target, "--config", str(cfg)]
+
+
+def _run_once(target: str, cfg: Path, port: int, importtime: bool = False) -> tuple[float, str]:
+    """Start one target, wait until it is ready, return (seconds, stderr)."""
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONPROFILEIMPORTTIME"}
+    if importtime:
+        env["PYTHONPROFILEIMPORTTIME"] = "1"
+    cmd = _command(target, cfg)
+
+    t0 = time.perf_counter()
+    if target != "server":
+        out = subprocess.run(cmd, input=b"/quit\n", capture_output=True, cwd=ROOT, env=env)
+        return time.perf_counter() - t0, out.stderr.decode("utf-8", "replace")
+
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=err, cwd=ROOT, env=env)
+        try:
+            while True:
+                try:
+                    urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=0.2)
+                    break
+                except OSError:
+                    if proc.poll() is not None:
+                        raise RuntimeError(f"server exited with code {proc.returncode}")
+                    time.sleep(0.01)
+            elapsed = time.perf_counter() - t0
+        finally:
+            proc.terminate()
+            proc.wait()
+        err.seek(0)
+        return elapsed, err.read().decode("utf-8", "replace")
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    Summarise -X importtime output.
+
+    Returns the total import time, the number of interpreters that reported
+    imports (their "encodings" bootstrap is counted) and the self time spent
+    importing each top-level package and its submodules, in milliseconds.
+    """
+    packages: dict[str, float] = {}
+    total = 0.0
+    interpreters = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        self_us, name = int(parts[0]), parts[2]
+        name = name.strip()
+        total += self_us / 1000
+        if name == "encodings":
+            interpreters += 1
+        pkg = name.split(".")[0]
+        packages[pkg] = packages.get(pkg, 0.0) + self_us / 1000
+    return {"total_ms": total, "interpreters": interpreters, "packages": packages}
+
+
+def bench_target(target: str, runs: int, top: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix=f"startup-{target}-") as tmp:
+        workdir = Path(tmp)
+        port = _free_port()
+        cfg = _write_config(workdir, port)
+        # One untimed run creates the data files and warms the OS file cache
+        _run_once(target, cfg, port)
+        times = [_run_once(target, cfg, port)[0] for _ in range(runs)]
+        _, stderr = _run_once(target, cfg, port, importtime=True)
+
+    imports = parse_importtime(stderr)
+    slowest = sorted(imports["packages"].items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {
+        "wall_median_s": statistics.median(times),
+        "wall_min_s": min(times),
+        "wall_max_s": max(times),
+        "import_total_ms": imports["total_ms"],
+        "interpreters": imports["interpreters"],
+        "top_imports_ms": dict(slowest),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entry point startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--targets", default="hi,cli,server")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to report")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write results to the baseline file")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8")).get("targets", {})
+
+    results = {}
+    for target in args.targets.split(","):
+        r = results[target] = bench_target(target, args.runs, args.top)
+        line = (
+            f"{target:<7} wall median {r['wall_median_s']:.3f}s "
+            f"(min {r['wall_min_s']:.3f}s, max {r['wall_max_s']:.3f}s)  "
+            f"imports {r['import_total_ms']:.0f}ms in {r['interpreters']} interpreter(s)"
+        )
+        if target in baseline:
+            base = baseline[target]["wall_median_s"]
+            line += f"  vs baseline {base:.3f}s ({(r['wall_median_s'] - base) / base:+.1%})"
+        print(line)
+        for name, ms in r["top_imports_ms"].items():
+            print(f"          {name:<28} {ms:8.1f} ms")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+            "targets": results,
+        }, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark the knowledge vector store backends (chroma vs numpy).
+
+Each backend runs in a fresh interpreter so import and startup costs are
+measured the way the CLI/server pay them. Both use the same deterministic
+hash-based embedding, so the numbers reflect index cost only, not the
+embedding model.
+
+Usage:
+    python benchmarks/vector_store.py [--docs 5000] [--queries 200] [--dim 384]
+                                      [--backends chroma,numpy] [--ivf-lists 0]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _fake_embedding(dim: int):
+    import numpy as np
+
+    def embed(texts: list[str]):
+        out = np.empty((len(texts), dim), dtype=np.float32)
+        for i, t in enumerate(texts):
+            seed = int(hashlib.md5(t.encode("utf-8")).hexdigest()[:8], 16)
+            out[i] = np.random.default_rng(seed).standard_normal(dim)
+        return out
+
+    return embed
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_worker(args) -> dict:
+    """Run one backend end to end inside this process and return timings."""
+    import resource
+
+    workdir = Path(args.workdir)
+    cfg = workdir / "config.yaml"
+    cfg.write_text(json.dumps({
+        "knowledge": {
+            "backend": args.worker,
+            "persist_directory": str(workdir / "chromadb"),
+            "collection_name": "bench_knowledge",
+            "numpy": {"path": str(workdir / "vectors"), "ivf_lists": args.ivf_lists, "ivf_min_rows": 1},
+        },
+        "storage": {"db_path": str(workdir / "agent.db")},
+    }), encoding="utf-8")
+
+    sys.path.insert(0, str(ROOT))
+    result = {"backend": args.worker}
+
+    t0 = time.perf_counter()
+    from core.config import config
+    config.load(str(cfg))
+    from knowledge.vector_store import create_vector_store
+    embed = _fake_embedding(args.dim)
+    store = create_vector_store(embedding_function=embed)
+    result["open_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i in range(args.docs):
+        store.add(f"doc{i}", f"note {i} about topic {i % 97}", {"source": "bench", "bucket": i % 10})
+    result["insert_per_s"] = args.docs / (time.perf_counter() - t0)
+
+    latencies = []
+    for i in range(args.queries):
+        t0 = time.perf_counter()
+        store.query(f"note {i * 7} about topic {i % 97}", top_k=5)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    result["query_p50_ms"] = _percentile(latencies, 50)
+    result["query_p95_ms"] = _percentile(latencies, 95)
+
+    latencies = []
+    for i in range(args.queries):
+        t0 = time.perf_counter()
+        store.query(f"note {i}", top_k=5, where={"bucket": i % 10})
+        latencies.append((time.perf_counter() - t0) * 1000)
+    result["filtered_p50_ms"] = _percentile(latencies, 50)
+
+    t0 = time.perf_counter()
+    store.list_page(limit=50, offset=args.docs // 2, fields="snippet")
+    result["list_page_ms"] = (time.perf_counter() - t0) * 1000
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["max_rss_mb"] = rss / 1024 if sys.platform != "darwin" else rss / 1024 / 1024
+    return result
+
+
+def run_reopen(args) -> float:
+    """Time a cold interpreter opening the already-populated store."""
+    code = (
+        "import sys, time; t0 = time.perf_counter(); "
+        f"sys.path.insert(0, {str(ROOT)!r}); sys.path.insert(0, {str(ROOT / 'benchmarks')!r}); "
+        "from core.config import config; "
+        f"config.load({str(Path(args.workdir) / 'config.yaml')!r}); "
+        "from knowledge.vector_store import create_vector_store; "
+        "from vector_store import _fake_embedding; "
+        f"s = create_vector_store(embedding_function=_fake_embedding({args.dim})); s.count(); "
+        "print(time.perf_counter() - t0)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector store backend benchmark")
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--ivf-lists", type=int, default=0, help="IVF lists for the numpy backend (0 = exact)")
+    parser.add_argument("--backends", default="chroma,numpy")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args)
+        result["reopen_s"] = run_reopen(args)
+        print(json.dumps(result))
+        return
+
+    rows = []
+    for backend in args.backends.split(","):
+        with tempfile.TemporaryDirectory(prefix=f"bench-{backend}-") as workdir:
+            cmd = [
+                sys.executable, __file__, "--worker", backend, "--workdir", workdir,
+                "--docs", str(args.docs), "--queries", str(args.queries),
+                "--dim", str(args.dim), "--ivf-lists", str(args.ivf_lists),
+            ]
+            out = subprocess.run(cmd, capture_output=True, text=True, env={**os.environ, "PYTHONUTF8": "1"})
+            if out.returncode != 0:
+                print(f"[{backend}] failed:\n{out.stderr}", file=sys.stderr)
+                continue
+            rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    cols = ["backend", "open_s", "reopen_s", "insert_per_s", "query_p50_ms",
+            "query_p95_ms", "filtered_p50_ms", "list_page_ms", "max_rss_mb"]
+    print(f"docs={args.docs} queries={args.queries} dim={args.dim} ivf_lists={args.ivf_lists}")
+    print("  ".join(f"{c:>15}" for c in cols))
+    for r in rows:
+        print("  ".join(
+            f"{r[c]:>15.3f}" if isinstance(r.get(c), float) else f"{str(r.get(c)):>15}" for c in cols
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,24 @@
 import sys
 import os
-import subprocess
 from pathlib import Path
 
 
+def _enable_utf8_io():
+    """Switch this interpreter's console I/O to UTF-8.
+
+    All file reads in the project pass encoding="utf-8" explicitly, so only
+    the standard streams depend on the locale (cp1252/ASCII on many Windows
+    consoles). Child processes inherit UTF-8 mode through the environment.
+    """
+    for stream in (sys.stdin, sys.stdout, sys.stderr):
+        if stream is not None and hasattr(stream, "reconfigure"):
+            stream.reconfigure(encoding="utf-8", errors="replace" if stream is not sys.stdin else "strict")
+    os.environ["PYTHONUTF8"] = "1"
+    os.environ["PYTHONIOENCODING"] = "utf-8"
+
+
 def main():
     """hi vcbal 命令入口"""
-    python_path = sys.executable
     main_path = Path(__file__).resolve().with_name("main.py")
 
     # 透传参数，比如 hi vcbal server → 启动 server 模式
@@ -16,14 +28,22 @@ def main():
     if args and args[0] == "vcbal":
         args = args[1:]
 
-    # Force UTF-8 mode so Chinese characters in .mo/.yaml files decode correctly
-    # on Windows where the default codec is often ASCII or cp1252.
-    env = os.environ.copy()
-    env["PYTHONUTF8"] = "1"
-    env["PYTHONIOENCODING"] = "utf-8"
+    # Force UTF-8 so Chinese text prints correctly on Windows consoles where
+    # the default codec is often ASCII or cp1252. By default this is done in
+    # this interpreter; SKILLAGENT_EXEC_UTF8=1 instead replaces the process
+    # with one running in full UTF-8 mode (os.execv, POSIX only).
+    if not sys.flags.utf8_mode and os.environ.get("SKILLAGENT_EXEC_UTF8") == "1" and os.name == "posix":
+        env = dict(os.environ, PYTHONUTF8="1", PYTHONIOENCODING="utf-8")
+        os.execve(sys.executable, [sys.executable, "-X", "utf8", str(main_path)] + args, env)
+    _enable_utf8_io()
+
+    # Run main.py in this interpreter instead of spawning a second one
+    sys.path.insert(0, str(main_path.parent))
+    sys.argv = [str(main_path)] + args
+    import main as entry
 
     try:
-        subprocess.run([python_path, str(main_path)] + args, env=env)
+        entry.main()
     except KeyboardInterrupt:
         pass
 
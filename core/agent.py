@@ -2,97 +2,499 @@
 Agent orchestrator - the brain that coordinates LLM, skills, and context.
 """
 
+import hashlib
 import json
+import logging
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from core.cancellation import Cancelled, check as check_cancelled
 from core.llm import LLMClient
 from core.context import ContextManager
 from core.config import config
-from skills.registry import SkillRegistry
+from core.router import IntentRouter, router_stats
+from core.tokens import compact_text, estimate_tokens, token_stats
+from core.tool_selector import MORE_TOOLS, ToolSelector, expansion_result, selection_stats
+from skills.base import SkillFailure
+from skills.registry import SkillRegistry, canonical_args
+
+# Built-in skills as "module:Class" import targets
+BUILTIN_SKILLS = [
+    "skills.web_search:WebSearchSkill",
+    "skills.knowledge_skill:KnowledgeSkill",
+    "skills.datetime_skill:DateTimeSkill",
+    "skills.weather_skill:WeatherSkill",
+    "skills.divination_skill:DivinationSkill",
+    "skills.tarot_career_skill:TarotCareerSkill",
+    "skills.lucky_today_skill:LuckyTodaySkill",
+    "skills.almanac_skill:AlmanacSkill",
+]
+
+logger = logging.getLogger(__name__)
+
+# Background threads for work that overlaps with turn preparation
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _background() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="agent-bg")
+    return _executor
+
+
+def _parse_arguments(raw: str) -> dict:
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return {}
 
 
 class Agent:
     """Main agent that orchestrates LLM calls with tool/skill execution."""
 
-    def __init__(self):
-        self.llm = LLMClient()
+    def __init__(self, llm: LLMClient = None, registry: SkillRegistry = None):
+        # llm/registry may be shared between agents (e.g. daemon sessions);
+        # each agent keeps its own conversation context.
+        self.llm = llm or LLMClient()
         self.context = ContextManager()
-        self.registry = SkillRegistry()
+        # Usage ledger attribution: conversation id, turn and LLM call within the turn
+        self.session_id = uuid.uuid4().hex
+        self.turn = 0
+        self._iteration = 0
+        # Hash of the system prompt + tools of the last LLM call (prefix cache diagnostics)
+        self._prefix_hash = None
+        # Cancellation event of the running turn (see chat())
+        self._cancel: threading.Event | None = None
+        self.registry = registry or SkillRegistry()
         self.max_tool_calls = config.get("agent.max_tool_calls", 5)
+        self.router = IntentRouter(self.registry) if config.get("agent.router.enabled", True) else None
+        self.tool_result_tokens = config.get("agent.tool_result_tokens", 800)
+        # stub | result | off - see _dedupe_key()
+        self.dedupe_tool_calls = config.get("agent.dedupe_tool_calls", "stub")
+        # Stream completions and start each tool call as soon as it is complete
+        self.eager_tools = config.get("agent.eager_tools", False)
+        # Offers a relevant subset of skills per turn once there are many
+        self.tool_selector = ToolSelector(self.registry)
+        # Skills called in the last tool-using turn, kept in the next subset
+        self._recent_tools: list[str] = []
 
     def register_default_skills(self):
-        """Register all built-in skills."""
-        from skills.web_search import WebSearchSkill
-        from skills.knowledge_skill import KnowledgeSkill
-        from skills.datetime_skill import DateTimeSkill
-        from skills.weather_skill import WeatherSkill
-        from skills.divination_skill import DivinationSkill
-        from skills.tarot_career_skill import TarotCareerSkill
-        from skills.lucky_today_skill import LuckyTodaySkill
-        from skills.almanac_skill import AlmanacSkill
-
-        self.registry.register(WebSearchSkill())
-        self.registry.register(KnowledgeSkill())
-        self.registry.register(DateTimeSkill())
-        self.registry.register(WeatherSkill())
-        self.registry.register(DivinationSkill())
-        self.registry.register(TarotCareerSkill())
-        self.registry.register(LuckyTodaySkill())
-        self.registry.register(AlmanacSkill())
-
-    def chat(self, user_input: str) -> str:
+        """Register built-in skills, configured plugins and entry-point plugins.
+
+        Skills are registered lazily: only their metadata is read here, and
+        each module is imported the first time its skill is executed.
+        """
+        for target in BUILTIN_SKILLS:
+            self.registry.register_lazy(target)
+
+        # skills.plugins: "module:Class" strings or {target, name, description, parameters}
+        for entry in config.get("skills.plugins", []) or []:
+            if isinstance(entry, str):
+                self.registry.register_lazy(entry)
+            else:
+                meta = {k: v for k, v in entry.items() if k != "target"}
+                self.registry.register_lazy(entry["target"], meta)
+
+        if config.get("skills.entry_points", True):
+            self.registry.discover_entry_points()
+
+    def chat(self, user_input: str, on_event=None, cancel: threading.Event = None) -> str:
         """
         Process user input and return agent response.
         Handles multi-turn tool calling automatically.
+
+        Args:
+            user_input: The user's message
+            on_event: Optional callback receiving progress events, e.g.
+                {"type": "tool", "name": "web_search"} before a skill runs
+            cancel: Optional event that abandons the turn once set (e.g. the
+                API client disconnected): the LLM stream is closed, running
+                skills are no longer waited for, and the conversation is
+                restored to its state before the turn.
+
+        Raises:
+            core.cancellation.Cancelled: *cancel* was set before the turn finished
         """
+        snapshot = self.context.snapshot()
+        self._cancel = cancel
+        try:
+            return self._chat(user_input, on_event)
+        except Cancelled:
+            # Drop the user message and any partial tool results of this turn
+            self.context.restore(snapshot)
+            logger.info("Turn %d of session %s cancelled", self.turn, self.session_id)
+            raise
+        finally:
+            self._cancel = None
+
+    def _chat(self, user_input: str, on_event=None) -> str:
+        started = time.perf_counter()
+        self.turn += 1
+        self._iteration = 0
+        # Skill calls in this turn must finish within the turn budget
+        deadline = time.monotonic() + config.get("agent.turn_budget", 60)
+        # Obvious skill requests ("今天几号") skip the tool-selection round-trip
+        route = self.router.route(user_input) if self.router else None
+
+        # Look up the knowledge base while the rest of the turn is prepared
+        retrieval = None if route else self._start_retrieval(user_input)
+
         self.context.add_user_message(user_input)
+        if route:
+            answer = self._answer_routed(*route, started=started, deadline=deadline, on_event=on_event)
+            if answer is not None:
+                return answer
+            # The routed call failed; let the LLM pick the tool and arguments
+            retrieval = self._start_retrieval(user_input)
+        router_stats.record_turn()
 
-        tools = self.registry.get_openai_tools()
+        # None = all skills; otherwise the names offered this turn
+        offered = self.tool_selector.select(user_input, self._recent_tools)
+        tools = self.tool_selector.tools_for(offered)
+        # Skills called this turn; replaces _recent_tools once a call is made
+        called: list[str] = []
+        # Longest the first LLM call waits for the knowledge lookup
+        wait = config.get("knowledge.auto_retrieve.timeout", 0.3)
         iterations = 0
+        # Successful skill results of this turn, by (name, canonical args)
+        turn_results: dict[tuple[str, str], str] = {}
 
         while iterations < self.max_tool_calls:
             iterations += 1
+            # Knowledge hits join the turn as soon as the lookup is done
+            if retrieval is not None and self._attach_retrieval(retrieval, wait if iterations == 1 else 0):
+                retrieval = None
 
-            # Call LLM
-            response_msg = self.llm.chat(
+            # Call LLM; in eager mode skills start while it is still streaming
+            started_calls = {}
+            response_msg = self._llm_chat(
                 messages=self.context.get_messages(),
                 tools=tools if tools else None,
+                on_tool_call=self._dispatcher(started_calls, turn_results, deadline, on_event)
+                if self.eager_tools and tools else None,
             )
 
+            check_cancelled(self._cancel)
             # If no tool calls, we have the final answer
             if not response_msg.tool_calls:
-                answer = response_msg.content or ""
-                self.context.add_assistant_message(answer)
-                return answer
+                return self._finish_turn(response_msg.content or "")
 
-            # Process tool calls
+            # Process tool calls; results are committed in call order
             self.context.add_assistant_tool_calls(response_msg)
+            self._recent_tools = called
 
             for tool_call in response_msg.tool_calls:
                 func_name = tool_call.function.name
-                try:
-                    func_args = json.loads(tool_call.function.arguments)
-                except json.JSONDecodeError:
-                    func_args = {}
+                func_args = _parse_arguments(tool_call.function.arguments)
+
+                # The model asked for more tools, or for one outside the
+                # subset: offer every skill for the rest of the turn
+                if func_name == MORE_TOOLS or (offered is not None and func_name not in offered):
+                    if offered is not None:
+                        offered = None
+                        tools = self.tool_selector.tools_for(None)
+                        selection_stats.record_expansion()
+                    if func_name == MORE_TOOLS:
+                        self.context.add_tool_result(
+                            tool_call_id=tool_call.id,
+                            name=func_name,
+                            content=expansion_result(),
+                        )
+                        continue
+                called.append(func_name)
 
-                # Execute the skill
-                result = self.registry.execute(func_name, func_args)
+                key = self._dedupe_key(func_name, func_args)
+                if key in turn_results:
+                    # Same skill and arguments already ran this turn
+                    self.context.add_tool_result(
+                        tool_call_id=tool_call.id,
+                        name=func_name,
+                        content=self._duplicate_result(func_name, turn_results[key]),
+                    )
+                    continue
 
-                # Add result to context
+                if tool_call.id in started_calls:
+                    raw = started_calls[tool_call.id].result()
+                else:
+                    # Execute the skill
+                    if on_event:
+                        on_event({"type": "tool", "name": func_name})
+                    raw = self.registry.execute(func_name, func_args, deadline=deadline, cancel=self._cancel)
+
+                # Add result to context, trimmed to the skill's token budget
+                result = self._compact_result(func_name, str(raw))
                 self.context.add_tool_result(
                     tool_call_id=tool_call.id,
                     name=func_name,
-                    content=str(result),
+                    content=result,
                 )
+                # Failures are not reused, so a repeated call retries them
+                if key is not None and not isinstance(raw, SkillFailure):
+                    turn_results[key] = result
 
         # Exhausted tool-call iterations - ask LLM for a final answer without tools
         from core.i18n import _
-        response_msg = self.llm.chat(
+        response_msg = self._llm_chat(
             messages=self.context.get_messages(),
             tools=None,
         )
         answer = response_msg.content or _("Sorry, something went wrong. Please try again.")
+        return self._finish_turn(answer)
+
+    def _dispatcher(self, started_calls: dict, turn_results: dict, deadline: float, on_event=None):
+        """on_tool_call callback that starts skills while the completion streams.
+
+        Futures are stored in *started_calls* by tool call id. Calls that
+        repeat a result of this turn, or a call already started from the
+        same response, are left for the ordered commit to deduplicate.
+        Only read-only skills start early: a call that may change state, and
+        every call after it in the response, runs in order in the commit.
+        """
+        started_keys = set()
+        wrote = False
+
+        def dispatch(tool_call):
+            nonlocal wrote
+            name = tool_call.function.name
+            if name == MORE_TOOLS or wrote:
+                return
+            if not self._read_only(name):
+                wrote = True
+                return
+            args = _parse_arguments(tool_call.function.arguments)
+            key = self._dedupe_key(name, args)
+            if key is not None and (key in turn_results or key in started_keys):
+                return
+            started_keys.add(key)
+            if on_event:
+                on_event({"type": "tool", "name": name})
+            started_calls[tool_call.id] = _background().submit(
+                self.registry.execute, name, args, deadline=deadline, cancel=self._cancel,
+            )
+
+        return dispatch
+
+    def _dedupe_key(self, name: str, args: dict) -> tuple[str, str] | None:
+        """Key identifying repeated calls within a turn.
+
+        None when deduplication is off or the skill may change state, so
+        that e.g. list, delete, list runs all three calls.
+        """
+        if self.dedupe_tool_calls == "off" or not self._read_only(name):
+            return None
+        return name, canonical_args(self.registry.get(name), args)
+
+    def _read_only(self, name: str) -> bool:
+        """Whether calls to the skill only read state (cacheable or read_only)."""
+        skill = self.registry.get(name)
+        return skill is not None and (skill.read_only or skill.cacheable)
+
+    def _duplicate_result(self, name: str, previous: str) -> str:
+        """Tool message for a call that repeats one made earlier this turn."""
+        if self.dedupe_tool_calls == "result":
+            content = previous
+        else:
+            from core.prompt_loader import text
+            content = text(
+                "duplicate_tool_call",
+                "Same call as earlier in this turn; see the previous {name} result above.",
+            ).format(name=name)
+        token_stats.record_duplicate(estimate_tokens(previous) - estimate_tokens(content))
+        logger.info("Skipped duplicate %s call (%d this process)", name, token_stats.duplicates)
+        return content
+
+    def _compact_result(self, name: str, result: str) -> str:
+        """Fit a skill result into its token budget before it enters the context."""
+        skill = self.registry.get(name)
+        budget = getattr(skill, "max_result_tokens", None) or self.tool_result_tokens
+        before = estimate_tokens(result)
+        if budget and before > budget:
+            result = compact_text(result, budget)
+        token_stats.record_result(before, estimate_tokens(result))
+        return result
+
+    def _finish_turn(self, answer: str) -> str:
+        """Record the final answer and shrink tool results from earlier turns."""
         self.context.add_assistant_message(answer)
+        if config.get("agent.stub_tool_results.enabled", True):
+            keep_turns = config.get("agent.stub_tool_results.keep_turns", 1)
+            token_stats.record_stubs(*self.context.stub_tool_results(keep_turns))
+        return answer
+
+    def _llm_chat(self, messages: list, tools: list = None, on_tool_call=None):
+        """Call the LLM, feeding its latency to the router's savings estimate.
+
+        With *on_tool_call* the completion is streamed and each tool call is
+        handed to it as soon as its arguments are complete.
+
+        In prompt cache mode calls without tools still send the stable tool
+        list (with tool_choice "none"), so they share the cached prefix.
+
+        Cancellable turns stream (llm.cancel_stream), so a cancellation can
+        close the connection while the model is still generating; those
+        streams always ask for token usage so the ledger stays complete.
+        With cancel_stream off they make a plain call and cancellation is
+        only checked around it.
+        """
+        from core.llm import track_usage
+        from core.usage import record_llm_call
+
+        kwargs = {}
+        if tools is None and self.tool_selector.stable and self.registry.list_skills():
+            tools = self.registry.get_openai_tools(stable=True)
+            kwargs["tool_choice"] = "none"
+        check_cancelled(self._cancel)
+        stream = on_tool_call is not None
+        if self._cancel is not None and getattr(self.llm, "cancel_stream", False):
+            kwargs["cancel"] = self._cancel
+            if not stream:
+                # Streaming only to be cancellable: keep usage in the ledger
+                stream = True
+                kwargs["stream_usage"] = True
+        t0 = time.perf_counter()
+        with track_usage() as usage:
+            if stream:
+                response = self.llm.chat_stream(messages=messages, tools=tools, on_tool_call=on_tool_call, **kwargs)
+            else:
+                response = self.llm.chat(messages=messages, tools=tools, **kwargs)
+        check_cancelled(self._cancel)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        router_stats.record_llm_call(elapsed_ms)
+        token_stats.record_prompt(usage["prompt_tokens"], usage["cached_tokens"], self._prefix_changed(messages, tools))
+        record_llm_call(self.session_id, self.turn, self._iteration, messages, tools, usage,
+                        elapsed_ms, model=getattr(self.llm, "model", None))
+        self._iteration += 1
+        return response
+
+    def _prefix_changed(self, messages: list, tools: list = None) -> bool:
+        """Whether the leading system message + tools differ from the previous call's."""
+        prefix = json.dumps([messages[0] if messages else None, tools], ensure_ascii=False)
+        digest = hashlib.sha1(prefix.encode("utf-8")).hexdigest()
+        changed = self._prefix_hash is not None and digest != self._prefix_hash
+        self._prefix_hash = digest
+        return changed
+
+    def _answer_routed(self, name: str, kwargs: dict, started: float, deadline: float = None,
+                       on_event=None) -> str | None:
+        """Run a router-selected skill directly and answer from its result.
+
+        agent.router.mode "llm" phrases the result with one LLM call (the
+        skill call is recorded in the context as if the model had made it);
+        "template" returns the skill output, in its pretty form, as the reply
+        with no LLM call.
+
+        Returns None, leaving the context untouched, when the skill call
+        fails: the router may have guessed wrong arguments, so the turn
+        falls back to the normal tool loop.
+        """
+        if on_event:
+            on_event({"type": "tool", "name": name})
+        template = config.get("agent.router.mode", "llm") == "template"
+        result = self.registry.execute(
+            name, kwargs, deadline=deadline, style="pretty" if template else None, cancel=self._cancel,
+        )
+        if isinstance(result, SkillFailure):
+            logger.info("Routed %s call failed, falling back to the LLM: %s", name, result)
+            return None
+        result = str(result)
+        self._recent_tools = [name]
+
+        if template:
+            answer = self._finish_turn(result)
+            calls_saved = 2
+        else:
+            call = SimpleNamespace(
+                # Deterministic (one routed call per turn) so recorded
+                # conversations replay with exact cassette matching
+                id=f"route_{self.turn}",
+                function=SimpleNamespace(name=name, arguments=json.dumps(kwargs, ensure_ascii=False)),
+            )
+            self.context.add_assistant_tool_calls(SimpleNamespace(content="", tool_calls=[call]))
+            result = self._compact_result(name, result)
+            self.context.add_tool_result(tool_call_id=call.id, name=name, content=result)
+            response_msg = self._llm_chat(messages=self.context.get_messages(), tools=None)
+            answer = self._finish_turn(response_msg.content or result)
+            calls_saved = 1
+
+        router_stats.record_turn(name, calls_saved, (time.perf_counter() - started) * 1000)
         return answer
 
+    def _start_retrieval(self, user_input: str):
+        """Submit the automatic knowledge lookup for this turn (or return None).
+
+        Nothing is looked up until the vector store is open (server warm-up
+        or a knowledge_manage call), so sessions that never use the
+        knowledge base do not load it.
+        """
+        if not config.get("knowledge.auto_retrieve.enabled", True):
+            return None
+        from knowledge.knowledge_manager import KnowledgeManager
+        if not KnowledgeManager().is_loaded:
+            return None
+        # Recent turns help resolve follow-ups like "and what about the second one?"
+        recent = self.context.get_summary_context()[-300:]
+        query = f"{recent}\n{user_input}" if recent else user_input
+        top_k = config.get("knowledge.auto_retrieve.top_k", 3)
+
+        def search():
+            return KnowledgeManager().search(query, top_k=top_k)
+
+        return _background().submit(search)
+
+    def _attach_retrieval(self, future, timeout: float = 0) -> bool:
+        """Put close hits of the lookup into the turn context.
+
+        Waits at most *timeout* seconds; returns False if the lookup is
+        still running, so a later LLM call of the turn can pick it up.
+        """
+        try:
+            hits = future.result(timeout=timeout)
+        except FutureTimeout:
+            return False
+        except Exception:
+            return True
+        self.context.set_turn_context(self._format_hits(hits))
+        return True
+
+    def _format_hits(self, hits: list[dict]) -> str:
+        """Format close knowledge hits as a context block ("" if none)."""
+        max_distance = config.get("knowledge.auto_retrieve.max_distance", 0.4)
+        budget = config.get("knowledge.auto_retrieve.max_chars", 1200)
+        lines = []
+        for hit in hits:
+            if hit.get("distance") is None or hit["distance"] > max_distance:
+                continue
+            tags = (hit.get("metadata") or {}).get("tags", "")
+            entry = f"- [{hit['id']}] {hit['text']}" + (f" (tags: {tags})" if tags else "")
+            if len(entry) > budget:
+                if budget < 80:
+                    break
+                entry = entry[:budget - 3] + "..."
+            lines.append(entry)
+            budget -= len(entry)
+        if not lines:
+            return ""
+
+        from core.prompt_loader import text
+        header = text(
+            "knowledge_context",
+            "Entries from the user's personal knowledge base that look relevant to the next message. "
+            "Use them if they help; they were retrieved automatically, so there is no need to search "
+            "the knowledge base again for the same thing.",
+        )
+        return header + "\n" + "\n".join(lines)
+
     def reset(self):
         """Reset conversation history."""
         self.context.clear()
+        # A new conversation for the usage ledger
+        self.session_id = uuid.uuid4().hex
+        self.turn = 0
+        self._prefix_hash = None
+        self._recent_tools = []
@@ -0,0 +1,22 @@
+"""
+Cooperative cancellation of an agent turn.
+
+The API sets a threading.Event when the client that asked for a turn goes
+away. Agent.chat() passes it on to the LLM client (which stops reading the
+streamed completion) and to SkillRegistry.execute() (which stops waiting
+for the skill; skills can poll skills.base.cancelled() between upstream
+calls). Whoever notices the event raises Cancelled, and the agent restores
+the conversation to where the turn started.
+"""
+
+import threading
+
+
+class Cancelled(Exception):
+    """The turn was cancelled; its partial results were discarded."""
+
+
+def check(event: threading.Event | None):
+    """Raise Cancelled if *event* is set."""
+    if event is not None and event.is_set():
+        raise Cancelled("Turn cancelled")
@@ -0,0 +1,163 @@
+"""
+Record/replay of external calls (LLM completions, skill HTTP requests).
+
+With ``cassette.mode: record`` every LLM completion and upstream request
+made through active() is appended to a cassette file, one JSON object per
+line (gzip-compressed when the path ends in .gz). With ``mode: replay`` the
+same calls are answered from the file instead, optionally sleeping for the
+recorded latency, so a recorded conversation can be re-run offline and
+deterministically - e.g. to compare context strategies or skill caches.
+
+Matching (``cassette.match``):
+    exact     a call is answered by a recording of an identical request
+              (repeated requests are served in recorded order)
+    sequence  calls of each kind are answered in recorded order whatever
+              their content - needed when the change under test alters the
+              requests themselves, such as a different context strategy
+
+Only responses and a request hash are stored, which keeps cassettes small.
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+from core.config import config
+
+
+class CassetteError(RuntimeError):
+    """A replayed call has no recording, or its recording was a failure."""
+
+
+def request_key(kind: str, request) -> str:
+    """Stable hash of a request (JSON-serialisable) for exact matching."""
+    canonical = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{kind}\n{canonical}".encode()).hexdigest()[:20]
+
+
+def _open(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class Cassette:
+    """One cassette file in record or replay mode."""
+
+    def __init__(self, path: str, mode: str, match: str = "exact",
+                 replay_latency: bool = False, latency_scale: float = 1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode {mode!r}")
+        self.path = Path(path)
+        self.mode = mode
+        self.match = match
+        self.replay_latency = replay_latency
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._file = None
+        self._by_key: dict[str, deque] = defaultdict(deque)
+        self._by_kind: dict[str, deque] = defaultdict(deque)
+        if mode == "replay":
+            self._load()
+
+    def _load(self):
+        with _open(self.path, "r") as f:
+            try:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    self._by_key[entry["key"]].append(entry)
+                    self._by_kind[entry["kind"]].append(entry)
+            except EOFError:
+                # gzip stream of a recording process that was killed; every
+                # line was flushed, only the end marker is missing
+                pass
+
+    def call(self, kind: str, request, fn):
+        """
+        Run *fn* (record) or answer from the cassette (replay).
+
+        Args:
+            kind: Call category, e.g. "llm" or "http"
+            request: JSON-serialisable description of the call, used for matching
+            fn: Zero-argument callable making the real call; its result must
+                be JSON-serialisable
+
+        Raises:
+            CassetteError: replay found no matching recording, or the
+                recorded call failed (its message is re-raised)
+        """
+        key = request_key(kind, request)
+        if self.mode == "replay":
+            return self._replay(kind, key)
+
+        t0 = time.perf_counter()
+        entry = {"kind": kind, "key": key}
+        try:
+            result = fn()
+            entry["response"] = result
+            return result
+        except Exception as e:
+            entry["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            entry["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            self._append(entry)
+
+    def _append(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = _open(self.path, "a")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def _replay(self, kind: str, key: str):
+        with self._lock:
+            queue = self._by_kind[kind] if self.match == "sequence" else self._by_key[key]
+            if not queue:
+                raise CassetteError(f"No recorded {kind} call left in {self.path} (key {key})")
+            entry = queue.popleft() if len(queue) > 1 else queue[0]
+        if self.replay_latency:
+            time.sleep(entry.get("ms", 0) / 1000 * self.latency_scale)
+        if "error" in entry:
+            raise CassetteError(entry["error"])
+        return entry["response"]
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_cassette: Cassette | None = None
+_cassette_lock = threading.Lock()
+
+
+def active() -> Cassette | None:
+    """The cassette configured under ``cassette`` (None when mode is off)."""
+    global _cassette
+    mode = config.get("cassette.mode", "off")
+    # YAML reads a bare `off` as False
+    if not mode or mode == "off":
+        return None
+    if _cassette is None:
+        with _cassette_lock:
+            if _cassette is None:
+                _cassette = Cassette(
+                    config.get("cassette.path", "data/cassettes/session.jsonl.gz"),
+                    mode,
+                    match=config.get("cassette.match", "exact"),
+                    replay_latency=config.get("cassette.replay_latency", False),
+                    latency_scale=config.get("cassette.latency_scale", 1.0),
+                )
+                atexit.register(_cassette.close)
+    return _cassette
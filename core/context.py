@@ -12,18 +12,41 @@ class ContextManager:
     def __init__(self, system_prompt: str = None):
         self.system_prompt = system_prompt or config.get("agent.system_prompt", "You are a helpful assistant.")
         self.max_history = config.get("agent.max_history", 20)
+        # Prompt cache mode: trim in chunks at turn boundaries (see _trim)
+        self.prompt_cache = config.get("agent.prompt_cache.enabled", False)
+        self.trim_chunk = config.get("agent.prompt_cache.trim_chunk", 5)
         self.messages: list[dict] = []
+        # Extra system context for the current turn only (e.g. retrieved
+        # knowledge); not stored in history, cleared by the next user message
+        self.turn_context: str = ""
 
     def get_messages(self) -> list[dict]:
         """Get full message list including system prompt."""
         system_msg = {"role": "system", "content": self.system_prompt}
-        return [system_msg] + self.messages
+        # Drop bookkeeping keys the chat API does not accept
+        messages = [system_msg] + [
+            {k: v for k, v in m.items() if k != "stubbed"} if "stubbed" in m else m
+            for m in self.messages
+        ]
+        if self.turn_context:
+            # Place it right before the latest user message
+            last_user = max(
+                (i for i, m in enumerate(messages) if m["role"] == "user"),
+                default=len(messages),
+            )
+            messages.insert(last_user, {"role": "system", "content": self.turn_context})
+        return messages
 
     def add_user_message(self, content: str):
         """Add a user message and trim history if needed."""
+        self.turn_context = ""
         self.messages.append({"role": "user", "content": content})
         self._trim()
 
+    def set_turn_context(self, content: str):
+        """Attach system context to the current turn (empty string clears it)."""
+        self.turn_context = content or ""
+
     def add_assistant_message(self, content: str):
         """Add an assistant text message."""
         self.messages.append({"role": "assistant", "content": content})
@@ -56,9 +79,64 @@ class ContextManager:
             "content": content,
         })
 
+    def stub_tool_results(self, keep_turns: int = 1) -> tuple[int, int]:
+        """Replace tool results older than the last *keep_turns* turns with stubs.
+
+        The tool messages themselves stay (every tool call needs its result);
+        only their content shrinks to a one-line preview. In prompt cache
+        mode results are stubbed in batches, once the oldest one is
+        trim_chunk turns past the boundary, so the history prefix stays
+        byte-identical in between (as with _trim).
+
+        Returns:
+            (number of results stubbed, estimated tokens removed)
+        """
+        from core.prompt_loader import text
+        from core.tokens import clip, estimate_tokens
+
+        user_turns = [i for i, m in enumerate(self.messages) if m["role"] == "user"]
+        if len(user_turns) <= keep_turns:
+            return 0, 0
+        boundary = user_turns[-keep_turns] if keep_turns else len(self.messages)
+        template = text("tool_result_stub", "[Earlier {name} result removed to save context: {preview}]")
+
+        pending = []
+        for i, msg in enumerate(self.messages[:boundary]):
+            if msg["role"] != "tool" or msg.get("stubbed"):
+                continue
+            preview = clip(" ".join(msg["content"].split()), 80)
+            stub = template.format(name=msg.get("name", "tool"), preview=preview)
+            if estimate_tokens(stub) < estimate_tokens(msg["content"]):
+                pending.append((i, msg, stub))
+        if self.prompt_cache and pending:
+            age = sum(1 for i in user_turns if pending[0][0] < i <= boundary)
+            if age < self.trim_chunk:
+                return 0, 0
+
+        count = saved = 0
+        for _, msg, stub in pending:
+            before = estimate_tokens(msg["content"])
+            msg["content"] = stub
+            msg["stubbed"] = True
+            count += 1
+            saved += before - estimate_tokens(stub)
+        return count, saved
+
+    def snapshot(self) -> tuple:
+        """State to restore() if the current turn is abandoned.
+
+        Messages are only appended or replaced during a turn (stubbing runs
+        after its answer), so a shallow copy of the list is enough.
+        """
+        return list(self.messages), self.turn_context
+
+    def restore(self, snapshot: tuple):
+        self.messages, self.turn_context = list(snapshot[0]), snapshot[1]
+
     def clear(self):
         """Clear conversation history."""
         self.messages.clear()
+        self.turn_context = ""
 
     def get_summary_context(self) -> str:
         """Get a text summary of recent conversation for knowledge retrieval context."""
@@ -70,7 +148,21 @@ class ContextManager:
         return "\n".join(parts)
 
     def _trim(self):
-        """Trim history to max_history messages (preserving pairs)."""
+        """Trim history to max_history messages (preserving pairs).
+
+        In prompt cache mode trim_chunk more turns are dropped at once and
+        the history always starts at a user message, so the trimmed prefix
+        stays byte-identical - and cacheable - for the next several turns
+        instead of shifting on every one.
+        """
         max_msgs = self.max_history * 2  # Each round = user + assistant
-        if len(self.messages) > max_msgs:
+        if len(self.messages) <= max_msgs:
+            return
+        if not self.prompt_cache:
             self.messages = self.messages[-max_msgs:]
+            return
+        cut = len(self.messages) - max(max_msgs - self.trim_chunk * 2, 1)
+        # The turn that is being added must survive
+        last_user = max(i for i, m in enumerate(self.messages) if m["role"] == "user")
+        starts = [i for i, m in enumerate(self.messages) if m["role"] == "user" and i >= cut]
+        self.messages = self.messages[min(starts[0] if starts else last_user, last_user):]
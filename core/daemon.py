@@ -0,0 +1,287 @@
+"""
+Warm background daemon for the `hi` CLI.
+
+The daemon keeps one LLM client and one skill registry loaded and serves
+chat sessions over a local Unix domain socket, so a new terminal only pays
+for connecting instead of rebuilding the agent.
+
+Protocol: newline-delimited JSON. The client sends one request line
+    {"op": "chat", "session": "<id>", "message": "..."}
+and reads event lines until one has "type" "done" or "error":
+    {"type": "tool", "name": "web_search"}
+    {"type": "done", "reply": "..."}
+Other ops: ping, reset, skills, shutdown.
+
+Each terminal gets its own conversation, keyed by a session id derived from
+the controlling TTY (override with SKILLAGENT_SESSION). The daemon exits by
+itself after ``daemon.idle_timeout`` seconds without requests.
+"""
+
+import getpass
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from core.config import config
+
+
+def socket_path() -> Path:
+    """Path of the daemon socket (``daemon.socket_path`` or a per-user default)."""
+    path = config.get("daemon.socket_path", "")
+    if path:
+        return Path(path).expanduser()
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(base) / f"skillagent-{getpass.getuser()}.sock"
+
+
+def session_id() -> str:
+    """Identify the current terminal so each one keeps its own conversation."""
+    if os.environ.get("SKILLAGENT_SESSION"):
+        return os.environ["SKILLAGENT_SESSION"]
+    for fd in (0, 1, 2):
+        try:
+            return os.ttyname(fd)
+        except (OSError, AttributeError):
+            continue
+    # No terminal (piped input): one session per parent shell
+    return f"ppid-{os.getppid()}"
+
+
+def supported() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+class _Session:
+    def __init__(self, agent):
+        self.agent = agent
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            self._send({"type": "error", "error": "invalid request"})
+            return
+        self.server.daemon_state.handle(request, self._send)
+
+    def _send(self, event: dict):
+        self.wfile.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class AgentDaemon:
+    """Serves agent sessions over a Unix socket until idle or told to stop."""
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path) if path else socket_path()
+        self.idle_timeout = config.get("daemon.idle_timeout", 1800)
+        self.session_ttl = config.get("daemon.session_ttl", 3600)
+        self._sessions: dict[str, _Session] = {}
+        self._sessions_lock = threading.Lock()
+        self._active = 0
+        self._last_activity = time.monotonic()
+        self._llm = None
+        self._registry = None
+        self._server = None
+
+    # -- agents ------------------------------------------------------------
+
+    def _warm_up(self):
+        """Build the shared LLM client and skill registry once."""
+        from core.agent import Agent
+
+        template = Agent()
+        template.register_default_skills()
+        self._llm = template.llm
+        self._registry = template.registry
+        if config.get("knowledge.warm_up", True):
+            from knowledge.knowledge_manager import KnowledgeManager
+            threading.Thread(target=KnowledgeManager().warm_up, daemon=True).start()
+
+    def _session(self, sid: str) -> _Session:
+        from core.agent import Agent
+
+        now = time.monotonic()
+        with self._sessions_lock:
+            for key in [k for k, s in self._sessions.items() if now - s.last_used > self.session_ttl]:
+                del self._sessions[key]
+            session = self._sessions.get(sid)
+            if session is None:
+                session = self._sessions[sid] = _Session(Agent(llm=self._llm, registry=self._registry))
+            session.last_used = now
+            return session
+
+    # -- requests ----------------------------------------------------------
+
+    def handle(self, request: dict, send):
+        from core.cancellation import Cancelled
+
+        with self._sessions_lock:
+            self._active += 1
+            self._last_activity = time.monotonic()
+        try:
+            self._dispatch(request, send)
+        except (BrokenPipeError, ConnectionResetError, Cancelled):
+            # Client went away (e.g. Ctrl+C); the turn result is discarded
+            pass
+        except Exception as e:
+            try:
+                send({"type": "error", "error": str(e)})
+            except OSError:
+                pass
+        finally:
+            with self._sessions_lock:
+                self._active -= 1
+                self._last_activity = time.monotonic()
+
+    def _dispatch(self, request: dict, send):
+        op = request.get("op")
+        if op == "ping":
+            send({"type": "done", "pid": os.getpid(), "sessions": len(self._sessions)})
+        elif op == "skills":
+            send({"type": "done", "skills": self._registry.list_skills()})
+        elif op == "reset":
+            session = self._session(request.get("session", ""))
+            with session.lock:
+                session.agent.reset()
+            send({"type": "done"})
+        elif op == "chat":
+            session = self._session(request.get("session", ""))
+            cancel = threading.Event()
+
+            def on_event(event: dict):
+                if cancel.is_set():
+                    return
+                try:
+                    send(event)
+                except OSError:
+                    # Client went away mid-turn: abandon the turn so the agent
+                    # restores the conversation (no dangling tool calls)
+                    cancel.set()
+
+            with session.lock:
+                reply = session.agent.chat(request.get("message", ""), on_event=on_event, cancel=cancel)
+            send({"type": "done", "reply": reply})
+        elif op == "shutdown":
+            send({"type": "done"})
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+        else:
+            send({"type": "error", "error": f"unknown op {op!r}"})
+
+    def _watch_idle(self):
+        while True:
+            time.sleep(min(30, max(1, self.idle_timeout / 10)))
+            with self._sessions_lock:
+                idle = self._active == 0 and time.monotonic() - self._last_activity > self.idle_timeout
+            if idle:
+                self._server.shutdown()
+                return
+
+    def serve_forever(self):
+        """Bind the socket and serve until shutdown or idle timeout."""
+        if DaemonClient.connect(self.path) is not None:
+            raise RuntimeError(f"A daemon is already listening on {self.path}")
+        self._warm_up()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            # Stale socket left by a daemon that did not exit cleanly
+            self.path.unlink()
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _Server(str(self.path), _Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.daemon_state = self
+        self._last_activity = time.monotonic()
+
+        if self.idle_timeout:
+            threading.Thread(target=self._watch_idle, daemon=True).start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class DaemonClient:
+    """Talks to a running AgentDaemon. Mirrors the parts of Agent the CLI uses."""
+
+    def __init__(self, path: Path, session: str):
+        self.path = path
+        self.session = session
+        self.registry = self  # the CLI lists skills via agent.registry
+
+    @classmethod
+    def connect(cls, path: Path = None, session: str = None) -> "DaemonClient | None":
+        """Return a client if a daemon answers on *path*, else None."""
+        if not supported():
+            return None
+        path = Path(path) if path else socket_path()
+        if not path.exists():
+            return None
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1)
+            try:
+                sock.connect(str(path))
+            except OSError:
+                return None
+        return cls(path, session or session_id())
+
+    def request(self, op: str, **payload):
+        """Send one request and yield its events; the last one is done/error."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(str(self.path))
+            except OSError as e:
+                raise ConnectionError(f"Daemon not reachable on {self.path}: {e}") from e
+            sock.sendall(json.dumps({"op": op, "session": self.session, **payload}).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as stream:
+                for line in stream:
+                    event = json.loads(line)
+                    yield event
+                    if event.get("type") in ("done", "error"):
+                        return
+        raise ConnectionError("Daemon closed the connection")
+
+    def _call(self, op: str, on_event=None, **payload) -> dict:
+        for event in self.request(op, **payload):
+            if event["type"] == "error":
+                raise RuntimeError(event["error"])
+            if event["type"] == "done":
+                return event
+            if on_event:
+                on_event(event)
+
+    def chat(self, user_input: str, on_event=None) -> str:
+        return self._call("chat", on_event=on_event, message=user_input)["reply"]
+
+    def reset(self):
+        self._call("reset")
+
+    def list_skills(self) -> list[str]:
+        return self._call("skills")["skills"]
+
+    def ping(self) -> dict:
+        return self._call("ping")
+
+    def shutdown(self):
+        self._call("shutdown")
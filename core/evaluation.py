@@ -0,0 +1,239 @@
+"""
+Batch evaluation - runs a JSONL prompt set through independent agents.
+
+Input, one JSON object per line:
+
+    {"id": "weather-1", "prompt": "北京明天天气怎么样", "expect_tools": ["get_weather"]}
+    {"id": "chat-2", "turns": ["记住我喜欢喝茶", "我喜欢喝什么？"]}
+
+"id" defaults to the line number; "turns" runs several user messages on
+one conversation; "expect_tools" (optional) is compared with the set of
+skills the agent called.
+
+Every prompt gets its own Agent (sharing the LLM client and the skill
+registry), and up to *concurrency* run at once. LLM requests are throttled
+to *rate* per second across all workers. Each result is appended to the
+output JSONL as soon as it finishes; rerunning with the same output skips
+prompts that already succeeded, so an interrupted run resumes where it
+stopped.
+"""
+
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+class RateLimiter:
+    """Spaces acquire() calls at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class _RateLimitedLLM:
+    """LLM client proxy that takes a rate-limiter slot before every request."""
+
+    def __init__(self, llm, limiter: RateLimiter):
+        self.llm = llm
+        self.limiter = limiter
+
+    def chat(self, *args, **kwargs):
+        self.limiter.acquire()
+        return self.llm.chat(*args, **kwargs)
+
+    def chat_stream(self, *args, **kwargs):
+        self.limiter.acquire()
+        return self.llm.chat_stream(*args, **kwargs)
+
+    def __getattr__(self, item):
+        return getattr(self.llm, item)
+
+
+def load_cases(path: str | Path) -> list[dict]:
+    """Read the prompt set; every case gets an "id" and a "turns" list."""
+    cases = []
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            case = json.loads(line)
+            case.setdefault("id", str(n))
+            case["id"] = str(case["id"])
+            if "turns" not in case:
+                case["turns"] = [case["prompt"]]
+            cases.append(case)
+    return cases
+
+
+def load_results(path: str | Path) -> dict[str, dict]:
+    """Latest result per case id from an output file (empty if it does not exist)."""
+    results = {}
+    path = Path(path)
+    if not path.exists():
+        return results
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short by an interrupted run
+                    continue
+                results[record["id"]] = record
+    return results
+
+
+def run_case(case: dict, llm, registry) -> dict:
+    """Run one case on a fresh agent and return its result record."""
+    from core.agent import Agent
+    from core.llm import track_usage
+
+    agent = Agent(llm=llm, registry=registry)
+    tools: list[str] = []
+    record = {"id": case["id"], "prompt": case["turns"][-1]}
+
+    def on_event(event):
+        if event.get("type") == "tool":
+            tools.append(event["name"])
+
+    started = time.perf_counter()
+    with track_usage() as usage:
+        try:
+            for turn in case["turns"]:
+                record["reply"] = agent.chat(turn, on_event=on_event)
+            record["error"] = None
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+    record["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    record["tools"] = tools
+    record["tool_iterations"] = usage["tool_rounds"]
+    record["llm_calls"] = usage["llm_calls"]
+    record["usage"] = {k: v for k, v in usage.items() if k not in ("llm_calls", "tool_rounds")}
+    if "expect_tools" in case:
+        record["expect_tools"] = case["expect_tools"]
+        record["tools_ok"] = set(tools) == set(case["expect_tools"])
+    return record
+
+
+def run_batch(input_path: str, output_path: str, concurrency: int = 4, rate: float = 0.0,
+              limit: int = 0, on_result=None) -> dict:
+    """
+    Run every pending case of *input_path*, appending results to *output_path*.
+
+    Args:
+        concurrency: Cases run at the same time
+        rate: Maximum LLM requests per second over all workers (0 = unlimited)
+        limit: Run at most this many pending cases (0 = all)
+        on_result: Optional callback(record, done, total) after each case
+
+    Returns:
+        summarize() of all results in the output file, this run's and earlier ones
+    """
+    from core.agent import Agent
+    from core.llm import LLMClient
+
+    cases = load_cases(input_path)
+    done = {cid for cid, r in load_results(output_path).items() if not r.get("error")}
+    pending = [c for c in cases if c["id"] not in done]
+    if limit:
+        pending = pending[:limit]
+
+    # One client and one registry (with its result cache and breakers) for all agents
+    template = Agent(llm=LLMClient())
+    template.register_default_skills()
+    llm = _RateLimitedLLM(template.llm, RateLimiter(rate))
+
+    lock = threading.Lock()
+    finished = 0
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "a", encoding="utf-8") as out:
+        def work(case):
+            nonlocal finished
+            record = run_case(case, llm, template.registry)
+            with lock:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                finished += 1
+                if on_result:
+                    on_result(record, finished, len(pending))
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="eval") as pool:
+            # Consume the iterator so worker exceptions surface here
+            list(pool.map(work, pending))
+
+    ids = {c["id"] for c in cases}
+    return summarize([r for cid, r in load_results(output_path).items() if cid in ids])
+
+
+def _percentile(values: list[float], p: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+def summarize(records: list[dict]) -> dict:
+    """Aggregate result records into the run summary."""
+    ok = [r for r in records if not r.get("error")]
+    latencies = [r["latency_ms"] for r in ok]
+    usage = Counter()
+    for r in ok:
+        usage.update(r.get("usage") or {})
+    checked = [r for r in ok if "tools_ok" in r]
+    return {
+        "cases": len(records),
+        "errors": len(records) - len(ok),
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) if latencies else 0.0,
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "max": max(latencies, default=0.0),
+        },
+        "tool_iterations": {
+            "mean": statistics.fmean([r["tool_iterations"] for r in ok]) if ok else 0.0,
+            "distribution": dict(sorted(Counter(r["tool_iterations"] for r in ok).items())),
+        },
+        "tool_calls": dict(Counter(t for r in ok for t in r["tools"]).most_common()),
+        "llm_calls": sum(r["llm_calls"] for r in ok),
+        "usage": dict(usage),
+        # Share of prompt tokens the provider served from its prefix cache
+        "cached_ratio": usage["cached_tokens"] / usage["prompt_tokens"] if usage["prompt_tokens"] else 0.0,
+        "tool_selection": {
+            "checked": len(checked),
+            "correct": sum(r["tools_ok"] for r in checked),
+            "failures": [r["id"] for r in checked if not r["tools_ok"]],
+        },
+    }
+
+
+def format_summary(summary: dict) -> str:
+    lat, it, sel = summary["latency_ms"], summary["tool_iterations"], summary["tool_selection"]
+    lines = [
+        f"Cases: {summary['cases']}  errors: {summary['errors']}",
+        f"Latency ms: mean {lat['mean']:.0f}  p50 {lat['p50']:.0f}  p95 {lat['p95']:.0f}  max {lat['max']:.0f}",
+        f"Tool iterations: mean {it['mean']:.2f}  distribution {it['distribution']}",
+        f"Tool calls: {summary['tool_calls'] or '-'}",
+        f"LLM calls: {summary['llm_calls']}  tokens: {summary['usage'] or '-'}",
+    ]
+    if summary["usage"].get("prompt_tokens"):
+        lines.append(f"Prompt cache: {summary['cached_ratio']:.1%} of prompt tokens cached")
+    if sel["checked"]:
+        lines.append(f"Tool selection: {sel['correct']}/{sel['checked']} correct")
+        if sel["failures"]:
+            lines.append(f"  mismatched: {', '.join(sel['failures'])}")
+    return "\n".join(lines)
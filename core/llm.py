@@ -2,10 +2,104 @@
 LLM client abstraction - wraps OpenAI-compatible APIs.
 """
 
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import SimpleNamespace
+
 from openai import OpenAI
+from openai.types.chat import ChatCompletionMessage
+from core.cancellation import check as check_cancelled
 from core.config import config
 
 
+def _arguments_complete(arguments: str) -> bool:
+    """True once a streamed tool call's argument JSON is a complete object."""
+    try:
+        return isinstance(json.loads(arguments), dict)
+    except ValueError:
+        return False
+
+
+def _tool_call(entry: dict) -> SimpleNamespace:
+    """Tool call object shaped like the SDK's (id, type, function.name/arguments)."""
+    return SimpleNamespace(
+        id=entry["id"],
+        type="function",
+        function=SimpleNamespace(name=entry["name"], arguments=entry["arguments"]),
+    )
+
+
+# Totals of the LLM calls made inside track_usage() (per thread / task)
+_usage_totals: ContextVar[dict | None] = ContextVar("llm_usage_totals", default=None)
+
+USAGE_KEYS = ("prompt_tokens", "completion_tokens", "total_tokens", "cached_tokens")
+
+
+@contextmanager
+def track_usage():
+    """
+    Collect token usage of every LLM call made inside the block.
+
+    Yields a dict with llm_calls, tool_rounds (responses that requested
+    tools) and the USAGE_KEYS token counts; it is updated in place. Only
+    calls made from the same thread (or task) are counted. Scopes nest:
+    an inner scope's totals are added to the enclosing one on exit.
+    """
+    totals = {"llm_calls": 0, "tool_rounds": 0, **{k: 0 for k in USAGE_KEYS}}
+    parent = _usage_totals.get()
+    token = _usage_totals.set(totals)
+    try:
+        yield totals
+    finally:
+        _usage_totals.reset(token)
+        if parent is not None:
+            for key, value in totals.items():
+                parent[key] = parent.get(key, 0) + value
+
+
+def _usage_dict(usage) -> dict | None:
+    """Token counts of an SDK usage object (or an already converted dict)."""
+    if usage is None or isinstance(usage, dict):
+        return usage
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens or 0,
+        "completion_tokens": usage.completion_tokens or 0,
+        "total_tokens": usage.total_tokens or 0,
+        # Prompt tokens served from the provider's prefix cache
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+    }
+
+
+def _record_usage(message, usage):
+    totals = _usage_totals.get()
+    if totals is None:
+        return
+    totals["llm_calls"] += 1
+    totals["tool_rounds"] += int(bool(message.tool_calls))
+    for key, value in (_usage_dict(usage) or {}).items():
+        totals[key] = totals.get(key, 0) + (value or 0)
+
+
+def _message_dict(message, usage=None) -> dict:
+    """JSON form of an assistant message (SDK object or chat_stream() result)."""
+    data = {"role": "assistant", "content": message.content}
+    if message.tool_calls:
+        data["tool_calls"] = [
+            {
+                "id": tc.id,
+                "type": "function",
+                "function": {"name": tc.function.name, "arguments": tc.function.arguments},
+            }
+            for tc in message.tool_calls
+        ]
+    usage = _usage_dict(usage or getattr(message, "usage", None))
+    if usage:
+        data["usage"] = usage
+    return data
+
+
 class LLMClient:
     """Unified LLM client supporting any OpenAI-compatible API."""
 
@@ -21,6 +115,9 @@ class LLMClient:
         self.model = config.get("llm.model", "gpt-4o-mini")
         self.temperature = config.get("llm.temperature", 0.7)
         self.max_tokens = config.get("llm.max_tokens", 2048)
+        self.stream_usage = config.get("llm.stream_usage", False)
+        # Stream cancellable requests so they can be aborted mid-generation
+        self.cancel_stream = config.get("llm.cancel_stream", True)
 
     def chat(self, messages: list, tools: list = None, tool_choice: str = "auto") -> dict:
         """
@@ -34,6 +131,101 @@ class LLMClient:
         Returns:
             The API response message object.
         """
+        kwargs = self._request(messages, tools, tool_choice)
+
+        def call():
+            response = self.client.chat.completions.create(**kwargs)
+            return response.choices[0].message, response.usage
+
+        from core.cassette import active
+        cassette = active()
+        if cassette is None:
+            message, usage = call()
+        else:
+            # Record or replay the completion (see core/cassette.py)
+            data = dict(cassette.call("llm", kwargs, lambda: _message_dict(*call())))
+            usage = data.pop("usage", None)
+            message = ChatCompletionMessage.model_validate(data)
+        _record_usage(message, usage)
+        return message
+
+    def chat_stream(self, messages: list, tools: list = None, tool_choice: str = "auto",
+                    on_tool_call=None, cancel=None, stream_usage: bool = None):
+        """
+        Stream a chat completion, reporting tool calls as soon as they are complete.
+
+        Args:
+            messages: List of message dicts (role, content, etc.)
+            tools: Optional list of tool/function definitions
+            tool_choice: "auto", "none", or "required"
+            on_tool_call: Optional callback(tool_call), invoked once per tool
+                call as soon as its argument JSON parses - usually while the
+                model is still generating the rest of the response. Calls
+                whose arguments never parse are not reported.
+            cancel: Optional threading.Event; once set, the stream is closed
+                (the provider stops generating) and Cancelled is raised.
+            stream_usage: Ask for token usage in the last chunk (default:
+                the llm.stream_usage setting)
+
+        Returns:
+            A message object like chat()'s, with .content and .tool_calls
+            (None when the model made no tool calls).
+        """
+        kwargs = self._request(messages, tools, tool_choice)
+
+        from core.cassette import active
+        cassette = active()
+        if cassette is None:
+            message = self._stream(kwargs, on_tool_call, cancel, stream_usage)
+            _record_usage(message, message.usage)
+            return message
+        # Streamed and plain completions share recordings
+        data = dict(cassette.call("llm", kwargs, lambda: _message_dict(self._stream(kwargs, on_tool_call, cancel, stream_usage))))
+        usage = data.pop("usage", None)
+        message = ChatCompletionMessage.model_validate(data)
+        if cassette.mode == "replay" and on_tool_call:
+            for tool_call in message.tool_calls or []:
+                on_tool_call(tool_call)
+        _record_usage(message, usage)
+        return message
+
+    def _stream(self, kwargs: dict, on_tool_call=None, cancel=None, stream_usage: bool = None):
+        kwargs = {**kwargs, "stream": True}
+        if self.stream_usage if stream_usage is None else stream_usage:
+            # Final chunk carries token usage (not every compatible API supports this)
+            kwargs["stream_options"] = {"include_usage": True}
+        content: list[str] = []
+        calls: dict[int, dict] = {}
+        reported: set[int] = set()
+        usage = None
+        check_cancelled(cancel)
+        # Leaving the block closes the connection, also when cancelled mid-stream
+        with self.client.chat.completions.create(**kwargs) as stream:
+            for chunk in stream:
+                check_cancelled(cancel)
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content.append(delta.content)
+                for tc in delta.tool_calls or []:
+                    entry = calls.setdefault(tc.index, {"id": "", "name": "", "arguments": ""})
+                    if tc.id:
+                        entry["id"] = tc.id
+                    if tc.function:
+                        entry["name"] += tc.function.name or ""
+                        entry["arguments"] += tc.function.arguments or ""
+                    if (on_tool_call and tc.index not in reported and entry["id"] and entry["name"]
+                            and _arguments_complete(entry["arguments"])):
+                        reported.add(tc.index)
+                        on_tool_call(_tool_call(entry))
+
+        tool_calls = [_tool_call(calls[i]) for i in sorted(calls)]
+        return SimpleNamespace(content="".join(content) or None, tool_calls=tool_calls or None, usage=usage)
+
+    def _request(self, messages: list, tools: list = None, tool_choice: str = "auto") -> dict:
         kwargs = {
             "model": self.model,
             "messages": messages,
@@ -44,6 +236,4 @@ class LLMClient:
         if tools:
             kwargs["tools"] = tools
             kwargs["tool_choice"] = tool_choice
-
-        response = self.client.chat.completions.create(**kwargs)
-        return response.choices[0].message
+        return kwargs
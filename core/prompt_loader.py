@@ -13,6 +13,9 @@ YAML structure per skill:
       parameters:
         <param_name>: "..."   # replaces only the 'description' field of that param
 
+Other LLM-facing text used by the agent itself lives under the reserved
+``_agent`` key and is read with text().
+
 The Python class attributes (description / parameters) always serve as the
 ultimate fallback when no YAML entry exists for a skill or language.
 """
@@ -36,6 +39,11 @@ def setup(language: str) -> None:
     _active_language = language
 
 
+def active_language() -> str:
+    """The language set by setup()."""
+    return _active_language
+
+
 def _load(language: str) -> dict:
     """Load (and cache) the prompt YAML for *language*.
 
@@ -88,3 +96,12 @@ def overlay(skill_name: str, tool_def: dict) -> dict:
                 props[param_name]["description"] = str(desc).strip()
 
     return result
+
+
+def text(key: str, default: str) -> str:
+    """Return the agent-level prompt string *key* from the ``_agent`` section.
+
+    *default* (English) is used when the active language file has no entry.
+    """
+    entry = _load(_active_language).get("_agent", {}).get(key)
+    return str(entry).strip() if entry else default
@@ -0,0 +1,157 @@
+"""
+Intent router - answers obvious skill requests without an LLM tool round-trip.
+
+Skills declare ``intent_patterns`` (regular expressions) and optionally
+``intent_examples`` (sample phrasings) as class attributes. Before the first
+LLM call the agent asks the router whether the user message is one of these
+requests. Patterns must match the *whole* message (after trimming spaces and
+trailing punctuation), so "今天几号" routes but "今天几号开会来着" does not.
+Named groups become skill arguments, e.g. ``(?P<city>...)天气`` -> city=...
+
+With ``agent.router.classifier: embedding`` messages that no pattern matches
+are compared against the skills' intent_examples using the knowledge
+embedding model, and routed when the cosine similarity reaches
+``agent.router.min_similarity``.
+
+Router statistics (hit rate, estimated LLM latency saved) are process-wide
+and exposed through router_stats.snapshot().
+"""
+
+import re
+import threading
+
+from core.config import config
+
+# Trailing punctuation ignored when matching
+_TRIM = " \t\r\n?？!！.。~～,，"
+
+
+class RouterStats:
+    """Thread-safe counters for the intent router."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.turns = 0
+            self.hits = 0
+            self.by_skill: dict[str, int] = {}
+            self.llm_calls_saved = 0
+            self.routed_ms = 0.0
+            # Moving average of one LLM call, used to estimate time saved
+            self.llm_call_ms: float | None = None
+
+    def record_llm_call(self, ms: float):
+        with self._lock:
+            if self.llm_call_ms is None:
+                self.llm_call_ms = ms
+            else:
+                self.llm_call_ms = 0.8 * self.llm_call_ms + 0.2 * ms
+
+    def record_turn(self, skill: str | None = None, calls_saved: int = 0, elapsed_ms: float = 0.0):
+        with self._lock:
+            self.turns += 1
+            if skill:
+                self.hits += 1
+                self.by_skill[skill] = self.by_skill.get(skill, 0) + 1
+                self.llm_calls_saved += calls_saved
+                self.routed_ms += elapsed_ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            saved_ms = (self.llm_call_ms or 0.0) * self.llm_calls_saved
+            return {
+                "turns": self.turns,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.turns if self.turns else 0.0,
+                "by_skill": dict(self.by_skill),
+                "llm_calls_saved": self.llm_calls_saved,
+                "avg_llm_call_ms": self.llm_call_ms,
+                "est_latency_saved_ms": saved_ms,
+                "avg_routed_turn_ms": self.routed_ms / self.hits if self.hits else None,
+            }
+
+
+router_stats = RouterStats()
+
+
+class IntentRouter:
+    """Maps a user message straight to (skill_name, kwargs) when unambiguous."""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.max_chars = config.get("agent.router.max_chars", 40)
+        self.classifier = config.get("agent.router.classifier", "none")
+        self.min_similarity = config.get("agent.router.min_similarity", 0.82)
+        self._patterns: list[tuple[str, re.Pattern]] | None = None
+        self._examples = None
+        self._lock = threading.Lock()
+
+    def _compile(self) -> list[tuple[str, re.Pattern]]:
+        if self._patterns is None:
+            with self._lock:
+                if self._patterns is None:
+                    compiled = []
+                    for name in self.registry.list_skills():
+                        # Read from the registered object so lazy skills stay unloaded
+                        for pattern in self.registry.get(name).intent_patterns:
+                            compiled.append((name, re.compile(pattern, re.IGNORECASE)))
+                    self._patterns = compiled
+        return self._patterns
+
+    def route(self, message: str) -> tuple[str, dict] | None:
+        """Return (skill_name, kwargs) for a confident match, else None."""
+        text = message.strip().strip(_TRIM)
+        if not text or len(text) > self.max_chars:
+            return None
+        for name, pattern in self._compile():
+            m = pattern.fullmatch(text)
+            if m:
+                return name, self._kwargs(name, m.groupdict())
+        if self.classifier == "embedding":
+            return self._classify(text)
+        return None
+
+    def _kwargs(self, name: str, groups: dict) -> dict:
+        """Keep named groups that are skill parameters, coerced to their schema type."""
+        props = self.registry.get(name).parameters.get("properties", {})
+        kwargs = {}
+        for key, value in groups.items():
+            if value is None or key not in props:
+                continue
+            if props[key].get("type") == "integer":
+                try:
+                    value = int(value)
+                except ValueError:
+                    continue
+            kwargs[key] = value
+        return kwargs
+
+    def _classify(self, text: str) -> tuple[str, dict] | None:
+        """Nearest intent example by embedding similarity (no arguments)."""
+        import numpy as np
+        from knowledge.embeddings import get_embedding_function
+
+        embed = get_embedding_function()
+        if self._examples is None:
+            with self._lock:
+                if self._examples is None:
+                    names, texts = [], []
+                    for name in self.registry.list_skills():
+                        for example in self.registry.get(name).intent_examples:
+                            names.append(name)
+                            texts.append(example)
+                    vectors = np.asarray(embed(texts), dtype=np.float32) if texts else np.zeros((0, 1))
+                    self._examples = (names, vectors)
+        names, vectors = self._examples
+        if not names:
+            return None
+        query = np.asarray(embed([text]), dtype=np.float32)[0]
+        scores = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query) + 1e-12)
+        best = int(np.argmax(scores))
+        if scores[best] >= self.min_similarity:
+            return names[best], {}
+        return None
+
@@ -0,0 +1,141 @@
+"""
+Token estimation and compaction of tool results.
+
+Skill outputs are trimmed to a token budget before they enter the
+conversation context, because every later LLM call in the conversation
+re-sends them. estimate_tokens() is a dependency-free heuristic (CJK
+characters ~1 token each, other text ~4 characters per token), which is
+close enough for budgeting.
+"""
+
+import re
+import threading
+
+# CJK ideographs, kana, hangul and full-width punctuation
+_WIDE = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of *text* for budgeting."""
+    if not text:
+        return 0
+    wide = len(_WIDE.findall(text))
+    return wide + (len(text) - wide + 3) // 4
+
+
+def clip(text: str, max_chars: int) -> str:
+    """Cut *text* to at most max_chars, preferring a word boundary, with an ellipsis."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max(max_chars - 1, 1)]
+    space = cut.rfind(" ")
+    # Only back up to a space if that keeps most of the text (CJK has none)
+    if space > max_chars * 0.6:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+
+def _items(text: str) -> tuple[list[str], str]:
+    """Split a result into list items: blank-line blocks, else lines."""
+    if "\n\n" in text:
+        return text.split("\n\n"), "\n\n"
+    return text.split("\n"), "\n"
+
+
+def compact_text(text: str, max_tokens: int, max_line_chars: int = 300) -> str:
+    """
+    Fit a skill result into roughly max_tokens.
+
+    Long lines are clipped at word boundaries, then whole items (search
+    results, list entries) are kept from the top until the budget is spent,
+    and a note says how many were dropped. Results already within budget
+    are returned unchanged.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    items, sep = _items(text)
+    items = ["\n".join(clip(line, max_line_chars) for line in item.split("\n")) for item in items]
+
+    from core.prompt_loader import text as prompt_text
+    kept, used = [], 0
+    for i, item in enumerate(items):
+        cost = estimate_tokens(item)
+        if used + cost > max_tokens:
+            if not kept:
+                # A single oversized item: keep its head
+                kept.append(clip(item, max(max_tokens * 2, 40)))
+                i += 1
+            omitted = len(items) - i
+            if omitted:
+                note = prompt_text("omitted_items", "… ({count} more items omitted)")
+                kept.append(note.format(count=omitted))
+            break
+        kept.append(item)
+        used += cost
+    return sep.join(kept)
+
+
+class TokenStats:
+    """Process-wide counters of context tokens saved by compaction, stubs and deduplication."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tool_results = 0
+        self.compacted = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.stubbed = 0
+        self.stub_tokens_saved = 0
+        self.duplicates = 0
+        self.duplicate_tokens_saved = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.prefix_changes = 0
+
+    def record_result(self, before: int, after: int):
+        with self._lock:
+            self.tool_results += 1
+            self.compacted += int(after < before)
+            self.tokens_before += before
+            self.tokens_after += after
+
+    def record_stubs(self, count: int, saved: int):
+        with self._lock:
+            self.stubbed += count
+            self.stub_tokens_saved += saved
+
+    def record_duplicate(self, saved: int):
+        with self._lock:
+            self.duplicates += 1
+            self.duplicate_tokens_saved += max(saved, 0)
+
+    def record_prompt(self, prompt_tokens: int, cached_tokens: int, prefix_changed: bool = False):
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+            self.prefix_changes += int(prefix_changed)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "tool_results": self.tool_results,
+                "compacted": self.compacted,
+                "tool_tokens_before": self.tokens_before,
+                "tool_tokens_after": self.tokens_after,
+                "compaction_tokens_saved": self.tokens_before - self.tokens_after,
+                "stubbed_results": self.stubbed,
+                # Per later LLM call that re-sends the history
+                "stub_tokens_saved": self.stub_tokens_saved,
+                # Repeated identical tool calls answered without re-running the skill
+                "duplicate_tool_calls": self.duplicates,
+                "duplicate_tokens_saved": self.duplicate_tokens_saved,
+                # Provider-reported prompt tokens and the share served from its prefix cache
+                "prompt_tokens": self.prompt_tokens,
+                "cached_prompt_tokens": self.cached_tokens,
+                "cached_ratio": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0,
+                # LLM calls whose system prompt + tools differed from the conversation's previous call
+                "prefix_changes": self.prefix_changes,
+            }
+
+
+token_stats = TokenStats()
@@ -0,0 +1,200 @@
+"""
+Tool selection - offers the LLM only the skills relevant to the turn.
+
+Every tool schema is re-sent on every LLM call, so with many skills the
+schemas dominate the prompt. Once more than ``agent.tool_selection.min_skills``
+skills are registered, each turn gets the pinned skills plus the
+``top_n`` best matches for the user message:
+
+    keyword    a small inverted index over each skill's (localized) tool
+               definition, intent_examples and keywords; English words and
+               CJK character bigrams, weighted by IDF
+    embedding  cosine similarity between the message and the same text,
+               using the knowledge embedding model
+
+A meta-tool (MORE_TOOLS) is offered alongside the subset. When the model
+calls it, or calls a registered skill that was left out, the agent exposes
+the full tool list for the rest of the turn.
+
+With agent.prompt_cache enabled selection is off: a per-turn subset would
+change the cached prompt prefix, so every turn gets the full, stable list.
+"""
+
+import math
+import re
+import threading
+
+from core.config import config
+
+# Name of the meta-tool that unlocks the full tool list
+MORE_TOOLS = "more_tools"
+
+_WORD = re.compile(r"[a-z0-9]{2,}")
+_CJK_RUN = re.compile(r"[㐀-䶿一-鿿]+")
+_STOPWORDS = {
+    "the", "and", "for", "you", "are", "this", "that", "with", "use", "get", "when",
+    "what", "how", "can", "not", "any", "all", "from", "about", "into", "your", "default",
+}
+
+
+def tokenize(text: str) -> set[str]:
+    """English words and CJK character bigrams (single characters for 1-char runs)."""
+    text = text.lower()
+    tokens = {w for w in _WORD.findall(text) if w not in _STOPWORDS}
+    for run in _CJK_RUN.findall(text):
+        if len(run) == 1:
+            tokens.add(run)
+        tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _skill_text(skill) -> str:
+    """Everything a user message might echo: definition, examples, keywords."""
+    definition = skill.get_tool_definition()["function"]
+    params = definition.get("parameters", {}).get("properties", {})
+    parts = [
+        definition["name"].replace("_", " "),
+        definition.get("description", ""),
+        *(p.get("description", "") for p in params.values()),
+        *skill.intent_examples,
+        *skill.keywords,
+    ]
+    return "\n".join(parts)
+
+
+def more_tools_definition() -> dict:
+    from core.prompt_loader import text
+    return {
+        "type": "function",
+        "function": {
+            "name": MORE_TOOLS,
+            "description": text(
+                "more_tools_description",
+                "Call this when none of the available tools can do what the user asks; "
+                "all other tools will then be made available.",
+            ),
+            "parameters": {"type": "object", "properties": {}},
+        },
+    }
+
+
+class SelectionStats:
+    """Process-wide counters of tool selection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.tools_offered = 0
+        self.tools_total = 0
+        self.expanded = 0
+
+    def record(self, offered: int, total: int):
+        with self._lock:
+            self.turns += 1
+            self.tools_offered += offered
+            self.tools_total += total
+
+    def record_expansion(self):
+        with self._lock:
+            self.expanded += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "avg_tools_offered": self.tools_offered / self.turns if self.turns else None,
+                "avg_tools_registered": self.tools_total / self.turns if self.turns else None,
+                "expanded_to_all": self.expanded,
+            }
+
+
+selection_stats = SelectionStats()
+
+
+class ToolSelector:
+    """Picks the skills offered to the LLM for one turn."""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.enabled = config.get("agent.tool_selection.enabled", True)
+        self.min_skills = config.get("agent.tool_selection.min_skills", 10)
+        self.top_n = config.get("agent.tool_selection.top_n", 5)
+        self.method = config.get("agent.tool_selection.method", "keyword")
+        self.pinned = list(config.get("agent.tool_selection.pinned", ["web_search", "knowledge_manage"]) or [])
+        self.stable = config.get("agent.prompt_cache.enabled", False)
+        self._index = None
+        self._lock = threading.Lock()
+
+    def active(self) -> bool:
+        return self.enabled and not self.stable and len(self.registry.list_skills()) > self.min_skills
+
+    def _build(self):
+        """(names, token sets, idf) or (names, vectors) for the current registry."""
+        names = self.registry.list_skills()
+        if self._index is not None and self._index[0] == names:
+            return self._index
+        with self._lock:
+            texts = [_skill_text(self.registry.get(n)) for n in names]
+            if self.method == "embedding":
+                import numpy as np
+                from knowledge.embeddings import get_embedding_function
+                vectors = np.asarray(get_embedding_function()(texts), dtype=np.float32)
+                vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+                self._index = (names, vectors, None)
+            else:
+                token_sets = [tokenize(t) for t in texts]
+                df: dict[str, int] = {}
+                for tokens in token_sets:
+                    for token in tokens:
+                        df[token] = df.get(token, 0) + 1
+                n = len(names)
+                idf = {t: math.log((n + 1) / (d + 0.5)) for t, d in df.items()}
+                self._index = (names, token_sets, idf)
+        return self._index
+
+    def scores(self, query: str) -> dict[str, float]:
+        """Relevance of every registered skill to *query*."""
+        names, index, idf = self._build()
+        if self.method == "embedding":
+            import numpy as np
+            from knowledge.embeddings import get_embedding_function
+            q = np.asarray(get_embedding_function()([query]), dtype=np.float32)[0]
+            q /= np.linalg.norm(q) + 1e-12
+            return dict(zip(names, (index @ q).tolist()))
+        query_tokens = tokenize(query)
+        return {
+            name: sum(idf[t] for t in query_tokens & tokens)
+            for name, tokens in zip(names, index)
+        }
+
+    def select(self, query: str, recent: list[str] = ()) -> list[str] | None:
+        """
+        Skill names to offer for this turn, or None for all of them.
+
+        Args:
+            query: The user message (plus any context worth matching)
+            recent: Skills called in the previous turn, kept for follow-ups
+        """
+        if not self.active():
+            return None
+        registered = self.registry.list_skills()
+        chosen = [n for n in self.pinned if n in registered]
+        chosen += [n for n in recent if n in registered and n not in chosen]
+        ranked = sorted(self.scores(query).items(), key=lambda kv: kv[1], reverse=True)
+        for name, score in ranked[:self.top_n]:
+            if score > 0 and name not in chosen:
+                chosen.append(name)
+        selection_stats.record(len(chosen), len(registered))
+        return chosen
+
+    def tools_for(self, names: list[str] | None) -> list[dict]:
+        """Tool definitions for *names* (all skills when None), plus MORE_TOOLS for a subset."""
+        if names is None:
+            return self.registry.get_openai_tools(stable=self.stable)
+        tools = [self.registry.get(n).get_tool_definition() for n in names]
+        return tools + [more_tools_definition()]
+
+
+def expansion_result() -> str:
+    from core.prompt_loader import text
+    return text("more_tools_result", "All tools are now available. Call the one that fits the request.")
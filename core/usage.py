@@ -0,0 +1,115 @@
+"""
+Token usage ledger - records every agent LLM call in SQLite.
+
+For each call the provider-reported usage (including cached prompt
+tokens) is stored together with the session, turn and iteration it
+belongs to, plus an estimate of where the prompt tokens went: system
+prompt and turn context, tool schemas, conversation history and tool
+results, and per skill its schema and result tokens. Writes happen on one
+background thread so the turn never waits for SQLite.
+
+Aggregates are available from storage.database.Database.usage_summary()
+and the API's GET /usage.
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core.config import config
+from core.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_writer: ThreadPoolExecutor | None = None
+_db = None
+_lock = threading.Lock()
+
+
+def breakdown(messages: list[dict], tools: list[dict] = None) -> tuple[dict, dict]:
+    """
+    Estimate prompt tokens per part of the request.
+
+    Returns:
+        ({"system", "tools", "history", "tool_results"} token estimates,
+         {skill: [schema_tokens, result_tokens]})
+    """
+    parts = {"system": 0, "tools": 0, "history": 0, "tool_results": 0}
+    skills: dict[str, list[int]] = {}
+    for tool in tools or []:
+        tokens = estimate_tokens(json.dumps(tool, ensure_ascii=False))
+        parts["tools"] += tokens
+        skills.setdefault(tool["function"]["name"], [0, 0])[0] += tokens
+    for msg in messages:
+        tokens = estimate_tokens(msg.get("content") or "")
+        if msg["role"] == "system":
+            parts["system"] += tokens
+        elif msg["role"] == "tool":
+            parts["tool_results"] += tokens
+            skills.setdefault(msg.get("name", "unknown"), [0, 0])[1] += tokens
+        else:
+            if msg.get("tool_calls"):
+                tokens += estimate_tokens(json.dumps(msg["tool_calls"], ensure_ascii=False))
+            parts["history"] += tokens
+    return parts, skills
+
+
+def _database():
+    global _db, _writer
+    if _db is None:
+        with _lock:
+            if _db is None:
+                from storage.database import Database
+                _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="usage-ledger")
+                _db = Database()
+    return _db
+
+
+def record_llm_call(session_id: str, turn: int, iteration: int, messages: list[dict],
+                    tools: list[dict], usage: dict, latency_ms: float, model: str = None):
+    """Queue one LLM call for the ledger (no-op when usage.enabled is false)."""
+    if not config.get("usage.enabled", True):
+        return
+    parts, skills = breakdown(messages, tools)
+    record = {
+        "session_id": session_id,
+        "turn": turn,
+        "iteration": iteration,
+        "model": model,
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0),
+        "total_tokens": usage.get("total_tokens", 0),
+        "cached_tokens": usage.get("cached_tokens", 0),
+        "est_system": parts["system"],
+        "est_tools": parts["tools"],
+        "est_history": parts["history"],
+        "est_tool_results": parts["tool_results"],
+        "latency_ms": round(latency_ms, 1),
+    }
+    try:
+        db = _database()
+    except Exception as e:
+        logger.warning("Usage ledger unavailable: %s", e)
+        return
+    _writer.submit(_save, db, record, {k: tuple(v) for k, v in skills.items()})
+
+
+def _save(db, record: dict, skills: dict):
+    try:
+        db.save_llm_usage(record, skills)
+    except Exception as e:
+        # Losing a ledger row must never affect the conversation
+        logger.warning("Could not record LLM usage: %s", e)
+
+
+def flush():
+    """Wait until queued ledger writes are stored."""
+    if _writer is not None:
+        _writer.submit(lambda: None).result()
+
+
+def summary(session_id: str = None, since: str = None, limit: int = 20) -> dict:
+    """Ledger aggregates, including calls still queued for writing."""
+    flush()
+    return _database().usage_summary(session_id=session_id, since=since, limit=limit)
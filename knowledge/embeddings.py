@@ -0,0 +1,235 @@
+"""
+Embedding functions used by the knowledge vector stores.
+
+The default model is all-MiniLM-L6-v2 exported to ONNX - the same model and
+on-disk layout ChromaDB downloads to ~/.cache/chroma/onnx_models, so a store
+can move between backends without fetching anything new.
+
+Configured under ``knowledge.embedding`` in config.yaml:
+    provider       auto | onnx | sentence_transformers | chroma_default
+    model_path     local model directory (onnx: holds model.onnx + tokenizer.json)
+    workers        embedding threads shared by all sessions (0 = embed inline)
+    batch_size     max texts per model call
+    batch_wait_ms  how long a worker waits to fill a batch
+
+"auto" uses the local ONNX model when its files exist and otherwise falls
+back to ChromaDB's default function, which downloads the model on first use.
+Offline deployments should set provider: onnx so a missing model fails fast
+instead of hanging on the download.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+import numpy as np
+
+from core.config import config
+
+DEFAULT_MODEL_DIR = Path.home() / ".cache" / "chroma" / "onnx_models" / "all-MiniLM-L6-v2" / "onnx"
+
+
+class OnnxMiniLMEmbedding:
+    """Sentence embeddings from a local ONNX MiniLM export.
+
+    The ONNX session and tokenizer are loaded on first call. Output rows are
+    L2-normalised float32 vectors (mean-pooled over non-padding tokens).
+    """
+
+    def __init__(self, model_dir: str | Path = None, max_length: int = 256, batch_size: int = 32):
+        self.model_dir = Path(model_dir) if model_dir else DEFAULT_MODEL_DIR
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self._session = None
+        self._tokenizer = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._session is not None:
+                return
+            for name in ("model.onnx", "tokenizer.json"):
+                if not (self.model_dir / name).exists():
+                    raise FileNotFoundError(f"Embedding model file not found: {self.model_dir / name}")
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+
+            tokenizer = Tokenizer.from_file(str(self.model_dir / "tokenizer.json"))
+            tokenizer.enable_truncation(max_length=self.max_length)
+            # Pad to the longest text in each batch rather than to max_length
+            tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+            options = ort.SessionOptions()
+            options.log_severity_level = 3
+            self._session = ort.InferenceSession(
+                str(self.model_dir / "model.onnx"),
+                sess_options=options,
+                providers=["CPUExecutionProvider"],
+            )
+            self._tokenizer = tokenizer
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        if self._session is None:
+            self._load()
+        out = []
+        for start in range(0, len(texts), self.batch_size):
+            encoded = self._tokenizer.encode_batch(texts[start:start + self.batch_size])
+            input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+            hidden = self._session.run(None, {
+                "input_ids": input_ids,
+                "attention_mask": mask,
+                "token_type_ids": np.zeros_like(input_ids),
+            })[0]
+            weights = mask[:, :, None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            out.append(pooled)
+        if not out:
+            return np.zeros((0, 0), dtype=np.float32)
+        vectors = np.concatenate(out).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.clip(norms, 1e-12, None)
+
+
+class SentenceTransformerEmbedding:
+    """Embeddings from a local sentence-transformers model directory."""
+
+    def __init__(self, model_path: str):
+        self.model_path = model_path
+        self._model = None
+        self._lock = threading.Lock()
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_path, device="cpu")
+        return self._model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+
+
+class ChromaDefaultEmbedding:
+    """ChromaDB's built-in embedding function (downloads its model if missing)."""
+
+    def __init__(self):
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        self._fn = DefaultEmbeddingFunction()
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        return np.asarray(self._fn(texts), dtype=np.float32)
+
+
+class BatchingEmbedder:
+    """Funnel embedding calls from many threads through a few worker threads.
+
+    Callers block only their own thread. Requests that arrive within
+    ``max_wait_ms`` of each other are merged into one model call of up to
+    ``max_batch`` texts, so concurrent sessions share the CPU-heavy forward
+    pass instead of contending for it.
+    """
+
+    def __init__(self, fn, workers: int = 1, max_batch: int = 32, max_wait_ms: float = 5):
+        self.fn = fn
+        self.workers = max(workers, 1)
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: queue.Queue = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._start_lock = threading.Lock()
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        if not self._threads:
+            self._start()
+        future: Future = Future()
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def _start(self):
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"embedding-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            texts = [t for item_texts, _ in batch for t in item_texts]
+            try:
+                vectors = np.asarray(self.fn(texts), dtype=np.float32)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[start:start + len(item_texts)])
+                start += len(item_texts)
+
+
+def _build_provider():
+    provider = config.get("knowledge.embedding.provider", "auto")
+    model_path = config.get("knowledge.embedding.model_path", "")
+    batch_size = config.get("knowledge.embedding.batch_size", 32)
+
+    if provider == "auto":
+        model_dir = Path(model_path) if model_path else DEFAULT_MODEL_DIR
+        has_local = (model_dir / "model.onnx").exists() and (model_dir / "tokenizer.json").exists()
+        provider = "onnx" if has_local else "chroma_default"
+    if provider == "onnx":
+        return OnnxMiniLMEmbedding(model_path or None, batch_size=batch_size)
+    if provider == "sentence_transformers":
+        if not model_path:
+            raise ValueError("knowledge.embedding.model_path is required for sentence_transformers")
+        return SentenceTransformerEmbedding(model_path)
+    if provider == "chroma_default":
+        return ChromaDefaultEmbedding()
+    raise ValueError(f"Unknown embedding provider: {provider!r}")
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedding_function():
+    """Return the process-wide configured embedding function.
+
+    Unless ``knowledge.embedding.workers`` is 0, the function is wrapped in a
+    BatchingEmbedder so every session shares the same worker threads.
+    """
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                fn = _build_provider()
+                workers = config.get("knowledge.embedding.workers", 1)
+                if workers:
+                    fn = BatchingEmbedder(
+                        fn,
+                        workers=workers,
+                        max_batch=config.get("knowledge.embedding.batch_size", 32),
+                        max_wait_ms=config.get("knowledge.embedding.batch_wait_ms", 5),
+                    )
+                _embedder = fn
+    return _embedder
+
+
+def warm_up():
+    """Load the embedding model and run one forward pass."""
+    get_embedding_function()(["warm up"])
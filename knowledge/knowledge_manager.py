@@ -3,64 +3,209 @@ Knowledge manager - high-level API for knowledge CRUD operations.
 """
 
 import hashlib
+import threading
 import time
-from knowledge.vector_store import VectorStore
+
+# Each tag is also stored as its own boolean metadata key ("tag:python": True)
+# so tag filters can be pushed down into the vector store's where clause.
+TAG_PREFIX = "tag:"
+
+# Metadata fields and operators accepted in user-supplied where filters
+# (see KnowledgeManager.check_where); tags have their own filter
+WHERE_FIELDS = ("source", "created_at")
+WHERE_OPERATORS = ("$eq", "$ne", "$gt", "$gte", "$lt", "$lte", "$in", "$nin")
 
 
 class KnowledgeManager:
-    """Manages personal knowledge with vector storage."""
+    """Manages personal knowledge with vector storage.
+
+    The vector store (and with it chromadb / the embedding model) is only
+    opened on first use, so creating a KnowledgeManager is cheap.
+    """
 
     _instance = None
+    _instance_lock = threading.Lock()
 
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance._initialized = False
         return cls._instance
 
     def __init__(self):
         if self._initialized:
             return
-        self.store = VectorStore()
+        self._store = None
+        self._store_lock = threading.Lock()
         self._initialized = True
 
+    @property
+    def store(self):
+        """The backing vector store, created thread-safely on first access."""
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    from knowledge.vector_store import create_vector_store
+                    self._store = create_vector_store()
+        return self._store
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the vector store has been opened yet."""
+        return self._store is not None
+
+    def warm_up(self):
+        """Open the vector store and load the embedding model ahead of the first request."""
+        from knowledge import embeddings
+        self.store.count()
+        embeddings.warm_up()
+
     def save(self, content: str, tags: list[str] = None, source: str = "user") -> str:
         """
         Save a piece of knowledge.
-        
+
         Args:
             content: The knowledge text to store
             tags: Optional tags for categorization
             source: Source of the knowledge (user/web/etc.)
-            
+
         Returns:
             The document ID
         """
         doc_id = self._generate_id(content)
+        tags = self.normalize_tags(tags)
         metadata = {
-            "tags": ",".join(tags) if tags else "",
+            "tags": ",".join(tags),
             "source": source,
             "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
         }
+        metadata.update({self.tag_key(t): True for t in tags})
         self.store.add(doc_id, content, metadata)
         return doc_id
 
-    def search(self, query: str, top_k: int = None) -> list[dict]:
-        """Search knowledge by semantic similarity."""
-        return self.store.query(query, top_k)
+    def search(
+        self,
+        query: str,
+        top_k: int = None,
+        tags: list[str] = None,
+        where: dict = None,
+    ) -> list[dict]:
+        """Search knowledge by semantic similarity.
+
+        Only entries carrying *all* of ``tags`` (and matching the optional
+        Chroma-style ``where`` filter) are considered.
+        """
+        return self.store.query(query, top_k, where=self.build_where(tags, where))
 
     def delete(self, doc_id: str) -> bool:
         """Delete a knowledge entry by ID."""
         return self.store.delete(doc_id)
 
-    def list_all(self, limit: int = 50) -> list[dict]:
-        """List all stored knowledge entries."""
-        return self.store.list_all(limit)
+    def list_all(self, limit: int = 50, tags: list[str] = None, where: dict = None) -> list[dict]:
+        """List stored knowledge entries, optionally restricted by tags / where."""
+        return self.store.list_all(limit, where=self.build_where(tags, where))
+
+    def list_page(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        tags: list[str] = None,
+        where: dict = None,
+        fields: str = "full",
+        snippet_chars: int = 120,
+    ) -> tuple[list[dict], int | None]:
+        """Fetch one page of entries; returns (items, next_offset or None)."""
+        return self.store.list_page(
+            limit=limit,
+            offset=offset,
+            where=self.build_where(tags, where),
+            fields=fields,
+            snippet_chars=snippet_chars,
+        )
+
+    def iter_all(self, tags: list[str] = None, where: dict = None, fields: str = "full"):
+        """Iterate over every matching entry in constant memory."""
+        return self.store.iter_all(where=self.build_where(tags, where), fields=fields)
 
     def count(self) -> int:
         """Get total knowledge count."""
         return self.store.count()
 
+    def reindex_tags(self) -> int:
+        """Backfill per-tag metadata keys for entries saved before tag indexing.
+
+        Returns:
+            Number of entries that were updated
+        """
+        updated = 0
+        for item in self.store.iter_all():
+            metadata = dict(item["metadata"] or {})
+            tags = self.normalize_tags(metadata.get("tags", "").split(","))
+            missing = {self.tag_key(t): True for t in tags if self.tag_key(t) not in metadata}
+            if missing:
+                metadata.update(missing)
+                self.store.update_metadata(item["id"], metadata)
+                updated += 1
+        return updated
+
+    @staticmethod
+    def tag_key(tag: str) -> str:
+        """Metadata key under which *tag* is indexed."""
+        return f"{TAG_PREFIX}{tag}"
+
+    @staticmethod
+    def normalize_tags(tags: list[str] | None) -> list[str]:
+        """Strip whitespace, drop empties and duplicates (order preserved)."""
+        seen: list[str] = []
+        for t in tags or []:
+            t = t.strip()
+            if t and t not in seen:
+                seen.append(t)
+        return seen
+
+    @classmethod
+    def check_where(cls, where: dict) -> dict:
+        """
+        Validate a user-supplied Chroma-style where filter.
+
+        Only WHERE_FIELDS with scalar values or WHERE_OPERATORS, combined
+        with $and / $or, are accepted, e.g.
+        {"$and": [{"source": "web"}, {"created_at": {"$gte": "2026-01-01"}}]}.
+
+        Raises:
+            ValueError: the filter uses another field, operator or shape
+        """
+        if not isinstance(where, dict) or not where:
+            raise ValueError("where must be a non-empty object")
+        for key, cond in where.items():
+            if key in ("$and", "$or"):
+                if not isinstance(cond, list) or not cond:
+                    raise ValueError(f"{key} takes a non-empty list of filters")
+                for clause in cond:
+                    cls.check_where(clause)
+            elif key not in WHERE_FIELDS:
+                raise ValueError(f"unknown filter field {key!r}; use one of {', '.join(WHERE_FIELDS)}")
+            elif isinstance(cond, dict):
+                for op, operand in cond.items():
+                    if op not in WHERE_OPERATORS:
+                        raise ValueError(f"unsupported operator {op!r}")
+                    if op in ("$in", "$nin") and not isinstance(operand, list):
+                        raise ValueError(f"{op} takes a list")
+            elif not isinstance(cond, (str, int, float, bool)):
+                raise ValueError(f"invalid value for {key!r}")
+        return where
+
+    @classmethod
+    def build_where(cls, tags: list[str] = None, where: dict = None) -> dict | None:
+        """Combine tag filters and a raw where clause into one Chroma filter."""
+        clauses = [{cls.tag_key(t): True} for t in cls.normalize_tags(tags)]
+        if where:
+            clauses.append(where)
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
     @staticmethod
     def _generate_id(content: str) -> str:
         """Generate a deterministic ID from content."""
@@ -0,0 +1,362 @@
+"""
+In-process vector store: a memory-mapped float32 matrix searched with NumPy.
+
+Intended for personal stores of up to a few hundred thousand notes where
+starting ChromaDB costs more than the search itself. Layout on disk
+(``knowledge.numpy.path``/<collection>/):
+
+    meta.json                current generation number and embedding dim
+    vectors.<gen>.f32        append-only rows of L2-normalised float32 vectors
+    records.<gen>.jsonl      append-only log: add / meta / del operations
+
+Writes only ever append; an upsert or delete tombstones the old row.
+When tombstones exceed ``compact_ratio`` of all rows the live rows are
+rewritten into the next generation and meta.json is switched atomically.
+
+With ``ivf_lists`` > 0 and at least ``ivf_min_rows`` live rows, a coarse
+IVF partition (spherical k-means centroids) restricts each search to the
+rows of the ``nprobe`` closest lists.
+
+The store assumes a single writer process.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from core.config import config
+from knowledge.vector_store import BaseVectorStore, EmbeddingFunction, PAGE_FIELDS
+
+
+class NumpyVectorStore(BaseVectorStore):
+    """Memory-mapped NumPy vector store with tombstones and optional IVF."""
+
+    def __init__(self, embedding_function: EmbeddingFunction = None, path: str | Path = None):
+        if embedding_function is None:
+            from knowledge.embeddings import get_embedding_function
+            embedding_function = get_embedding_function()
+        self.embed = embedding_function
+        self.top_k = config.get("knowledge.top_k", 5)
+        self.compact_ratio = config.get("knowledge.numpy.compact_ratio", 0.3)
+        self.compact_min_rows = config.get("knowledge.numpy.compact_min_rows", 64)
+        self.ivf_lists = config.get("knowledge.numpy.ivf_lists", 0)
+        self.ivf_min_rows = config.get("knowledge.numpy.ivf_min_rows", 4096)
+        self.nprobe = config.get("knowledge.numpy.nprobe", 8)
+
+        root = path or config.get("knowledge.numpy.path", "./data/vectors")
+        collection = config.get("knowledge.collection_name", "personal_knowledge")
+        self.dir = Path(root) / collection
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._load()
+
+    # ------------------------------------------------------------------ #
+    #  Persistence                                                         #
+    # ------------------------------------------------------------------ #
+
+    def _paths(self, gen: int) -> tuple[Path, Path]:
+        return self.dir / f"vectors.{gen}.f32", self.dir / f"records.{gen}.jsonl"
+
+    def _load(self):
+        meta_path = self.dir / "meta.json"
+        meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+        self._gen = meta.get("generation", 0)
+        self.dim = meta.get("dim")
+
+        self._ids: list[str | None] = []      # row -> id (None once tombstoned)
+        self._texts: list[str] = []
+        self._metas: list[dict] = []
+        self._row_of: dict[str, int] = {}
+
+        vec_path, log_path = self._paths(self._gen)
+        if log_path.exists():
+            with open(log_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._replay(json.loads(line))
+
+        # Rows appended after the last complete log line (crash mid-write) are ignored
+        self._rows = len(self._ids)
+        if vec_path.exists() and self.dim:
+            expected = self._rows * self.dim * 4
+            if vec_path.stat().st_size > expected:
+                with open(vec_path, "r+b") as f:
+                    f.truncate(expected)
+        self._alive = np.array([i is not None for i in self._ids], dtype=bool)
+        self._vectors = None
+        self._centroids = None
+        self._lists = None
+        if self._should_compact():
+            self.compact()
+        else:
+            self._maybe_build_ivf()
+
+    def _replay(self, rec: dict):
+        op = rec["op"]
+        if op == "add":
+            self._tombstone(rec["id"])
+            self._row_of[rec["id"]] = len(self._ids)
+            self._ids.append(rec["id"])
+            self._texts.append(rec["text"])
+            self._metas.append(rec.get("metadata") or {})
+        elif op == "meta":
+            row = self._row_of.get(rec["id"])
+            if row is not None:
+                self._metas[row] = rec.get("metadata") or {}
+        elif op == "del":
+            self._tombstone(rec["id"])
+
+    def _tombstone(self, doc_id: str) -> bool:
+        row = self._row_of.pop(doc_id, None)
+        if row is None:
+            return False
+        self._ids[row] = None
+        self._texts[row] = ""
+        self._metas[row] = {}
+        if len(getattr(self, "_alive", ())) > row:
+            self._alive[row] = False
+        return True
+
+    def _append_log(self, rec: dict):
+        _, log_path = self._paths(self._gen)
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    def _write_meta(self):
+        tmp = self.dir / "meta.json.tmp"
+        tmp.write_text(json.dumps({"generation": self._gen, "dim": self.dim}), encoding="utf-8")
+        os.replace(tmp, self.dir / "meta.json")
+
+    def _matrix(self) -> np.ndarray:
+        """Memory-map the vector file (re-mapped lazily after appends)."""
+        if self._vectors is None or len(self._vectors) != self._rows:
+            if self._rows == 0:
+                self._vectors = np.zeros((0, self.dim or 0), dtype=np.float32)
+            else:
+                vec_path, _ = self._paths(self._gen)
+                self._vectors = np.memmap(vec_path, dtype=np.float32, mode="r", shape=(self._rows, self.dim))
+        return self._vectors
+
+    def _embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.asarray(self.embed(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.clip(norms, 1e-12, None)
+
+    # ------------------------------------------------------------------ #
+    #  Compaction / IVF                                                    #
+    # ------------------------------------------------------------------ #
+
+    def _should_compact(self) -> bool:
+        dead = self._rows - int(self._alive.sum())
+        return dead >= self.compact_min_rows and dead > self.compact_ratio * self._rows
+
+    def compact(self):
+        """Rewrite live rows into a new generation, dropping tombstones."""
+        with self._lock:
+            live = np.flatnonzero(self._alive)
+            old_vec, old_log = self._paths(self._gen)
+            new_gen = self._gen + 1
+            new_vec, new_log = self._paths(new_gen)
+
+            matrix = self._matrix()
+            with open(new_vec, "wb") as f:
+                for start in range(0, len(live), 4096):
+                    f.write(np.ascontiguousarray(matrix[live[start:start + 4096]]).tobytes())
+            with open(new_log, "w", encoding="utf-8") as f:
+                for row in live:
+                    f.write(json.dumps({
+                        "op": "add",
+                        "id": self._ids[row],
+                        "text": self._texts[row],
+                        "metadata": self._metas[row],
+                    }, ensure_ascii=False) + "\n")
+
+            self._vectors = None
+            del matrix
+            self._gen = new_gen
+            self._write_meta()
+            for p in (old_vec, old_log):
+                try:
+                    p.unlink(missing_ok=True)
+                except OSError:
+                    pass  # still mapped elsewhere (Windows); removed on next compaction
+
+            self._ids = [self._ids[r] for r in live]
+            self._texts = [self._texts[r] for r in live]
+            self._metas = [self._metas[r] for r in live]
+            self._row_of = {doc_id: i for i, doc_id in enumerate(self._ids)}
+            self._rows = len(self._ids)
+            self._alive = np.ones(self._rows, dtype=bool)
+            self._centroids = None
+            self._lists = None
+            self._maybe_build_ivf()
+
+    def _maybe_build_ivf(self):
+        if not self.ivf_lists or int(self._alive.sum()) < self.ivf_min_rows:
+            return
+        matrix = self._matrix()
+        live = np.flatnonzero(self._alive)
+        rng = np.random.default_rng(0)
+        sample = matrix[rng.choice(live, size=min(len(live), self.ivf_lists * 64), replace=False)]
+        # ivf_min_rows may be set below ivf_lists: no more lists than rows
+        n_lists = min(self.ivf_lists, len(sample))
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(10):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids /= np.clip(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12, None)
+        self._centroids = centroids
+        self._lists = np.full(self._rows, -1, dtype=np.int32)
+        for start in range(0, self._rows, 8192):
+            block = matrix[start:start + 8192]
+            self._lists[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+    # ------------------------------------------------------------------ #
+    #  BaseVectorStore API                                                 #
+    # ------------------------------------------------------------------ #
+
+    def add(self, doc_id: str, text: str, metadata: dict = None):
+        vector = self._embed([text])[0]
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vector.shape[0])
+                self._write_meta()
+            vec_path, _ = self._paths(self._gen)
+            with open(vec_path, "ab") as f:
+                f.write(vector.tobytes())
+            self._append_log({"op": "add", "id": doc_id, "text": text, "metadata": metadata or {}})
+
+            self._tombstone(doc_id)
+            self._row_of[doc_id] = self._rows
+            self._ids.append(doc_id)
+            self._texts.append(text)
+            self._metas.append(metadata or {})
+            self._rows += 1
+            self._alive = np.append(self._alive, True)
+            if self._lists is not None:
+                self._lists = np.append(self._lists, np.int32(np.argmax(self._centroids @ vector)))
+            elif self.ivf_lists:
+                self._maybe_build_ivf()
+            if self._should_compact():
+                self.compact()
+
+    def query(self, query_text: str, top_k: int = None, where: dict = None) -> list[dict]:
+        k = top_k or self.top_k
+        with self._lock:
+            if not self._row_of:
+                return []
+            q = self._embed([query_text])[0]
+            mask = self._alive.copy()
+            if self._lists is not None:
+                probe = np.argsort(self._centroids @ q)[-self.nprobe:]
+                mask &= np.isin(self._lists, probe)
+            if where:
+                for row in np.flatnonzero(mask):
+                    if not _match(self._metas[row], where):
+                        mask[row] = False
+            rows = np.flatnonzero(mask)
+            if len(rows) == 0:
+                return []
+            if self._lists is not None:
+                # Only the probed lists are gathered from the mapped file
+                scores = self._matrix()[rows] @ q
+            else:
+                # One pass over the whole mapping, no copy of the matrix
+                scores = (self._matrix() @ q)[rows]
+            k = min(k, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                {
+                    "id": self._ids[rows[i]],
+                    "text": self._texts[rows[i]],
+                    "metadata": self._metas[rows[i]],
+                    "distance": float(1.0 - scores[i]),
+                }
+                for i in top
+            ]
+
+    def delete(self, doc_id: str) -> bool:
+        with self._lock:
+            if doc_id not in self._row_of:
+                return False
+            self._append_log({"op": "del", "id": doc_id})
+            self._tombstone(doc_id)
+            if self._should_compact():
+                self.compact()
+            return True
+
+    def update_metadata(self, doc_id: str, metadata: dict):
+        with self._lock:
+            row = self._row_of.get(doc_id)
+            if row is None:
+                raise KeyError(doc_id)
+            self._append_log({"op": "meta", "id": doc_id, "metadata": metadata})
+            self._metas[row] = metadata
+
+    def list_page(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        where: dict = None,
+        fields: str = "full",
+        snippet_chars: int = 120,
+    ) -> tuple[list[dict], int | None]:
+        if fields not in PAGE_FIELDS:
+            raise ValueError(f"fields must be one of {', '.join(PAGE_FIELDS)}")
+        with self._lock:
+            docs = []
+            skipped = 0
+            for row in np.flatnonzero(self._alive):
+                if where and not _match(self._metas[row], where):
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                if len(docs) == limit:
+                    return docs, offset + limit
+                docs.append(self._project(self._ids[row], self._texts[row], self._metas[row], fields, snippet_chars))
+            return docs, None
+
+    def count(self) -> int:
+        return len(self._row_of)
+
+
+_COMPARATORS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+    "$in": lambda a, b: a in b,
+    "$nin": lambda a, b: a not in b,
+}
+
+
+def _match(metadata: dict, where: dict) -> bool:
+    """Evaluate a Chroma-style metadata filter against one metadata dict."""
+    for key, cond in where.items():
+        if key == "$and":
+            if not all(_match(metadata, c) for c in cond):
+                return False
+        elif key == "$or":
+            if not any(_match(metadata, c) for c in cond):
+                return False
+        elif isinstance(cond, dict):
+            value = metadata.get(key)
+            for op, operand in cond.items():
+                if op not in _COMPARATORS:
+                    raise ValueError(f"Unsupported where operator: {op}")
+                if not _COMPARATORS[op](value, operand):
+                    return False
+        elif metadata.get(key) != cond:
+            return False
+    return True
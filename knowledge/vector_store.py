@@ -1,16 +1,128 @@
 """
-Vector store backed by ChromaDB for semantic knowledge retrieval.
+Vector stores for semantic knowledge retrieval.
+
+Two interchangeable backends implement BaseVectorStore:
+  - chroma : ChromaDB PersistentClient (default)
+  - numpy  : in-process memory-mapped float32 matrix (knowledge/numpy_store.py)
+
+Select one with ``knowledge.backend`` in config.yaml; create_vector_store()
+builds the configured backend.
 """
 
-import chromadb
-from chromadb.config import Settings
+from abc import ABC, abstractmethod
+from typing import Callable
+
+import numpy as np
+
 from core.config import config
 
+# Chroma "include" lists for each list_page projection
+PAGE_FIELDS = {
+    "ids": [],
+    "snippet": ["documents", "metadatas"],
+    "full": ["documents", "metadatas"],
+}
+
+# Maps a batch of texts to a batch of embedding vectors
+EmbeddingFunction = Callable[[list[str]], list[list[float]]]
+
+
+class BaseVectorStore(ABC):
+    """Interface shared by all vector store backends.
+
+    Documents are returned as dicts with keys id, text, metadata (plus
+    distance for query results). ``where`` filters use Chroma's metadata
+    filter syntax, e.g. {"source": "user"} or {"$and": [...]}.
+    """
+
+    top_k: int = 5
+
+    @abstractmethod
+    def add(self, doc_id: str, text: str, metadata: dict = None):
+        """Add or update a document in the vector store."""
+
+    @abstractmethod
+    def query(self, query_text: str, top_k: int = None, where: dict = None) -> list[dict]:
+        """
+        Query the vector store for similar documents.
+
+        Args:
+            query_text: Text to embed and compare against stored documents
+            top_k: Maximum number of results (defaults to knowledge.top_k)
+            where: Optional metadata filter, applied inside the index
+
+        Returns:
+            List of dicts with keys: id, text, metadata, distance
+        """
+
+    @abstractmethod
+    def delete(self, doc_id: str) -> bool:
+        """Delete a document by ID."""
+
+    @abstractmethod
+    def update_metadata(self, doc_id: str, metadata: dict):
+        """Replace a document's metadata without re-embedding its text."""
+
+    @abstractmethod
+    def list_page(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        where: dict = None,
+        fields: str = "full",
+        snippet_chars: int = 120,
+    ) -> tuple[list[dict], int | None]:
+        """
+        Fetch one page of documents.
+
+        Args:
+            limit: Page size
+            offset: Number of matching documents to skip
+            where: Optional metadata filter
+            fields: "ids" (id only), "snippet" (text clipped to snippet_chars
+                plus metadata) or "full" (complete text plus metadata)
+            snippet_chars: Text length kept when fields == "snippet"
 
-class VectorStore:
+        Returns:
+            (documents, next_offset) - next_offset is None on the last page
+        """
+
+    @abstractmethod
+    def count(self) -> int:
+        """Return total number of documents."""
+
+    def list_all(self, limit: int = 100, where: dict = None) -> list[dict]:
+        """List documents in the store, optionally filtered by metadata."""
+        docs, _ = self.list_page(limit=limit, where=where)
+        return docs
+
+    def iter_all(self, where: dict = None, fields: str = "full", batch_size: int = 500):
+        """Yield every matching document, fetching batch_size rows at a time."""
+        offset = 0
+        while offset is not None:
+            docs, offset = self.list_page(limit=batch_size, offset=offset, where=where, fields=fields)
+            yield from docs
+
+    @staticmethod
+    def _project(doc_id: str, text: str, metadata: dict, fields: str, snippet_chars: int) -> dict:
+        """Shape one document according to a list_page projection."""
+        doc = {"id": doc_id}
+        if fields != "ids":
+            text = text or ""
+            if fields == "snippet" and len(text) > snippet_chars:
+                text = text[:snippet_chars] + "..."
+            doc["text"] = text
+            doc["metadata"] = metadata or {}
+        return doc
+
+
+class ChromaVectorStore(BaseVectorStore):
     """ChromaDB-backed vector store for knowledge embeddings."""
 
-    def __init__(self):
+    def __init__(self, embedding_function: EmbeddingFunction = None):
+        import chromadb
+        from chromadb.config import Settings
+
         persist_dir = config.get("knowledge.persist_directory", "./data/chromadb")
         collection_name = config.get("knowledge.collection_name", "personal_knowledge")
         self.top_k = config.get("knowledge.top_k", 5)
@@ -19,26 +131,31 @@ class VectorStore:
             path=persist_dir,
             settings=Settings(anonymized_telemetry=False),
         )
+        # With an explicit embedding function we embed documents ourselves and
+        # hand Chroma plain vectors; the collection keeps whatever embedding
+        # configuration it was created with.
+        self.embed = embedding_function
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
             metadata={"hnsw:space": "cosine"},
         )
 
+    def _vectors(self, texts: list[str]) -> dict:
+        """Chroma kwargs carrying either raw texts or our own embeddings."""
+        if self.embed is None:
+            return {}
+        return {"embeddings": [row for row in np.asarray(self.embed(texts), dtype=np.float32)]}
+
     def add(self, doc_id: str, text: str, metadata: dict = None):
         """Add or update a document in the vector store."""
         self.collection.upsert(
             ids=[doc_id],
             documents=[text],
             metadatas=[metadata or {}],
+            **self._vectors([text]),
         )
 
-    def query(self, query_text: str, top_k: int = None) -> list[dict]:
-        """
-        Query the vector store for similar documents.
-        
-        Returns:
-            List of dicts with keys: id, text, metadata, distance
-        """
+    def query(self, query_text: str, top_k: int = None, where: dict = None) -> list[dict]:
         k = top_k or self.top_k
         # Ensure we don't query more than we have
         count = self.collection.count()
@@ -46,9 +163,14 @@ class VectorStore:
             return []
         k = min(k, count)
 
+        if self.embed is None:
+            target = {"query_texts": [query_text]}
+        else:
+            target = {"query_embeddings": self._vectors([query_text])["embeddings"]}
         results = self.collection.query(
-            query_texts=[query_text],
             n_results=k,
+            where=where or None,
+            **target,
         )
 
         docs = []
@@ -69,18 +191,54 @@ class VectorStore:
         except Exception:
             return False
 
-    def list_all(self, limit: int = 100) -> list[dict]:
-        """List all documents in the store."""
-        results = self.collection.get(limit=limit)
-        docs = []
-        for i in range(len(results["ids"])):
-            docs.append({
-                "id": results["ids"][i],
-                "text": results["documents"][i],
-                "metadata": results["metadatas"][i] if results["metadatas"] else {},
-            })
-        return docs
+    def update_metadata(self, doc_id: str, metadata: dict):
+        """Replace a document's metadata without re-embedding its text."""
+        self.collection.update(ids=[doc_id], metadatas=[metadata])
+
+    def list_page(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        where: dict = None,
+        fields: str = "full",
+        snippet_chars: int = 120,
+    ) -> tuple[list[dict], int | None]:
+        if fields not in PAGE_FIELDS:
+            raise ValueError(f"fields must be one of {', '.join(PAGE_FIELDS)}")
+        # Ask for one extra row to learn whether another page exists
+        results = self.collection.get(
+            limit=limit + 1,
+            offset=offset,
+            where=where or None,
+            include=PAGE_FIELDS[fields],
+        )
+        ids = results["ids"]
+        docs = [
+            self._project(
+                ids[i],
+                results["documents"][i] if results["documents"] else "",
+                results["metadatas"][i] if results["metadatas"] else {},
+                fields,
+                snippet_chars,
+            )
+            for i in range(min(len(ids), limit))
+        ]
+        return docs, (offset + limit if len(ids) > limit else None)
 
     def count(self) -> int:
         """Return total number of documents."""
         return self.collection.count()
+
+
+def create_vector_store(backend: str = None, embedding_function: EmbeddingFunction = None) -> BaseVectorStore:
+    """Build the vector store backend selected by ``knowledge.backend``."""
+    backend = backend or config.get("knowledge.backend", "chroma")
+    if embedding_function is None:
+        from knowledge.embeddings import get_embedding_function
+        embedding_function = get_embedding_function()
+    if backend == "chroma":
+        return ChromaVectorStore(embedding_function=embedding_function)
+    if backend == "numpy":
+        from knowledge.numpy_store import NumpyVectorStore
+        return NumpyVectorStore(embedding_function=embedding_function)
+    raise ValueError(f"Unknown knowledge backend: {backend!r} (expected 'chroma' or 'numpy')")
@@ -14,12 +14,18 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from core.config import config
 
 
-def run_cli():
+def _local_agent():
+    from core.agent import Agent
+    agent = Agent()
+    agent.register_default_skills()
+    return agent
+
+
+def run_cli(use_daemon: bool = True):
     """Run the interactive CLI chat interface."""
     from rich.console import Console
     from rich.markdown import Markdown
     from rich.panel import Panel
-    from core.agent import Agent
     from core.i18n import _
 
     console = Console()
@@ -33,8 +39,13 @@ def run_cli():
         border_style="cyan",
     ))
 
-    agent = Agent()
-    agent.register_default_skills()
+    # Talk to a warm daemon when one is running, else build the agent here
+    agent = None
+    if use_daemon and config.get("daemon.enabled", True):
+        from core.daemon import DaemonClient
+        agent = DaemonClient.connect()
+    if agent is None:
+        agent = _local_agent()
 
     _ctrl_c_count = 0  # track consecutive Ctrl+C presses
 
@@ -82,8 +93,18 @@ def run_cli():
                     continue
 
             # Send message to agent
-            with console.status(f"[bold cyan]{_('Thinking...')}[/bold cyan]", spinner="dots"):
-                reply = agent.chat(user_input)
+            with console.status(f"[bold cyan]{_('Thinking...')}[/bold cyan]", spinner="dots") as status:
+                def on_event(event):
+                    if event.get("type") == "tool":
+                        status.update(f"[bold cyan]{_('Running {name}...').format(name=event['name'])}[/bold cyan]")
+
+                try:
+                    reply = agent.chat(user_input, on_event=on_event)
+                except ConnectionError:
+                    # Daemon exited (idle timeout or stopped) - continue locally
+                    console.print(f"[dim]{_('Daemon unavailable, continuing in-process')}[/dim]")
+                    agent = _local_agent()
+                    reply = agent.chat(user_input, on_event=on_event)
 
             console.print()
             console.print(Markdown(reply), style="white")
@@ -106,25 +127,116 @@ def run_server():
     start_server()
 
 
+def run_eval(args):
+    """Run a JSONL prompt set through concurrent agents and print a summary."""
+    import json
+    from pathlib import Path
+    from core.evaluation import format_summary, run_batch
+
+    if not args.input:
+        raise SystemExit("eval: an input JSONL file is required")
+    if args.no_router:
+        # Let the LLM pick every tool, which is what prompt edits change
+        config.data.setdefault("agent", {}).setdefault("router", {})["enabled"] = False
+    output = args.output or str(Path(args.input).with_suffix(".results.jsonl"))
+
+    def progress(record, done, total):
+        status = "error: " + record["error"] if record["error"] else ", ".join(record["tools"]) or "-"
+        print(f"[{done}/{total}] {record['id']}  {record['latency_ms']:.0f} ms  {status}", flush=True)
+
+    summary = run_batch(args.input, output, concurrency=args.concurrency, rate=args.rate,
+                        limit=args.limit, on_result=progress)
+    print(f"\nResults: {output}")
+    print(format_summary(summary))
+    if args.summary:
+        Path(args.summary).write_text(json.dumps(summary, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def run_daemon(stop: bool = False, detach: bool = False, config_path: str = None):
+    """Start (or stop) the warm agent daemon used by the CLI."""
+    from core import daemon
+
+    if not daemon.supported():
+        print("Daemon mode requires Unix domain socket support")
+        sys.exit(1)
+
+    client = daemon.DaemonClient.connect()
+    if stop:
+        if client is None:
+            print("No daemon running")
+        else:
+            client.shutdown()
+            print("Daemon stopped")
+        return
+    if client is not None:
+        print(f"Daemon already running (pid {client.ping()['pid']}) on {daemon.socket_path()}")
+        return
+
+    if detach:
+        import subprocess
+        cmd = [sys.executable, os.path.abspath(__file__), "daemon"]
+        if config_path:
+            cmd += ["--config", config_path]
+        subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        print(f"Daemon starting on {daemon.socket_path()}")
+        return
+
+    print(f"Daemon listening on {daemon.socket_path()}")
+    daemon.AgentDaemon().serve_forever()
+
+
 def main():
     parser = argparse.ArgumentParser(description="SkillAgent - AI Skill Assistant")
     parser.add_argument(
         "mode",
         nargs="?",
         default="cli",
-        choices=["cli", "server"],
-        help="Running mode: cli=interactive CLI (default), server=API server",
+        choices=["cli", "server", "daemon", "eval"],
+        help="Running mode: cli=interactive CLI (default), server=API server, "
+             "daemon=warm background agent for the CLI, eval=batch prompt evaluation",
     )
+    parser.add_argument("input", nargs="?", help="eval: JSONL prompt set")
     parser.add_argument(
         "--config",
         default=None,
         help="Config file path (default: config.yaml)",
     )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="cli: always run the agent in-process, even if a daemon is running",
+    )
+    parser.add_argument("--detach", action="store_true", help="daemon: start in the background")
+    parser.add_argument("--stop", action="store_true", help="daemon: stop the running daemon")
+    parser.add_argument("--output", help="eval: results JSONL (default: <input>.results.jsonl); "
+                                         "rerunning resumes it")
+    parser.add_argument("--concurrency", type=int, default=4, help="eval: prompts run at once")
+    parser.add_argument("--rate", type=float, default=0.0, help="eval: max LLM requests per second (0 = unlimited)")
+    parser.add_argument("--limit", type=int, default=0, help="eval: run at most N pending prompts")
+    parser.add_argument("--no-router", action="store_true", help="eval: disable the intent router")
+    parser.add_argument("--summary", help="eval: also write the summary as JSON to this file")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", metavar="PATH",
+                          help="Record LLM and upstream calls to a cassette file")
+    cassette.add_argument("--replay", metavar="PATH",
+                          help="Answer LLM and upstream calls from a recorded cassette file")
 
     args = parser.parse_args()
 
     # Load config first so i18n can read the language setting
     config.load(args.config)
+    if args.record or args.replay:
+        config.data["cassette"] = {
+            **(config.get("cassette", {}) or {}),
+            "mode": "record" if args.record else "replay",
+            "path": args.record or args.replay,
+        }
 
     # Initialise i18n (UI strings) and prompt_loader (LLM-facing prompts)
     from core.i18n import setup as i18n_setup
@@ -136,8 +248,13 @@ def main():
     if args.mode == "server":
         print("Starting API server...")
         run_server()
+    elif args.mode == "eval":
+        run_eval(args)
+    elif args.mode == "daemon":
+        run_daemon(stop=args.stop, detach=args.detach, config_path=args.config)
     else:
-        run_cli()
+        # A daemon would make the calls itself, outside the cassette
+        run_cli(use_daemon=not args.no_daemon and config.get("cassette.mode", "off") in ("off", False))
 
 
 if __name__ == "__main__":
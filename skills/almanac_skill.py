@@ -22,6 +22,15 @@ class AlmanacSkill(BaseSkill):
         "required": [],
     }
 
+    # Seeded by the date: same answer all day
+    cacheable = True
+    expires_at_midnight = True
+
+    intent_patterns = [
+        r"(今天|今日)?(的)?(老)?黄历",
+        r"(今天|今日)(的)?(宜忌|宜什么|忌什么)",
+    ]
+
     STEMS = ["甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸"]
     BRANCHES = ["子", "丑", "寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥"]
 
@@ -64,13 +73,14 @@ class AlmanacSkill(BaseSkill):
         cai_pos = rnd.choice(self.DIRECTIONS)
         xi_pos = rnd.choice(self.DIRECTIONS)
         note = rnd.choice(self.NOTES)
+        sep = "\u3001"
 
         return (
             _("【Today's Almanac (entertainment only)】") + "\n"
             f"Date: {dt.strftime('%Y-%m-%d')}\n"
             f"Year stem-branch: {self._ganzhi_year(dt.year)}\n"
-            f"Auspicious: {'\u3001'.join(yi)}\n"
-            f"Inauspicious: {'\u3001'.join(ji)}\n"
+            f"Auspicious: {sep.join(yi)}\n"
+            f"Inauspicious: {sep.join(ji)}\n"
             f"Wealth direction: {cai_pos}\n"
             f"Joy direction: {xi_pos}\n"
             f"Daily note: {note}\n"
@@ -2,9 +2,59 @@
 Base skill class - all skills must inherit from this.
 """
 
+import time
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
 from typing import Any
 
+# Monotonic deadline of the skill call running in this context (set by
+# SkillRegistry.execute); read it through remaining_time().
+_deadline: ContextVar[float | None] = ContextVar("skill_deadline", default=None)
+# Cancellation event of the turn the skill call belongs to; see cancelled()
+_cancel: ContextVar[Any] = ContextVar("skill_cancel", default=None)
+
+
+def remaining_time(default: float) -> float:
+    """Seconds left before the current skill call's deadline.
+
+    Skills pass this as the timeout of their own network calls so a request
+    gives up when the registry stops waiting for it. Returns *default* when
+    no deadline is set, and never less than 0.1s.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    return max(min(default, deadline - time.monotonic()), 0.1)
+
+
+def cancelled() -> bool:
+    """Whether the turn this skill call belongs to was cancelled.
+
+    Nobody will read the result any more; skills making several upstream
+    calls can check this between them and give up early.
+    """
+    event = _cancel.get()
+    return event is not None and event.is_set()
+
+
+class SkillError(Exception):
+    """A skill failed in an expected way (network error, bad input, ...).
+
+    The message is returned to the LLM as the skill result, like a normal
+    return value, but it is never cached.
+    """
+
+
+class SkillFailure(str):
+    """Text of a failed skill call.
+
+    SkillRegistry.execute returns failures (SkillError, timeouts, an open
+    circuit, bugs) as this str subclass so callers can tell them from
+    results without parsing the message. Skills may also return one for
+    expected failures that should not count against their circuit breaker,
+    such as invalid arguments.
+    """
+
 
 class BaseSkill(ABC):
     """
@@ -37,8 +87,40 @@ class BaseSkill(ABC):
     description: str = ""
     parameters: dict = {"type": "object", "properties": {}}
 
+    # Optional fast-path routing (see core/router.py). Regexes that must match
+    # the whole user message; named groups are passed as arguments. Keep them
+    # literal so lazily registered skills can be routed without importing.
+    intent_patterns: list[str] = []
+    # Sample phrasings for the optional embedding classifier
+    intent_examples: list[str] = []
+    # Extra search terms for per-turn tool selection (core/tool_selector.py),
+    # e.g. synonyms users say that the description does not contain
+    keywords: list[str] = []
+
+    # Result memoization in SkillRegistry.execute. Set cacheable for skills
+    # whose output depends only on their arguments (and the date / a short
+    # time window). ttl is in seconds (None = no time limit); with
+    # expires_at_midnight results also expire at the next local midnight.
+    cacheable: bool = False
+    ttl: int | None = None
+    expires_at_midnight: bool = False
+    # The skill only reads state, so the agent may answer a repeated call
+    # with the same arguments in one turn from the first (see
+    # agent.dedupe_tool_calls). Implied by cacheable; leave it False for
+    # skills that change something, such as saving or deleting entries.
+    read_only: bool = False
+
+    # Seconds SkillRegistry.execute waits for a result (None = the
+    # skills.default_timeout setting). Skills that call upstream services
+    # should also size their own I/O timeouts with remaining_time().
+    timeout: float | None = None
+
+    # Token budget for one result before it enters the conversation context
+    # (None = the agent.tool_result_tokens setting); see core/tokens.py
+    max_result_tokens: int | None = None
+
     @abstractmethod
-    def execute(self, **kwargs) -> str:
+    def execute(self, **kwargs) -> Any:
         """
         Execute the skill with the given parameters.
         
@@ -46,10 +128,29 @@ class BaseSkill(ABC):
             **kwargs: Parameters matching the schema defined in `parameters`
             
         Returns:
-            A string result to be sent back to the LLM
+            A string result to be sent back to the LLM, or structured data
+            (dict, list, dataclass) that format_result() turns into text
         """
         pass
 
+    def format_result(self, data: Any, style: str = "dense") -> str:
+        """Serialize an execute() result; strings are returned unchanged.
+
+        style "dense" is the compact form sent to the LLM, "pretty" the
+        readable form shown to people (see skills/result_format.py).
+        """
+        if isinstance(data, str):
+            return data
+        if style == "pretty":
+            return self.format_pretty(data)
+        from skills.result_format import dense
+        return dense(data)
+
+    def format_pretty(self, data: Any) -> str:
+        """Readable text of a structured result - override for a custom layout."""
+        from skills.result_format import pretty
+        return pretty(data)
+
     def get_tool_definition(self) -> dict:
         """Get the OpenAI function-calling tool definition.
 
@@ -22,6 +22,19 @@ class DateTimeSkill(BaseSkill):
         "required": [],
     }
 
+    read_only = True
+
+    keywords = ["time", "date", "clock", "weekday", "timezone", "utc", "几点", "日期", "时间", "星期", "时区"]
+
+    intent_patterns = [
+        r"(今天|今日|现在)?(是)?(几月)?几号(了)?",
+        r"(今天|今日)?(是)?(星期|周|礼拜)几(了)?",
+        r"(现在)?几点(了|钟)?(了)?",
+        r"(今天|现在)?(的)?(日期|时间)(是)?(多少|什么)?",
+        r"what(?:'s| is) (?:the )?(?:date|time)(?: today| now)?",
+        r"what day is (?:it|today)",
+    ]
+
     # Weekday names indexed Monday=0 .. Sunday=6 (translated at runtime)
     WEEKDAY_KEYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
@@ -26,6 +26,10 @@ class DivinationSkill(BaseSkill):
         "required": ["question"],
     }
 
+    # Seeded by question + date: same answer all day
+    cacheable = True
+    expires_at_midnight = True
+
     STEMS = ["甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸"]
     BRANCHES = ["子", "丑", "寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥"]
     ELEMENT_BY_STEM = {
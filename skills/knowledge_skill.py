@@ -2,7 +2,10 @@
 Knowledge management skill - save, search, list, delete personal knowledge.
 """
 
-from skills.base import BaseSkill
+import json
+
+from core.config import config
+from skills.base import BaseSkill, SkillFailure
 from knowledge.knowledge_manager import KnowledgeManager
 
 
@@ -25,67 +28,112 @@ class KnowledgeSkill(BaseSkill):
                 "type": "string",
                 "description": "For save: text to store; for search: query string; for delete: knowledge ID",
             },
+            "offset": {
+                "type": "integer",
+                "description": "For list: number of entries to skip, used to fetch the next page",
+                "default": 0,
+            },
             "tags": {
                 "type": "string",
-                "description": "Optional comma-separated tags, e.g. 'python,programming,tips'",
+                "description": (
+                    "Optional comma-separated tags, e.g. 'python,programming,tips'. "
+                    "For save: tags to attach; for search/list: only entries carrying all of these tags"
+                ),
+            },
+            "where": {
+                "type": "object",
+                "description": (
+                    "Optional metadata filter for search/list on 'source' or 'created_at' "
+                    "(\"YYYY-MM-DD HH:MM:SS\"), e.g. {\"source\": \"web\"} or "
+                    "{\"created_at\": {\"$gte\": \"2026-01-01\"}}; operators $eq $ne $gt $gte $lt $lte $in $nin, "
+                    "combine with $and / $or"
+                ),
             },
         },
         "required": ["action"],
     }
 
-    def __init__(self):
-        self.km = KnowledgeManager()
+    @property
+    def km(self) -> KnowledgeManager:
+        return KnowledgeManager()
+
+    @staticmethod
+    def _split_tags(tags: str) -> list[str]:
+        return [t.strip() for t in tags.split(",") if t.strip()] if tags else []
 
-    def execute(self, action: str, content: str = "", tags: str = "") -> str:
+    @staticmethod
+    def _entry(item: dict, chars: int = None) -> dict:
+        text = item["text"][:chars] if chars else item["text"]
+        return {"id": item["id"], "text": text, "tags": item["metadata"].get("tags", "")}
+
+    def execute(self, action: str, content: str = "", tags: str = "", offset: int = 0,
+                where: dict | str = None) -> dict | str:
         from core.i18n import _
+        if where:
+            try:
+                where = KnowledgeManager.check_where(json.loads(where) if isinstance(where, str) else where)
+            except ValueError as e:
+                return SkillFailure(f"Error: invalid 'where' filter: {e}")
         try:
             if action == "save":
                 if not content:
                     return _("Error: 'content' is required to save knowledge")
-                tag_list = [t.strip() for t in tags.split(",") if t.strip()] if tags else []
-                doc_id = self.km.save(content=content, tags=tag_list)
-                return f"\u2705 Knowledge saved (ID: {doc_id})\nContent: {content[:100]}..."
+                doc_id = self.km.save(content=content, tags=self._split_tags(tags))
+                return {"saved": doc_id, "content": content[:100]}
 
             elif action == "search":
                 if not content:
                     return _("Error: 'content' is required as the search query")
-                results = self.km.search(content)
+                results = self.km.search(content, tags=self._split_tags(tags), where=where or None)
                 if not results:
                     return _("No related knowledge found.")
-                formatted = []
-                for r in results:
-                    tags_str = r["metadata"].get("tags", "")
-                    formatted.append(
-                        f"- [ID: {r['id']}] {r['text'][:200]}"
-                        + (f" (tags: {tags_str})" if tags_str else "")
-                    )
-                return f"Found {len(results)} related entries:\n" + "\n".join(formatted)
+                return {"found": len(results), "entries": [self._entry(r, 200) for r in results]}
 
             elif action == "list":
-                items = self.km.list_all()
+                offset = max(int(offset or 0), 0)
+                items, next_offset = self.km.list_page(
+                    limit=config.get("knowledge.list_page_size", 20),
+                    offset=offset,
+                    tags=self._split_tags(tags),
+                    where=where or None,
+                    fields="snippet",
+                    snippet_chars=100,
+                )
                 if not items:
-                    return _("Knowledge base is empty.")
-                formatted = []
-                for item in items:
-                    tags_str = item["metadata"].get("tags", "")
-                    formatted.append(
-                        f"- [ID: {item['id']}] {item['text'][:100]}"
-                        + (f" (tags: {tags_str})" if tags_str else "")
-                    )
-                return f"Knowledge base has {len(items)} entries:\n" + "\n".join(formatted)
+                    return _("Knowledge base is empty.") if offset == 0 else _("No more entries.")
+                return {
+                    "range": f"{offset + 1}-{offset + len(items)}",
+                    "entries": [self._entry(item) for item in items],
+                    # Pass as offset to list the next page
+                    "next_offset": next_offset,
+                }
 
             elif action == "delete":
                 if not content:
                     return _("Error: 'content' must be the knowledge ID to delete")
                 success = self.km.delete(content)
-                return (
-                    f"\u2705 Knowledge '{content}' deleted"
-                    if success
-                    else f"\u274c Delete failed - ID not found: {content}"
-                )
+                return {"deleted": content} if success else f"\u274c Delete failed - ID not found: {content}"
 
             else:
                 return _("Unknown action: %s. Supported: save / search / list / delete") % action
 
         except Exception as e:
             return f"Knowledge operation error: {e}"
+
+    def format_pretty(self, data: dict) -> str:
+        if "saved" in data:
+            return f"\u2705 Knowledge saved (ID: {data['saved']})\nContent: {data['content']}..."
+        if "deleted" in data:
+            return f"\u2705 Knowledge '{data['deleted']}' deleted"
+        lines = [
+            f"- [ID: {e['id']}] {e['text']}" + (f" (tags: {e['tags']})" if e["tags"] else "")
+            for e in data["entries"]
+        ]
+        if "found" in data:
+            return f"Found {data['found']} related entries:\n" + "\n".join(lines)
+        footer = (
+            f"\n(More entries available - call list with offset={data['next_offset']})"
+            if data["next_offset"] is not None
+            else ""
+        )
+        return f"Knowledge entries {data['range']}:\n" + "\n".join(lines) + footer
@@ -22,6 +22,15 @@ class LuckyTodaySkill(BaseSkill):
         "required": [],
     }
 
+    # Seeded by the date: same answer all day
+    cacheable = True
+    expires_at_midnight = True
+
+    intent_patterns = [
+        r"(我)?(今天|今日)(的)?(运势|运气|幸运色|幸运数字)(怎么样|如何)?",
+        r"(?:what(?:'s| is) )?my (?:luck|fortune) today",
+    ]
+
     COLORS = ["青色", "金色", "红色", "蓝色", "绿色", "橙色", "紫色", "白色"]
     DIRECTIONS = ["正东", "东南", "正南", "西南", "正西", "西北", "正北", "东北"]
     ACTIONS = [
@@ -1,9 +1,293 @@
 """
 Skill registry - manages skill registration and dispatch.
+
+Skills can be registered eagerly (an instance) or lazily by import target
+("package.module:ClassName"). Lazy skills are described by static metadata -
+read from the class body with ``ast`` or supplied from YAML - and their module
+is imported and the skill instantiated only on first use, so startup cost does
+not grow with the number of skills or their dependencies.
+
+Third-party packages can ship skills by declaring an entry point:
+
+    [project.entry-points."skillagent.skills"]
+    my_skill = "my_package.skills:MySkill"
 """
 
+import ast
+import contextvars
+import importlib
+import importlib.util
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime, timedelta
 from typing import Any
-from skills.base import BaseSkill
+from core.config import config
+from core.cancellation import Cancelled, check as check_cancelled
+from skills.base import BaseSkill, SkillError, SkillFailure, _cancel, _deadline
+
+ENTRY_POINT_GROUP = "skillagent.skills"
+
+logger = logging.getLogger(__name__)
+
+
+def read_skill_metadata(target: str) -> dict[str, Any]:
+    """
+    Read a skill's literal class attributes without importing its module.
+
+    Parses the module source and evaluates each simple ``attr = <literal>``
+    assignment in the class body. Attributes that are not plain literals are
+    skipped.
+
+    Args:
+        target: "package.module:ClassName"
+
+    Returns:
+        Mapping of attribute name to value (empty if the source is unavailable)
+    """
+    module_name, _, class_name = target.partition(":")
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return {}
+    with open(spec.origin, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=spec.origin)
+
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == class_name:
+            break
+    else:
+        return {}
+
+    attrs = {}
+    for stmt in node.body:
+        if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1:
+            target_node, value = stmt.targets[0], stmt.value
+        elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+            target_node, value = stmt.target, stmt.value
+        else:
+            continue
+        if not isinstance(target_node, ast.Name):
+            continue
+        try:
+            attrs[target_node.id] = ast.literal_eval(value)
+        except (ValueError, TypeError, SyntaxError):
+            continue
+    return attrs
+
+
+class LazySkill(BaseSkill):
+    """
+    Stand-in for a skill whose module has not been imported yet.
+
+    Carries the metadata needed to build the tool definition; the real skill
+    is imported and instantiated on first execute(). Other attribute lookups
+    fall through to the loaded skill.
+    """
+
+    def __init__(self, target: str, metadata: dict[str, Any]):
+        self.target = target
+        # Copy static metadata onto the proxy so registry/agent code reads
+        # it exactly as it would from a skill instance.
+        for key, value in metadata.items():
+            setattr(self, key, value)
+        self._skill: BaseSkill | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._skill is not None
+
+    def load(self) -> BaseSkill:
+        """Import the skill's module and instantiate it (once)."""
+        if self._skill is None:
+            with self._lock:
+                if self._skill is None:
+                    self._skill = _import_target(self.target)()
+        return self._skill
+
+    def execute(self, **kwargs) -> Any:
+        return self.load().execute(**kwargs)
+
+    def format_result(self, data: Any, style: str = "dense") -> str:
+        return self.load().format_result(data, style)
+
+    def __getattr__(self, item):
+        # Only reached for attributes missing from the proxy itself
+        if item.startswith("_"):
+            raise AttributeError(item)
+        return getattr(self.load(), item)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazySkill {self.name} ({self.target}, {state})>"
+
+
+def _import_target(target: str):
+    module_name, _, attr = target.partition(":")
+    if not attr:
+        raise ValueError(f"Skill target must look like 'module:ClassName', got {target!r}")
+    obj = importlib.import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def canonical_args(skill: BaseSkill, kwargs: dict) -> str:
+    """
+    Stable cache key for a skill call.
+
+    Schema defaults are filled in, None values dropped and strings stripped,
+    so {"city": "北京"} and {"city": " 北京 ", "days": 3} map to the same key.
+    """
+    props = skill.parameters.get("properties", {})
+    args = {k: spec["default"] for k, spec in props.items() if "default" in spec}
+    for key, value in kwargs.items():
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            args.pop(key, None)
+            continue
+        args[key] = value
+    return json.dumps(args, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class ResultCache:
+    """Bounded LRU cache of skill results with per-entry expiry and stats."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], tuple[Any, float]] = OrderedDict()
+        self._stats: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def expires_at(skill: BaseSkill) -> float:
+        """Absolute expiry time for a result of *skill* computed now."""
+        now = time.time()
+        expiry = now + skill.ttl if skill.ttl else float("inf")
+        if skill.expires_at_midnight:
+            tomorrow = datetime.now().date() + timedelta(days=1)
+            midnight = datetime.combine(tomorrow, datetime.min.time()).timestamp()
+            expiry = min(expiry, midnight)
+        return expiry
+
+    def _count(self, name: str, field: str):
+        self._stats.setdefault(name, {"hits": 0, "misses": 0})[field] += 1
+
+    def get(self, name: str, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get((name, key))
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end((name, key))
+                self._count(name, "hits")
+                return entry[0]
+            if entry is not None:
+                del self._entries[(name, key)]
+            self._count(name, "misses")
+            return None
+
+    def put(self, name: str, key: str, value: Any, expires_at: float):
+        with self._lock:
+            self._entries[(name, key)] = (value, expires_at)
+            self._entries.move_to_end((name, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Per-skill hits/misses/hit_rate plus the current entry count."""
+        with self._lock:
+            skills = {}
+            for name, s in self._stats.items():
+                total = s["hits"] + s["misses"]
+                skills[name] = {**s, "hit_rate": s["hits"] / total if total else 0.0}
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "skills": skills}
+
+
+class CircuitBreaker:
+    """
+    Fail fast after repeated upstream failures.
+
+    closed    - calls go through; ``failure_threshold`` consecutive failures open it
+    open      - calls are rejected until ``reset_timeout`` seconds have passed
+    half_open - one probe call is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.trips += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """End a half-open probe that neither succeeded nor failed upstream.
+
+        The state is left as it is, so the next call becomes the probe.
+        """
+        with self._lock:
+            self._probing = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            snap = {"state": self.state, "failures": self.failures, "trips": self.trips}
+            if self.state == "open":
+                snap["retry_in_s"] = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            return snap
+
+
+# Skill calls run here so the registry can stop waiting for a hung one
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _skill_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=config.get("skills.max_workers", 16),
+                    thread_name_prefix="skill",
+                )
+    return _pool
 
 
 class SkillRegistry:
@@ -11,6 +295,17 @@ class SkillRegistry:
 
     def __init__(self):
         self._skills: dict[str, BaseSkill] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+        self.default_timeout = config.get("skills.default_timeout", 15)
+        # dense | pretty - how structured skill results are serialized
+        self.result_format = config.get("skills.result_format", "dense")
+        # (skill names, language) -> canonical tool list, see get_openai_tools()
+        self._stable_tools: tuple[tuple, list[dict]] | None = None
+        self.cache = (
+            ResultCache(config.get("skills.cache.max_entries", 256))
+            if config.get("skills.cache.enabled", True) else None
+        )
 
     def register(self, skill: BaseSkill):
         """Register a skill instance."""
@@ -18,6 +313,48 @@ class SkillRegistry:
             raise ValueError(f"Skill {type(skill).__name__} must have a name")
         self._skills[skill.name] = skill
 
+    def register_lazy(self, target: str, metadata: dict[str, Any] = None) -> BaseSkill:
+        """
+        Register a skill by import target without importing it.
+
+        Args:
+            target: "package.module:ClassName"
+            metadata: Optional name/description/parameters (e.g. from YAML).
+                Values given here override attributes read from the class body.
+
+        Returns:
+            The registered LazySkill proxy
+        """
+        metadata = metadata or {}
+        # Fully described skills (e.g. from YAML) need not even be parsed
+        if {"name", "description", "parameters"} <= metadata.keys():
+            meta = dict(metadata)
+        else:
+            meta = read_skill_metadata(target)
+            meta.update(metadata)
+        if not meta.get("name"):
+            # Metadata is computed or inherited - fall back to a real import
+            skill = _import_target(target)()
+            self.register(skill)
+            return skill
+        meta.setdefault("description", "")
+        meta.setdefault("parameters", {"type": "object", "properties": {}})
+        skill = LazySkill(target, meta)
+        self.register(skill)
+        return skill
+
+    def discover_entry_points(self, group: str = ENTRY_POINT_GROUP) -> list[str]:
+        """Register every skill advertised under the given entry point group."""
+        from importlib.metadata import entry_points
+
+        names = []
+        for ep in entry_points(group=group):
+            try:
+                names.append(self.register_lazy(ep.value).name)
+            except Exception as e:
+                logger.warning("Failed to register skill plugin %s (%s): %s", ep.name, ep.value, e)
+        return names
+
     def unregister(self, name: str):
         """Remove a skill by name."""
         self._skills.pop(name, None)
@@ -26,19 +363,149 @@ class SkillRegistry:
         """Get a skill by name."""
         return self._skills.get(name)
 
-    def execute(self, name: str, kwargs: dict) -> str:
-        """Execute a skill by name with arguments."""
+    def _breaker(self, name: str) -> CircuitBreaker:
+        with self._breakers_lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(
+                    failure_threshold=config.get("skills.breaker.failure_threshold", 3),
+                    reset_timeout=config.get("skills.breaker.reset_timeout", 30),
+                )
+            return breaker
+
+    def execute(self, name: str, kwargs: dict, deadline: float = None, style: str = None,
+                cancel: threading.Event = None) -> str:
+        """Execute a skill by name with arguments.
+
+        Results of skills marked ``cacheable`` are memoized (see ResultCache);
+        failures are never cached. Structured results are serialized with
+        the skill's format_result() in *style* (default: skills.result_format),
+        so the cache serves both the dense and the pretty form.
+
+        The call is abandoned after the skill's ``timeout`` or at *deadline*
+        (a time.monotonic() value, e.g. the end of the agent's turn budget),
+        whichever comes first. Timeouts and SkillErrors count towards the
+        skill's circuit breaker; while it is open, calls fail immediately.
+        Every failure is reported as a short SkillFailure string for the LLM.
+
+        Once *cancel* is set the registry stops waiting and raises
+        core.cancellation.Cancelled; the skill sees it through
+        skills.base.cancelled().
+        """
         skill = self._skills.get(name)
         if not skill:
-            return f"Error: Unknown skill '{name}'"
+            return SkillFailure(f"Error: Unknown skill '{name}'")
+
+        key = None
+        if self.cache is not None and skill.cacheable:
+            key = canonical_args(skill, kwargs)
+            cached = self.cache.get(name, key)
+            if cached is not None:
+                return self._format(skill, cached, style)
+
+        timeout = skill.timeout or self.default_timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                return SkillFailure(
+                    f"Error: no time left in this turn to run {name}; answer with the information you have."
+                )
+
+        breaker = self._breaker(name)
+        if not breaker.allow():
+            return SkillFailure(
+                f"Error: {name} is temporarily unavailable after repeated failures; "
+                "answer without it or try again later."
+            )
+
+        # Skills read their deadline via skills.base.remaining_time()
+        token = _deadline.set(time.monotonic() + timeout)
+        cancel_token = _cancel.set(cancel)
+        ctx = contextvars.copy_context()
+        _cancel.reset(cancel_token)
+        _deadline.reset(token)
+        future = _skill_pool().submit(ctx.run, skill.execute, **kwargs)
         try:
-            return skill.execute(**kwargs)
+            result = self._wait(future, timeout, cancel)
+        except Cancelled:
+            # Not a failure, but a half-open probe must free its slot
+            future.cancel()
+            breaker.release_probe()
+            raise
+        except FutureTimeout:
+            breaker.record_failure()
+            return SkillFailure(f"Error: {name} timed out after {timeout:.1f}s.")
+        except SkillError as e:
+            breaker.record_failure()
+            return SkillFailure(str(e))
         except Exception as e:
-            return f"Error executing {name}: {str(e)}"
+            # Bad arguments or a bug - not an upstream outage, so nothing is
+            # recorded, but a half-open probe must still free its slot
+            breaker.release_probe()
+            return SkillFailure(f"Error executing {name}: {str(e)}")
+
+        if isinstance(result, SkillFailure):
+            # Failure reported by the skill itself (e.g. invalid arguments):
+            # not cached, and not an upstream outage
+            breaker.release_probe()
+            return result
+        breaker.record_success()
+        if key is not None:
+            self.cache.put(name, key, result, ResultCache.expires_at(skill))
+        return self._format(skill, result, style)
+
+    @staticmethod
+    def _wait(future, timeout: float, cancel: threading.Event = None):
+        """future.result(timeout), raising Cancelled as soon as *cancel* is set."""
+        if cancel is None:
+            return future.result(timeout=timeout)
+        end = time.monotonic() + timeout
+        while True:
+            check_cancelled(cancel)
+            left = end - time.monotonic()
+            if left <= 0:
+                raise FutureTimeout()
+            try:
+                return future.result(timeout=min(left, 0.05))
+            except FutureTimeout:
+                continue
+            except Exception:
+                # A skill that gave up because of the cancellation has not failed
+                check_cancelled(cancel)
+                raise
+
+    def _format(self, skill: BaseSkill, data: Any, style: str = None) -> str:
+        try:
+            return skill.format_result(data, style or self.result_format)
+        except Exception as e:
+            return SkillFailure(f"Error formatting {skill.name} result: {e}")
+
+    def breaker_states(self) -> dict:
+        """Circuit breaker state per skill that has been called."""
+        with self._breakers_lock:
+            breakers = dict(self._breakers)
+        return {name: b.snapshot() for name, b in breakers.items()}
+
+    def cache_stats(self) -> dict:
+        """Per-skill result cache statistics (empty when caching is disabled)."""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def get_openai_tools(self, stable: bool = False) -> list[dict]:
+        """Get all skills as OpenAI tool definitions.
 
-    def get_openai_tools(self) -> list[dict]:
-        """Get all skills as OpenAI tool definitions."""
-        return [skill.get_tool_definition() for skill in self._skills.values()]
+        With *stable* the list is sorted by skill name, every mapping has its
+        keys sorted, and the same list is returned until the registered
+        skills or the prompt language change - so it serializes to identical
+        bytes on every request, as provider prompt caching requires.
+        """
+        if not stable:
+            return [skill.get_tool_definition() for skill in self._skills.values()]
+        from core import prompt_loader
+        key = (tuple(sorted(self._skills)), prompt_loader.active_language())
+        if self._stable_tools is None or self._stable_tools[0] != key:
+            tools = [self._skills[name].get_tool_definition() for name in key[0]]
+            self._stable_tools = (key, json.loads(json.dumps(tools, sort_keys=True, ensure_ascii=False)))
+        return self._stable_tools[1]
 
     def list_skills(self) -> list[str]:
         """List all registered skill names."""
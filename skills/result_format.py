@@ -0,0 +1,112 @@
+"""
+Serializers for structured skill results.
+
+A skill's execute() may return a dict, list or dataclass instead of text.
+SkillRegistry.execute turns it into a string with BaseSkill.format_result:
+
+    dense   compact, label-light text for the LLM (default; skills.result_format)
+    pretty  readable text for people, e.g. router template replies; skills
+            override BaseSkill.format_pretty for their own layout
+
+Dense output writes one "key: value" line per field, scalar-only mappings
+as "key: a=1 b=2", and lists of uniform records as a table whose header
+names the columns once:
+
+    location: Beijing
+    now: cond=Cloudy temp_c=21.5 humidity_pct=55
+    days[date|cond|lo_c|hi_c]:
+    2026-01-01|Clear|15.0|24.0
+
+A "|" inside a table cell is written as "\\|".
+"""
+
+import dataclasses
+import json
+
+_EMPTY = (None, "", [], {})
+
+
+def to_plain(data):
+    """Dataclasses (recursively) to dicts; everything else unchanged."""
+    if dataclasses.is_dataclass(data) and not isinstance(data, type):
+        return dataclasses.asdict(data)
+    return data
+
+
+def _scalar(value) -> bool:
+    return isinstance(value, (str, int, float, bool))
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if _scalar(value):
+        return " ".join(str(value).split())
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _table_cell(value) -> str:
+    return _cell(value).replace("|", "\\|")
+
+
+def _table(key: str, rows: list[dict]) -> list[str]:
+    columns = list(rows[0])
+    lines = [f"{key}[{'|'.join(_table_cell(c) for c in columns)}]:"]
+    lines += ["|".join(_table_cell(row.get(c)) for c in columns) for row in rows]
+    return lines
+
+
+def _dense_field(key: str, value) -> list[str]:
+    if _scalar(value):
+        return [f"{key}: {value}"]
+    if isinstance(value, dict) and all(_scalar(v) or v is None for v in value.values()):
+        pairs = " ".join(f"{k}={_cell(v)}" for k, v in value.items() if v not in _EMPTY)
+        return [f"{key}: {pairs}"]
+    if isinstance(value, list) and value and all(isinstance(v, dict) for v in value) \
+            and all(v.keys() == value[0].keys() for v in value):
+        return _table(key, value)
+    if isinstance(value, list) and all(_scalar(v) for v in value):
+        return [f"{key}: {', '.join(_cell(v) for v in value)}"]
+    return [f"{key}: {_cell(value)}"]
+
+
+def dense(data) -> str:
+    """Token-efficient text of a structured result."""
+    data = to_plain(data)
+    if isinstance(data, dict):
+        lines = []
+        for key, value in data.items():
+            if value not in _EMPTY:
+                lines += _dense_field(key, to_plain(value))
+        return "\n".join(lines)
+    if isinstance(data, list) and data and all(isinstance(v, dict) for v in data) \
+            and all(v.keys() == data[0].keys() for v in data):
+        return "\n".join(_table("items", data))
+    if isinstance(data, list):
+        return "\n".join(_cell(v) for v in data)
+    return _cell(data)
+
+
+def pretty(data, indent: int = 0) -> str:
+    """Indented, human-readable text of a structured result."""
+    data = to_plain(data)
+    pad = "  " * indent
+    if isinstance(data, dict):
+        lines = []
+        for key, value in data.items():
+            if value in _EMPTY:
+                continue
+            label = str(key).replace("_", " ").capitalize()
+            if _scalar(value):
+                lines.append(f"{pad}{label}: {value}")
+            else:
+                lines.append(f"{pad}{label}:")
+                lines.append(pretty(value, indent + 1))
+        return "\n".join(lines)
+    if isinstance(data, list):
+        lines = []
+        for item in data:
+            text = pretty(item, indent + 1).lstrip()
+            lines.append(f"{pad}- {text}")
+        return "\n".join(lines)
+    return f"{pad}{data}"
@@ -27,6 +27,10 @@ class TarotCareerSkill(BaseSkill):
         "required": ["question"],
     }
 
+    # Seeded by question + date: same answer all day
+    cacheable = True
+    expires_at_midnight = True
+
     DECK = [
         "愚者", "魔术师", "女祭司", "女皇", "皇帝", "教皇", "恋人", "战车", "力量", "隐者", "命运之轮",
         "正义", "倒吊人", "死神", "节制", "恶魔", "高塔", "星星", "月亮", "太阳", "审判", "世界",
@@ -5,6 +5,10 @@ Data sources (all free, no API key required):
   - IP geolocation : ip-api.com/json       (fallback when no city given)
   - City geocoding : nominatim.openstreetmap.org
   - Weather        : api.open-meteo.com    (WMO-standard codes, metric units)
+
+The endpoints can be overridden under skills.weather (geoip_url,
+geocode_url, forecast_url), e.g. to point at the offline stubs in
+benchmarks/mock_upstream.py.
 """
 
 import json
@@ -12,7 +16,7 @@ import urllib.request
 import urllib.parse
 from datetime import datetime
 
-from skills.base import BaseSkill
+from skills.base import BaseSkill, SkillError, SkillFailure, cancelled, remaining_time
 
 # WMO Weather interpretation codes → Chinese description
 _WMO: dict[int, str] = {
@@ -31,13 +35,34 @@ _WMO: dict[int, str] = {
     96: "雷阵雨伴冰雹", 99: "强雷阵雨伴冰雹",
 }
 
+# Default upstream endpoints (see skills.weather.* in config)
+_ENDPOINTS = {
+    "geoip_url": "http://ip-api.com/json/",
+    "geocode_url": "https://nominatim.openstreetmap.org/search",
+    "forecast_url": "https://api.open-meteo.com/v1/forecast",
+}
+
+def _endpoint(key: str) -> str:
+    from core.config import config
+    return config.get(f"skills.weather.{key}", _ENDPOINTS[key])
+
 def _wmo(code: int | str) -> str:
     return _WMO.get(int(code), f"未知({code})")
 
+class _CityNotFound(ValueError):
+    """The geocoder has no match for the requested city (bad input, not an outage)."""
+
+
 def _get_json(url: str, timeout: int = 10) -> dict:
-    req = urllib.request.Request(url, headers={"User-Agent": "VcbalAgent/1.0"})
-    with urllib.request.urlopen(req, timeout=timeout) as r:
-        return json.loads(r.read().decode())
+    def fetch():
+        req = urllib.request.Request(url, headers={"User-Agent": "VcbalAgent/1.0"})
+        # Never outlive the registry's deadline for this skill call
+        with urllib.request.urlopen(req, timeout=remaining_time(timeout)) as r:
+            return json.loads(r.read().decode())
+
+    from core.cassette import active
+    cassette = active()
+    return cassette.call("http", {"url": url}, fetch) if cassette else fetch()
 
 
 class WeatherSkill(BaseSkill):
@@ -65,6 +90,29 @@ class WeatherSkill(BaseSkill):
         "required": [],
     }
 
+    # Forecasts change slowly; reuse results for a few minutes
+    cacheable = True
+    ttl = 600
+    # Up to two sequential upstream calls (geocode + forecast)
+    timeout = 12
+
+    keywords = ["weather", "forecast", "temperature", "rain", "snow", "wind", "天气", "气温", "下雨", "预报", "温度"]
+
+    intent_patterns = [
+        # The city may not contain a day or period word, a pronoun or a
+        # place word like 这里 / 外面; only today / tomorrow / the day after
+        # (covered by the forecast) may follow it, so "昨天天气", "上海这周天气"
+        # or "你觉得天气怎么样" is left to the LLM
+        r"(?P<city>(?:(?!今天|今日|今晚|明天|明日|明早|明晚|后天|昨天|昨日|前天|周末|周[一二三四五六日天]|星期|礼拜"
+        r"|这|那里|那儿|那边|哪|外面|外边|室外|户外|本地|当地|附近|我|你|您|他|她|咱|觉得|感觉|认为|什么|怎么"
+        r"|本周|下周|上周|现在|早上|晚上|上午|下午|中午|未来|最近|近期|一周)[\u4e00-\u9fff]){2,6}?)?"
+        r"(今天|今日|现在|明天|后天)?(的)?天气(怎么样|如何|预报)?",
+        r"(?:what(?:'s| is) the )?weather(?: (?:today|now|tomorrow))?"
+        r"(?: in (?P<city>(?!(?:today|tonight|now|tomorrow|yesterday|this|next|last|weekend|week)\b)[a-z.'-]+"
+        r"(?: (?!(?:today|tonight|now|tomorrow|yesterday|this|next|last|weekend|week)\b)[a-z.'-]+)*))?"
+        r"(?: (?:today|now|tomorrow))?",
+    ]
+
     # ------------------------------------------------------------------ #
     #  Internal helpers                                                    #
     # ------------------------------------------------------------------ #
@@ -75,7 +123,7 @@ class WeatherSkill(BaseSkill):
         Return (lat, lon, display_name) inferred from the outbound IP address.
         Uses ip-api.com (free, no key, max 45 req/min).
         """
-        data = _get_json("http://ip-api.com/json/?fields=status,message,lat,lon,city,regionName,country")
+        data = _get_json(f"{_endpoint('geoip_url')}?fields=status,message,lat,lon,city,regionName,country")
         if data.get("status") != "success":
             raise ValueError(f"IP geolocation failed: {data.get('message', 'unknown error')}")
         city    = data.get("city", "")
@@ -93,10 +141,10 @@ class WeatherSkill(BaseSkill):
             "limit": 1,
             "addressdetails": 0,
         })
-        url = f"https://nominatim.openstreetmap.org/search?{params}"
+        url = f"{_endpoint('geocode_url')}?{params}"
         data = _get_json(url)
         if not data:
-            raise ValueError(f"City not found: {city!r}")
+            raise _CityNotFound(city)
         r = data[0]
         return float(r["lat"]), float(r["lon"]), r.get("display_name", city)
 
@@ -126,77 +174,103 @@ class WeatherSkill(BaseSkill):
             "forecast_days": min(max(days, 1), 7),
             "wind_speed_unit": "kmh",
         })
-        url = f"https://api.open-meteo.com/v1/forecast?{params}"
+        url = f"{_endpoint('forecast_url')}?{params}"
         return _get_json(url)
 
     # ------------------------------------------------------------------ #
     #  Execute                                                             #
     # ------------------------------------------------------------------ #
 
-    def execute(self, city: str | None = None, days: int = 3) -> str:  # type: ignore[override]
+    def execute(self, city: str | None = None, days: int = 3) -> dict | SkillFailure:  # type: ignore[override]
         try:
             # 1. Resolve location: city name → nominatim, or IP → ip-api.com
             if city:
                 lat, lon, display_name = self._geocode(city)
-                location_note = ""
             else:
                 lat, lon, display_name = self._geolocate_by_ip()
-                location_note = "  (根据 IP 推断)"
+            if cancelled():
+                raise SkillError("cancelled")
 
             # 2. Fetch weather
             w = self._fetch_weather(lat, lon, days)
 
-            # 3. Format current conditions
+            # 3. Current conditions and daily forecast as plain data; the
+            #    LLM gets the dense form, people the layout of format_pretty()
             cur = w["current"]
-            cur_time = cur.get("time", "")[:16].replace("T", " ")
-            timezone = w.get("timezone", "")
-
-            lines = [
-                f"📍 {display_name.split(',')[0]}  ({lat:.2f}°N, {lon:.2f}°E){location_note}",
-                f"🕐 观测时间：{cur_time}  ({timezone})",
-                "",
-                "━━━ 当前天气 ━━━",
-                f"天气状况：{_wmo(cur['weather_code'])}",
-                f"温度：{cur['temperature_2m']} °C"
-                f"  体感：{cur['apparent_temperature']} °C",
-                f"湿度：{cur['relative_humidity_2m']} %",
-                f"风速：{cur['wind_speed_10m']} km/h",
-                f"小时降水：{cur['precipitation']} mm",
-                "",
-                f"━━━ 未来 {days} 天预报 ━━━",
-            ]
-
-            # 4. Format daily forecast
             daily = w["daily"]
-            for i in range(min(days, len(daily["time"]))):
-                date_str = daily["time"][i]
-                try:
-                    dt = datetime.strptime(date_str, "%Y-%m-%d")
-                    if i == 0:
-                        label = "今天"
-                    elif i == 1:
-                        label = "明天"
-                    elif i == 2:
-                        label = "后天"
-                    else:
-                        label = dt.strftime("%m/%d")
-                except ValueError:
-                    label = date_str
-
-                desc = _wmo(daily["weather_code"][i])
-                hi   = daily["temperature_2m_max"][i]
-                lo   = daily["temperature_2m_min"][i]
-                rain = daily["precipitation_sum"][i]
-                wind = daily["wind_speed_10m_max"][i]
-
-                lines.append(
-                    f"{label}({date_str})  {desc}  "
-                    f"{lo}~{hi} °C  "
-                    f"雨量:{rain} mm  "
-                    f"最大风速:{wind} km/h"
-                )
-
-            return "\n".join(lines)
+            return {
+                "location": display_name.split(",")[0],
+                "lat": round(lat, 2),
+                "lon": round(lon, 2),
+                "located_by": None if city else "ip",
+                "observed": cur.get("time", "")[:16].replace("T", " "),
+                "timezone": w.get("timezone", ""),
+                "now": {
+                    "cond": _wmo(cur["weather_code"]),
+                    "temp_c": cur["temperature_2m"],
+                    "feels_c": cur["apparent_temperature"],
+                    "humidity_pct": cur["relative_humidity_2m"],
+                    "wind_kmh": cur["wind_speed_10m"],
+                    "precip_mm": cur["precipitation"],
+                },
+                "days": [
+                    {
+                        "date": daily["time"][i],
+                        "cond": _wmo(daily["weather_code"][i]),
+                        "lo_c": daily["temperature_2m_min"][i],
+                        "hi_c": daily["temperature_2m_max"][i],
+                        "rain_mm": daily["precipitation_sum"][i],
+                        "wind_kmh": daily["wind_speed_10m_max"][i],
+                    }
+                    for i in range(min(days, len(daily["time"])))
+                ],
+            }
 
+        except _CityNotFound:
+            # Invalid argument: reported, but not counted against the breaker
+            return SkillFailure(f"天气查询失败：未找到城市 {city!r}，请换一个地名再试")
         except Exception as e:
-            return f"天气查询失败：{e}"
+            # Not cached, so the next identical query retries
+            raise SkillError(f"天气查询失败：{e}") from e
+
+    def format_pretty(self, data: dict) -> str:
+        location_note = "  (根据 IP 推断)" if data.get("located_by") == "ip" else ""
+        now = data["now"]
+        lines = [
+            f"📍 {data['location']}  ({data['lat']:.2f}°N, {data['lon']:.2f}°E){location_note}",
+            f"🕐 观测时间：{data['observed']}  ({data['timezone']})",
+            "",
+            "━━━ 当前天气 ━━━",
+            f"天气状况：{now['cond']}",
+            f"温度：{now['temp_c']} °C"
+            f"  体感：{now['feels_c']} °C",
+            f"湿度：{now['humidity_pct']} %",
+            f"风速：{now['wind_kmh']} km/h",
+            f"小时降水：{now['precip_mm']} mm",
+            "",
+            f"━━━ 未来 {len(data['days'])} 天预报 ━━━",
+        ]
+
+        for i, day in enumerate(data["days"]):
+            date_str = day["date"]
+            try:
+                dt = datetime.strptime(date_str, "%Y-%m-%d")
+                if i == 0:
+                    label = "今天"
+                elif i == 1:
+                    label = "明天"
+                elif i == 2:
+                    label = "后天"
+                else:
+                    label = dt.strftime("%m/%d")
+            except ValueError:
+                label = date_str
+
+            lines.append(
+                f"{label}({date_str})  {day['cond']}  "
+                f"{day['lo_c']}~{day['hi_c']} °C  "
+                f"雨量:{day['rain_mm']} mm  "
+                f"最大风速:{day['wind_kmh']} km/h"
+            )
+
+        return "\n".join(lines)
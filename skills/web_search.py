@@ -1,8 +1,43 @@
 """
 Web search skill - uses DuckDuckGo for free, API-key-free web search.
+
+Set skills.web_search.searx_url to query a SearxNG instance's JSON API
+instead (also used with the offline stub in benchmarks/mock_upstream.py).
 """
 
-from skills.base import BaseSkill
+import os
+import threading
+from contextlib import contextmanager
+
+from skills.base import BaseSkill, SkillError, remaining_time
+
+# fd 2 is process-wide: concurrent searches share one redirection, made by
+# the first and undone by the last (see _quiet_stderr)
+_stderr_lock = threading.Lock()
+_stderr_users = 0
+_saved_stderr: int | None = None
+
+
+@contextmanager
+def _quiet_stderr():
+    """Point OS-level stderr (fd 2) at devnull while any search is running."""
+    global _stderr_users, _saved_stderr
+    with _stderr_lock:
+        if _stderr_users == 0:
+            _saved_stderr = os.dup(2)
+            devnull_fd = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull_fd, 2)
+            os.close(devnull_fd)
+        _stderr_users += 1
+    try:
+        yield
+    finally:
+        with _stderr_lock:
+            _stderr_users -= 1
+            if _stderr_users == 0:
+                os.dup2(_saved_stderr, 2)
+                os.close(_saved_stderr)
+                _saved_stderr = None
 
 
 class WebSearchSkill(BaseSkill):
@@ -24,24 +59,29 @@ class WebSearchSkill(BaseSkill):
         "required": ["query"],
     }
 
+    # Reuse identical searches for a few minutes
+    cacheable = True
+    ttl = 300
+    timeout = 10
+    # Up to max_results snippets; compaction keeps the top ones
+    max_result_tokens = 700
+
     def execute(self, query: str, max_results: int = 5) -> str:
         try:
-            import os
-            from ddgs import DDGS
+            from core.config import config
+            from core.cassette import active
+            searx_url = config.get("skills.web_search.searx_url", "")
+            if searx_url:
+                def search():
+                    return self._searx(searx_url, query, max_results)
+            else:
+                def search():
+                    return self._ddgs(query, max_results)
 
-            # primp (Rust extension used by ddgs) prints an impersonate-version warning
-            # directly to OS-level stderr (fd 2), bypassing Python's logging module.
-            # Redirect fd 2 to devnull for the duration of the DDGS call to suppress it.
-            old_stderr_fd = os.dup(2)
-            devnull_fd = os.open(os.devnull, os.O_WRONLY)
-            os.dup2(devnull_fd, 2)
-            try:
-                with DDGS() as ddgs:
-                    results = list(ddgs.text(query, max_results=max_results))
-            finally:
-                os.dup2(old_stderr_fd, 2)
-                os.close(old_stderr_fd)
-                os.close(devnull_fd)
+            # Record or replay the upstream call (see core/cassette.py)
+            cassette = active()
+            request = {"query": query, "max_results": max_results, "searx": bool(searx_url)}
+            results = cassette.call("web_search", request, search) if cassette else search()
 
             if not results:
                 from core.i18n import _
@@ -57,4 +97,30 @@ class WebSearchSkill(BaseSkill):
             return "\n\n".join(formatted)
 
         except Exception as e:
-            return f"Search error: {e}"
+            # Not cached, so the next identical search retries
+            raise SkillError(f"Search error: {e}") from e
+
+    def _ddgs(self, query: str, max_results: int) -> list[dict]:
+        from ddgs import DDGS
+
+        # primp (Rust extension used by ddgs) prints an impersonate-version warning
+        # directly to OS-level stderr (fd 2), bypassing Python's logging module.
+        # Redirect fd 2 to devnull for the duration of the DDGS call to suppress it.
+        with _quiet_stderr():
+            with DDGS(timeout=int(remaining_time(self.timeout)) or 1) as ddgs:
+                return list(ddgs.text(query, max_results=max_results))
+
+    def _searx(self, base_url: str, query: str, max_results: int) -> list[dict]:
+        import json
+        import urllib.parse
+        import urllib.request
+
+        url = f"{base_url}?{urllib.parse.urlencode({'q': query, 'format': 'json'})}"
+        req = urllib.request.Request(url, headers={"User-Agent": "VcbalAgent/1.0"})
+        with urllib.request.urlopen(req, timeout=remaining_time(self.timeout)) as r:
+            data = json.loads(r.read().decode())
+        # Same keys as ddgs results
+        return [
+            {"title": item.get("title"), "body": item.get("content"), "href": item.get("url")}
+            for item in data.get("results", [])[:max_results]
+        ]
@@ -4,6 +4,7 @@ SQLite storage for conversation history and metadata.
 
 import sqlite3
 import json
+import threading
 import time
 from pathlib import Path
 from core.config import config
@@ -15,8 +16,10 @@ class Database:
     def __init__(self):
         db_path = config.get("storage.db_path", "./data/agent.db")
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-        self.conn = sqlite3.connect(db_path)
+        # Shared across server threads; writes are serialised with _lock
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
         self._init_tables()
 
     def _init_tables(self):
@@ -40,6 +43,39 @@ class Database:
 
             CREATE INDEX IF NOT EXISTS idx_conv_session 
                 ON conversations(session_id);
+
+            -- One row per LLM call: provider-reported usage plus an estimate
+            -- of where the prompt tokens went
+            CREATE TABLE IF NOT EXISTS llm_usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                turn INTEGER NOT NULL,
+                iteration INTEGER NOT NULL,
+                model TEXT,
+                prompt_tokens INTEGER DEFAULT 0,
+                completion_tokens INTEGER DEFAULT 0,
+                total_tokens INTEGER DEFAULT 0,
+                cached_tokens INTEGER DEFAULT 0,
+                est_system INTEGER DEFAULT 0,
+                est_tools INTEGER DEFAULT 0,
+                est_history INTEGER DEFAULT 0,
+                est_tool_results INTEGER DEFAULT 0,
+                latency_ms REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+
+            -- Estimated prompt tokens per skill within one LLM call
+            CREATE TABLE IF NOT EXISTS llm_usage_skills (
+                usage_id INTEGER NOT NULL REFERENCES llm_usage(id) ON DELETE CASCADE,
+                skill TEXT NOT NULL,
+                schema_tokens INTEGER DEFAULT 0,
+                result_tokens INTEGER DEFAULT 0
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_usage_session
+                ON llm_usage(session_id);
+            CREATE INDEX IF NOT EXISTS idx_usage_skills
+                ON llm_usage_skills(usage_id);
         """)
         self.conn.commit()
 
@@ -99,6 +135,103 @@ class Database:
         self.conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
         self.conn.commit()
 
+    def save_llm_usage(self, record: dict, skills: dict[str, tuple[int, int]] = None) -> int:
+        """
+        Record one LLM call in the usage ledger.
+
+        Args:
+            record: Column values of llm_usage (session_id, turn, iteration, ...)
+            skills: skill name -> (schema_tokens, result_tokens) estimates
+
+        Returns:
+            The new llm_usage row id
+        """
+        columns = ", ".join(record)
+        placeholders = ", ".join("?" for _ in record)
+        with self._lock:
+            cur = self.conn.execute(
+                f"INSERT INTO llm_usage ({columns}) VALUES ({placeholders})",
+                tuple(record.values()),
+            )
+            usage_id = cur.lastrowid
+            if skills:
+                self.conn.executemany(
+                    "INSERT INTO llm_usage_skills (usage_id, skill, schema_tokens, result_tokens) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(usage_id, name, schema, result) for name, (schema, result) in skills.items()],
+                )
+            self.conn.commit()
+        return usage_id
+
+    def usage_summary(self, session_id: str = None, since: str = None, limit: int = 20) -> dict:
+        """
+        Aggregate the usage ledger.
+
+        Args:
+            session_id: Only this session
+            since: Only calls at or after this UTC timestamp ("YYYY-MM-DD[ HH:MM:SS]")
+            limit: Sessions / turns listed in the breakdowns
+
+        Returns:
+            Totals, the estimated prompt breakdown, per-skill schema/result
+            tokens, the most expensive sessions and turns
+        """
+        where, params = [], []
+        if session_id:
+            where.append("u.session_id = ?")
+            params.append(session_id)
+        if since:
+            where.append("u.created_at >= ?")
+            params.append(since)
+        clause = ("WHERE " + " AND ".join(where)) if where else ""
+
+        with self._lock:
+            totals = dict(self.conn.execute(
+                "SELECT COUNT(*) AS llm_calls, COUNT(DISTINCT u.session_id) AS sessions, "
+                "COALESCE(SUM(prompt_tokens), 0) AS prompt_tokens, "
+                "COALESCE(SUM(completion_tokens), 0) AS completion_tokens, "
+                "COALESCE(SUM(total_tokens), 0) AS total_tokens, "
+                "COALESCE(SUM(cached_tokens), 0) AS cached_tokens, "
+                "COALESCE(SUM(est_system), 0) AS system, COALESCE(SUM(est_tools), 0) AS tools, "
+                "COALESCE(SUM(est_history), 0) AS history, "
+                "COALESCE(SUM(est_tool_results), 0) AS tool_results, "
+                f"AVG(latency_ms) AS avg_latency_ms FROM llm_usage u {clause}",
+                params,
+            ).fetchone())
+            skills = self.conn.execute(
+                "SELECT s.skill, COUNT(*) AS calls, SUM(s.schema_tokens) AS schema_tokens, "
+                "SUM(s.result_tokens) AS result_tokens "
+                f"FROM llm_usage_skills s JOIN llm_usage u ON u.id = s.usage_id {clause} "
+                "GROUP BY s.skill ORDER BY SUM(s.schema_tokens) + SUM(s.result_tokens) DESC",
+                params,
+            ).fetchall()
+            sessions = self.conn.execute(
+                "SELECT session_id, COUNT(DISTINCT turn) AS turns, COUNT(*) AS llm_calls, "
+                "SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens, "
+                "SUM(cached_tokens) AS cached_tokens, MAX(created_at) AS last_call "
+                f"FROM llm_usage u {clause} GROUP BY session_id "
+                "ORDER BY SUM(total_tokens) DESC LIMIT ?",
+                params + [limit],
+            ).fetchall()
+            turns = self.conn.execute(
+                "SELECT session_id, turn, COUNT(*) AS iterations, SUM(prompt_tokens) AS prompt_tokens, "
+                "SUM(completion_tokens) AS completion_tokens "
+                f"FROM llm_usage u {clause} GROUP BY session_id, turn "
+                "ORDER BY SUM(total_tokens) DESC LIMIT ?",
+                params + [limit],
+            ).fetchall()
+
+        estimated = {k: totals.pop(k) for k in ("system", "tools", "history", "tool_results")}
+        prompt = totals["prompt_tokens"]
+        totals["cached_ratio"] = totals["cached_tokens"] / prompt if prompt else 0.0
+        return {
+            "totals": totals,
+            "estimated_prompt_breakdown": estimated,
+            "skills": [dict(r) for r in skills],
+            "top_sessions": [dict(r) for r in sessions],
+            "top_turns": [dict(r) for r in turns],
+        }
+
     def close(self):
         """Close database connection."""
         self.conn.close()
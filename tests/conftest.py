@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import config  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_config(tmp_path, monkeypatch):
+    """A throwaway config per test; nothing touches the tracked data/ files."""
+    data = {
+        "language": "en",
+        "llm": {"api_key": "sk-test", "base_url": "http://127.0.0.1:9/v1", "model": "test"},
+        "knowledge": {
+            "backend": "numpy", "numpy": {"path": str(tmp_path / "vectors")},
+            "warm_up": False, "auto_retrieve": {"enabled": False},
+        },
+        "storage": {"db_path": str(tmp_path / "agent.db")},
+        "agent": {"system_prompt": "Test."},
+        "skills": {"entry_points": False},
+        "usage": {"enabled": False},
+    }
+    monkeypatch.setattr(config, "_data", data)
+    from core.prompt_loader import setup
+    setup("en")
+    return data
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from api import server
+from core.cancellation import check
+
+
+class SlowAgent:
+    """chat() runs until cancelled, then takes a while to roll back."""
+
+    def __init__(self):
+        self.finished = threading.Event()
+
+    def chat(self, message, cancel=None):
+        while not cancel.is_set():
+            time.sleep(0.01)
+        time.sleep(0.2)
+        self.finished.set()
+        check(cancel)
+
+
+class ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def test_cancelled_handler_keeps_the_lock_until_the_turn_rolls_back(monkeypatch):
+    agent = SlowAgent()
+    monkeypatch.setattr(server, "agent", agent)
+
+    async def scenario():
+        handler = asyncio.ensure_future(server.chat(server.ChatRequest(message="hi"), ConnectedRequest()))
+        await asyncio.sleep(0.05)
+        handler.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await handler
+        # The worker thread finished before the agent was released
+        assert agent.finished.is_set()
+        assert not server.agent_lock.locked()
+
+    asyncio.run(scenario())
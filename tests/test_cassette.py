@@ -0,0 +1,57 @@
+from types import SimpleNamespace as NS
+
+import pytest
+
+import core.cassette
+from core.agent import Agent
+from core.llm import LLMClient
+from skills.base import BaseSkill
+from skills.registry import SkillRegistry
+
+
+class EchoSkill(BaseSkill):
+    name = "echo"
+    description = "Repeats a word"
+    parameters = {"type": "object", "properties": {"text": {"type": "string"}}}
+    intent_patterns = [r"echo (?P<text>\w+)"]
+
+    def execute(self, text: str = "") -> str:
+        return text
+
+
+class FakeCompletions:
+    """Answers with the number of messages it was sent."""
+
+    def create(self, **kwargs):
+        message = NS(content=f"{len(kwargs['messages'])} messages", tool_calls=None)
+        return NS(choices=[NS(message=message)], usage=None)
+
+
+class OfflineCompletions:
+    def create(self, **kwargs):
+        raise AssertionError("replay made a real LLM call")
+
+
+def _agent(completions):
+    llm = LLMClient()
+    llm.client = NS(chat=NS(completions=completions))
+    registry = SkillRegistry()
+    registry.register(EchoSkill())
+    return Agent(llm=llm, registry=registry)
+
+
+def _conversation(agent):
+    return [agent.chat(message) for message in ("echo hi", "hello", "echo bye")]
+
+
+@pytest.mark.parametrize("path", ["session.jsonl", "session.jsonl.gz"])
+def test_routed_turns_replay(isolated_config, monkeypatch, tmp_path, path):
+    cassette = {"mode": "record", "path": str(tmp_path / path), "match": "exact"}
+    isolated_config["cassette"] = cassette
+    monkeypatch.setattr(core.cassette, "_cassette", None)
+    recorded = _conversation(_agent(FakeCompletions()))
+    core.cassette.active().close()
+
+    cassette["mode"] = "replay"
+    monkeypatch.setattr(core.cassette, "_cassette", None)
+    assert _conversation(_agent(OfflineCompletions())) == recorded
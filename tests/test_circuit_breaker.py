@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from core.cancellation import Cancelled
+from skills.base import BaseSkill, SkillError, SkillFailure
+from skills.registry import SkillRegistry
+
+
+class FlakySkill(BaseSkill):
+    name = "flaky"
+    description = "Fails as told"
+
+    def __init__(self):
+        self.mode = "upstream"
+
+    def execute(self, **kwargs) -> str:
+        if self.mode == "upstream":
+            raise SkillError("upstream down")
+        if self.mode == "bug":
+            raise TypeError("bad argument")
+        return "ok"
+
+
+def _open_breaker(isolated_config):
+    isolated_config["skills"]["breaker"] = {"failure_threshold": 1, "reset_timeout": 0.01}
+    registry = SkillRegistry()
+    skill = FlakySkill()
+    registry.register(skill)
+    assert isinstance(registry.execute("flaky", {}), SkillFailure)
+    assert registry.breaker_states()["flaky"]["state"] == "open"
+    time.sleep(0.02)
+    return registry, skill
+
+
+def test_failing_half_open_probe_can_be_retried(isolated_config):
+    registry, skill = _open_breaker(isolated_config)
+    skill.mode = "bug"
+    assert registry.execute("flaky", {}).startswith("Error executing flaky")
+    # The probe slot was released, so the next call probes again
+    skill.mode = "ok"
+    assert registry.execute("flaky", {}) == "ok"
+    assert registry.breaker_states()["flaky"]["state"] == "closed"
+
+
+def test_cancelled_half_open_probe_frees_the_slot(isolated_config):
+    registry, skill = _open_breaker(isolated_config)
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(Cancelled):
+        registry.execute("flaky", {}, cancel=cancel)
+    state = registry.breaker_states()["flaky"]
+    # Cancellation records no failure ...
+    assert state["failures"] == 1
+    # ... and the next call is let through as the probe
+    skill.mode = "ok"
+    assert registry.execute("flaky", {}) == "ok"
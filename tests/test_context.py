@@ -0,0 +1,36 @@
+import json
+
+from core.context import ContextManager
+
+
+def _turn(context, n):
+    context.add_user_message(f"question {n}")
+    context.messages.append({"role": "assistant", "content": "", "tool_calls": [
+        {"id": f"call_{n}", "type": "function", "function": {"name": "lookup", "arguments": "{}"}},
+    ]})
+    context.add_tool_result(f"call_{n}", "lookup", f"result {n} " + "detail " * 100)
+    context.add_assistant_message(f"answer {n}")
+
+
+def test_stubs_every_turn_without_prompt_cache():
+    context = ContextManager()
+    for n in range(3):
+        _turn(context, n)
+        context.stub_tool_results(keep_turns=1)
+    stubbed = [m.get("stubbed", False) for m in context.messages if m["role"] == "tool"]
+    assert stubbed == [True, True, False]
+
+
+def test_prompt_cache_stubs_in_batches(isolated_config):
+    isolated_config["agent"]["prompt_cache"] = {"enabled": True, "trim_chunk": 3}
+    context = ContextManager()
+    prefixes = []
+    for n in range(6):
+        _turn(context, n)
+        count, _ = context.stub_tool_results(keep_turns=1)
+        prefixes.append((count, json.dumps(context.messages[:4 * n])))
+    counts = [count for count, _ in prefixes]
+    assert counts == [0, 0, 0, 3, 0, 0]
+    # Between batches, earlier history is left byte-identical
+    assert prefixes[4][1].startswith(prefixes[3][1][:-1])
+    assert prefixes[5][1].startswith(prefixes[4][1][:-1])
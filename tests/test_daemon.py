@@ -0,0 +1,56 @@
+import json
+from types import SimpleNamespace as NS
+
+from core.daemon import AgentDaemon
+from core.llm import LLMClient
+from skills.base import BaseSkill
+from skills.registry import SkillRegistry
+
+
+class PingSkill(BaseSkill):
+    name = "ping"
+    description = "Answers pong"
+
+    def execute(self) -> str:
+        return "pong"
+
+
+class Completions:
+    """Calls ping in reply to a user message, then answers "done"."""
+
+    def create(self, **kwargs):
+        if kwargs["messages"][-1]["role"] == "user":
+            call = NS(id="call_0", type="function", function=NS(name="ping", arguments=json.dumps({})))
+            message = NS(content="", tool_calls=[call])
+        else:
+            message = NS(content="done", tool_calls=None)
+        return NS(choices=[NS(message=message)], usage=None)
+
+
+def _daemon(isolated_config, tmp_path):
+    isolated_config["agent"]["router"] = {"enabled": False}
+    isolated_config["llm"]["cancel_stream"] = False
+    daemon = AgentDaemon(path=tmp_path / "agent.sock")
+    daemon._llm = LLMClient()
+    daemon._llm.client = NS(chat=NS(completions=Completions()))
+    daemon._registry = SkillRegistry()
+    daemon._registry.register(PingSkill())
+    return daemon
+
+
+def test_disconnect_mid_turn_restores_the_session(isolated_config, tmp_path):
+    daemon = _daemon(isolated_config, tmp_path)
+
+    def send(event):
+        if event["type"] == "tool":
+            raise BrokenPipeError
+        raise AssertionError(f"unexpected event {event}")
+
+    daemon.handle({"op": "chat", "session": "tty1", "message": "ping please"}, send)
+    assert daemon._session("tty1").agent.context.messages == []
+
+    events = []
+    daemon.handle({"op": "chat", "session": "tty1", "message": "ping please"}, events.append)
+    assert events[-1] == {"type": "done", "reply": "done"}
+    assert [m["role"] for m in daemon._session("tty1").agent.context.messages] == \
+        ["user", "assistant", "tool", "assistant"]
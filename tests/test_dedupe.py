@@ -0,0 +1,95 @@
+import json
+from types import SimpleNamespace as NS
+
+from core.agent import Agent
+from core.llm import LLMClient
+from skills.base import BaseSkill, SkillError
+from skills.registry import SkillRegistry
+
+
+class NotesSkill(BaseSkill):
+    """Changes state: list / add must never be answered from an earlier call."""
+
+    name = "notes"
+    description = "Lists or adds notes"
+    parameters = {"type": "object", "properties": {"action": {"type": "string"}}}
+
+    def __init__(self):
+        self.notes = []
+        self.calls = 0
+
+    def execute(self, action: str = "list") -> str:
+        self.calls += 1
+        if action == "add":
+            self.notes.append(f"note {len(self.notes) + 1}")
+        return ", ".join(self.notes) or "no notes"
+
+
+class LookupSkill(BaseSkill):
+    name = "lookup"
+    description = "Reads something"
+    parameters = {"type": "object", "properties": {"q": {"type": "string"}}}
+    read_only = True
+
+    def __init__(self):
+        self.calls = 0
+
+    def execute(self, q: str = "") -> str:
+        self.calls += 1
+        if q == "down":
+            raise SkillError("查询失败：upstream down")
+        return f"found {q}"
+
+
+class ScriptedCompletions:
+    """Makes the given tool calls in one response, then answers "done"."""
+
+    def __init__(self, calls):
+        self.calls = calls
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        if len(self.requests) == 1:
+            tool_calls = [
+                NS(id=f"call_{i}", type="function", function=NS(name=name, arguments=json.dumps(args)))
+                for i, (name, args) in enumerate(self.calls)
+            ]
+            message = NS(content="", tool_calls=tool_calls)
+        else:
+            message = NS(content="done", tool_calls=None)
+        return NS(choices=[NS(message=message)], usage=None)
+
+
+def _run(calls):
+    llm = LLMClient()
+    completions = ScriptedCompletions(calls)
+    llm.client = NS(chat=NS(completions=completions))
+    registry = SkillRegistry()
+    notes, lookup = NotesSkill(), LookupSkill()
+    registry.register(notes)
+    registry.register(lookup)
+    agent = Agent(llm=llm, registry=registry)
+    agent.router = None
+    assert agent.chat("go") == "done"
+    tool_messages = [m["content"] for m in completions.requests[-1]["messages"] if m["role"] == "tool"]
+    return notes, lookup, tool_messages
+
+
+def test_state_changing_calls_are_not_deduplicated():
+    notes, _, results = _run([("notes", {"action": "list"}), ("notes", {"action": "add"}),
+                              ("notes", {"action": "list"})])
+    assert notes.calls == 3
+    assert results == ["no notes", "note 1", "note 1"]
+
+
+def test_read_only_repeat_is_deduplicated():
+    _, lookup, results = _run([("lookup", {"q": "a"}), ("lookup", {"q": "a"})])
+    assert lookup.calls == 1
+    assert results[0] == "found a" and results[1] != "found a"
+
+
+def test_failed_call_is_retried():
+    _, lookup, results = _run([("lookup", {"q": "down"}), ("lookup", {"q": "down"})])
+    assert lookup.calls == 2
+    assert results == ["查询失败：upstream down"] * 2
@@ -0,0 +1,74 @@
+import json
+import time
+from types import SimpleNamespace as NS
+
+from core.agent import Agent
+from core.llm import LLMClient
+from skills.base import BaseSkill
+from skills.registry import SkillRegistry
+
+
+class NotesSkill(BaseSkill):
+    name = "notes"
+    description = "Adds or counts notes"
+    parameters = {"type": "object", "properties": {"action": {"type": "string"}}}
+
+    def __init__(self):
+        self.notes = []
+
+    def execute(self, action: str = "list") -> str:
+        if action == "add":
+            time.sleep(0.1)
+            self.notes.append("note")
+            return "added"
+        return f"{len(self.notes)} notes"
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+
+def _chunk(content=None, tool_calls=None):
+    return NS(choices=[NS(delta=NS(content=content, tool_calls=tool_calls))], usage=None)
+
+
+class StreamedCompletions:
+    """Streams an add and a list call in one response, then answers "done"."""
+
+    def __init__(self):
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        if len(self.requests) > 1:
+            return FakeStream([_chunk("done")])
+        return FakeStream([
+            _chunk(tool_calls=[NS(index=i, id=f"call_{i}", function=NS(
+                name="notes", arguments=json.dumps({"action": action})))])
+            for i, action in enumerate(["add", "list"])
+        ])
+
+
+def test_write_then_read_in_one_streamed_response(isolated_config):
+    isolated_config["agent"]["eager_tools"] = True
+    llm = LLMClient()
+    completions = StreamedCompletions()
+    llm.client = NS(chat=NS(completions=completions))
+    registry = SkillRegistry()
+    registry.register(NotesSkill())
+    agent = Agent(llm=llm, registry=registry)
+    agent.router = None
+
+    assert agent.chat("add a note and count them") == "done"
+    results = [m["content"] for m in completions.requests[-1]["messages"] if m["role"] == "tool"]
+    assert results == ["added", "1 notes"]
@@ -0,0 +1,48 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import server
+from knowledge.knowledge_manager import KnowledgeManager
+from knowledge.numpy_store import NumpyVectorStore
+from skills.base import SkillFailure
+from skills.knowledge_skill import KnowledgeSkill
+
+
+@pytest.fixture
+def km(tmp_path, monkeypatch):
+    monkeypatch.setattr(KnowledgeManager, "_instance", None)
+    km = KnowledgeManager()
+    km._store = NumpyVectorStore(lambda texts: np.ones((len(texts), 8)), path=tmp_path / "vectors")
+    for text, source in [("a", "user"), ("b", "web"), ("c", "web")]:
+        km.save(text, tags=["x"], source=source)
+    return km
+
+
+@pytest.mark.parametrize("where", [
+    {"text": "a"},
+    {"source": {"$regex": "w.*"}},
+    {"source": {"$in": "web"}},
+    {"$and": []},
+    ["source"],
+])
+def test_check_where_rejects(where):
+    with pytest.raises(ValueError):
+        KnowledgeManager.check_where(where)
+
+
+def test_skill_filters_by_where(km):
+    result = KnowledgeSkill().execute("list", where={"source": {"$in": ["web"]}})
+    assert sorted(e["text"] for e in result["entries"]) == ["b", "c"]
+    assert isinstance(KnowledgeSkill().execute("list", where='{"owner": "me"}'), SkillFailure)
+
+
+def test_api_where_filter(km, monkeypatch):
+    client = TestClient(server.app)
+    where = json.dumps({"$or": [{"source": "user"}, {"source": {"$eq": "nowhere"}}]})
+    body = client.get("/knowledge", params={"where": where, "tags": "x"}).json()
+    assert [item["text"] for item in body["items"]] == ["a"]
+    assert client.get("/knowledge", params={"where": '{"owner": "me"}'}).status_code == 400
+    assert client.get("/knowledge", params={"where": "not json"}).status_code == 400
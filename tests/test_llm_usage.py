@@ -0,0 +1,63 @@
+import threading
+from types import SimpleNamespace as NS
+
+from core.agent import Agent
+from core.llm import LLMClient, track_usage
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+
+class FakeCompletions:
+    """Records request kwargs; answers "hi" with usage when asked for it."""
+
+    def __init__(self):
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        usage = NS(prompt_tokens=21, completion_tokens=1, total_tokens=22, prompt_tokens_details=None)
+        if not kwargs.get("stream"):
+            return NS(choices=[NS(message=NS(content="hi", tool_calls=None))], usage=usage)
+        delta = NS(content="hi", tool_calls=None)
+        chunks = [NS(choices=[NS(delta=delta)], usage=None)]
+        if kwargs.get("stream_options", {}).get("include_usage"):
+            chunks.append(NS(choices=[], usage=usage))
+        return FakeStream(chunks)
+
+
+def _agent():
+    llm = LLMClient()
+    completions = FakeCompletions()
+    llm.client = NS(chat=NS(completions=completions))
+    return Agent(llm=llm), completions
+
+
+def test_cancellable_turn_streams_and_keeps_usage():
+    agent, completions = _agent()
+    with track_usage() as usage:
+        assert agent.chat("hello", cancel=threading.Event()) == "hi"
+    request = completions.requests[-1]
+    assert request["stream"] is True
+    assert request["stream_options"] == {"include_usage": True}
+    assert usage["prompt_tokens"] == 21
+
+
+def test_cancel_stream_off_makes_a_plain_call(isolated_config):
+    isolated_config["llm"]["cancel_stream"] = False
+    agent, completions = _agent()
+    with track_usage() as usage:
+        assert agent.chat("hello", cancel=threading.Event()) == "hi"
+    assert "stream" not in completions.requests[-1]
+    assert usage["prompt_tokens"] == 21
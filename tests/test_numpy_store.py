@@ -0,0 +1,21 @@
+import hashlib
+
+import numpy as np
+
+from knowledge.numpy_store import NumpyVectorStore
+
+
+def _embed(texts):
+    """Deterministic pseudo-embeddings; identical texts get identical vectors."""
+    return [
+        np.random.default_rng(int(hashlib.md5(t.encode()).hexdigest()[:8], 16)).standard_normal(16)
+        for t in texts
+    ]
+
+
+def test_ivf_with_fewer_rows_than_lists(isolated_config, tmp_path):
+    isolated_config["knowledge"]["numpy"].update({"ivf_lists": 8, "ivf_min_rows": 3})
+    store = NumpyVectorStore(_embed, path=tmp_path / "vectors")
+    for i in range(4):
+        store.add(f"d{i}", f"entry {i}")
+    assert store.query("entry 2", top_k=1)[0]["id"] == "d2"
@@ -0,0 +1,55 @@
+import json
+from types import SimpleNamespace as NS
+
+from core.agent import Agent
+from core.llm import LLMClient
+from skills.base import BaseSkill
+from skills.registry import SkillRegistry
+
+
+class PingSkill(BaseSkill):
+    name = "ping"
+    description = "Answers pong"
+
+    def execute(self) -> str:
+        return "pong"
+
+
+class Completions:
+    """Calls ping when the user says "ping", otherwise just answers."""
+
+    def create(self, **kwargs):
+        last = kwargs["messages"][-1]
+        if last["role"] == "user" and last["content"] == "ping":
+            call = NS(id="call_0", type="function", function=NS(name="ping", arguments=json.dumps({})))
+            message = NS(content="", tool_calls=[call])
+        else:
+            message = NS(content="ok", tool_calls=None)
+        return NS(choices=[NS(message=message)], usage=None)
+
+
+class RecordingSelector:
+    def __init__(self, registry):
+        self.registry = registry
+        self.recent = []
+
+    def select(self, query, recent=()):
+        self.recent.append(list(recent))
+        return None
+
+    def tools_for(self, names):
+        return self.registry.get_openai_tools()
+
+
+def test_recent_tools_survive_a_turn_without_tool_calls():
+    llm = LLMClient()
+    llm.client = NS(chat=NS(completions=Completions()))
+    registry = SkillRegistry()
+    registry.register(PingSkill())
+    agent = Agent(llm=llm, registry=registry)
+    agent.router = None
+    agent.tool_selector = selector = RecordingSelector(registry)
+
+    for message in ("ping", "thanks", "and again?"):
+        assert agent.chat(message) == "ok"
+    assert selector.recent == [[], ["ping"], ["ping"]]
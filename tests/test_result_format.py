@@ -0,0 +1,19 @@
+from skills.result_format import dense
+
+
+def test_dense_table():
+    data = {"location": "Beijing", "days": [
+        {"date": "2026-01-01", "cond": "Clear", "hi_c": 24.0},
+        {"date": "2026-01-02", "cond": None, "hi_c": 20.5},
+    ]}
+    assert dense(data) == (
+        "location: Beijing\n"
+        "days[date|cond|hi_c]:\n"
+        "2026-01-01|Clear|24.0\n"
+        "2026-01-02||20.5"
+    )
+
+
+def test_pipe_in_table_cell_is_escaped():
+    rows = [{"title": "Foo | Bar - News", "url": "https://example.com/a|b"}]
+    assert dense(rows) == "items[title|url]:\nFoo \\| Bar - News|https://example.com/a\\|b"
@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+from types import SimpleNamespace as NS
+
+import pytest
+
+from core.agent import Agent
+from core.llm import LLMClient
+from knowledge.knowledge_manager import KnowledgeManager
+from skills.base import BaseSkill
+from skills.registry import SkillRegistry
+
+HIT = {"id": "k1", "text": "The wifi password is hunter2", "metadata": {}, "distance": 0.1}
+
+
+class PingSkill(BaseSkill):
+    name = "ping"
+    description = "Answers pong"
+
+    def execute(self) -> str:
+        return "pong"
+
+
+class Completions:
+    """Calls ping once, then answers; keeps the system blocks of each request."""
+
+    def __init__(self):
+        self.system = []
+
+    def create(self, **kwargs):
+        self.system.append([m["content"] for m in kwargs["messages"][1:] if m["role"] == "system"])
+        if len(self.system) == 1:
+            call = NS(id="call_0", type="function", function=NS(name="ping", arguments=json.dumps({})))
+            message = NS(content="", tool_calls=[call])
+        else:
+            message = NS(content="done", tool_calls=None)
+        return NS(choices=[NS(message=message)], usage=None)
+
+
+@pytest.fixture
+def knowledge(isolated_config, monkeypatch):
+    isolated_config["knowledge"]["auto_retrieve"] = {"enabled": True, "timeout": 0.05}
+    monkeypatch.setattr(KnowledgeManager, "_instance", None)
+    return KnowledgeManager()
+
+
+def _agent():
+    llm = LLMClient()
+    completions = Completions()
+    llm.client = NS(chat=NS(completions=completions))
+    registry = SkillRegistry()
+    registry.register(PingSkill())
+    agent = Agent(llm=llm, registry=registry)
+    agent.router = None
+    return agent, completions
+
+
+def test_store_is_not_opened_for_retrieval(knowledge):
+    agent, _ = _agent()
+    assert agent.chat("what is the wifi password") == "done"
+    time.sleep(0.05)
+    assert not knowledge.is_loaded
+
+
+def test_slow_lookup_does_not_hold_the_first_call(knowledge, monkeypatch):
+    monkeypatch.setattr(KnowledgeManager, "is_loaded", True)
+    release = threading.Event()
+
+    def search(self, query, top_k=3):
+        release.wait(1)
+        return [HIT]
+
+    monkeypatch.setattr(KnowledgeManager, "search", search)
+    agent, completions = _agent()
+    # ping finishes the lookup before the second LLM call
+    monkeypatch.setattr(PingSkill, "execute", lambda self: release.set() or time.sleep(0.05) or "pong")
+
+    started = time.perf_counter()
+    assert agent.chat("what is the wifi password") == "done"
+    assert time.perf_counter() - started < 0.5
+    first, second = completions.system
+    assert first == []
+    assert "hunter2" in second[0]
@@ -0,0 +1,50 @@
+import pytest
+
+from core.router import IntentRouter
+from skills.registry import SkillRegistry
+
+
+@pytest.fixture
+def router():
+    registry = SkillRegistry()
+    registry.register_lazy("skills.weather_skill:WeatherSkill")
+    return IntentRouter(registry)
+
+
+@pytest.mark.parametrize("message, kwargs", [
+    ("北京天气怎么样？", {"city": "北京"}),
+    ("北京明天天气怎么样", {"city": "北京"}),
+    ("上海今天的天气", {"city": "上海"}),
+    ("那曲天气如何", {"city": "那曲"}),
+    ("后天天气怎么样", {}),
+    ("天气预报", {}),
+    ("what's the weather in new york", {"city": "new york"}),
+    ("weather in new york tomorrow", {"city": "new york"}),
+    ("weather today", {}),
+])
+def test_weather_routes(router, message, kwargs):
+    assert router.route(message) == ("get_weather", kwargs)
+
+
+@pytest.mark.parametrize("message", [
+    "昨天天气",
+    "周末天气如何",
+    "上海这周天气",
+    "下周天气怎么样",
+    "北京周六天气",
+    "这里天气怎么样",
+    "外面天气如何",
+    "你觉得天气怎么样",
+    "我们这天气怎么样",
+    "那边的天气",
+    "当地天气预报",
+    "weather this weekend",
+    "weather in tomorrow",
+])
+def test_time_and_place_words_are_not_a_city(router, message):
+    assert router.route(message) is None
+
+
+def test_lazy_skill_stays_unloaded(router):
+    router.route("北京天气")
+    assert not router.registry.get("get_weather").loaded
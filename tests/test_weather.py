@@ -0,0 +1,34 @@
+import urllib.error
+
+import pytest
+
+import skills.weather_skill as weather
+from skills.base import SkillFailure
+from skills.registry import SkillRegistry
+
+
+@pytest.fixture
+def registry(isolated_config):
+    isolated_config["skills"]["breaker"] = {"failure_threshold": 3, "reset_timeout": 30}
+    registry = SkillRegistry()
+    registry.register(weather.WeatherSkill())
+    return registry
+
+
+def test_unknown_city_does_not_open_the_breaker(registry, monkeypatch):
+    monkeypatch.setattr(weather, "_get_json", lambda url, timeout=10: [])
+    for city in ("Atlantis", "Lemuria", "Mu", "El Dorado"):
+        result = registry.execute("get_weather", {"city": city})
+        assert isinstance(result, SkillFailure)
+        assert city in result
+    assert registry.breaker_states()["get_weather"]["state"] == "closed"
+
+
+def test_upstream_errors_open_the_breaker(registry, monkeypatch):
+    def down(url, timeout=10):
+        raise urllib.error.URLError("connection refused")
+
+    monkeypatch.setattr(weather, "_get_json", down)
+    for _ in range(3):
+        assert isinstance(registry.execute("get_weather", {"city": "北京"}), SkillFailure)
+    assert registry.breaker_states()["get_weather"]["state"] == "open"